@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('.\\assets\\customtkinter\\', 'customtkinter\\'), ('.\\assets', 'assets\\')],
-    hiddenimports=[],
+    hiddenimports=['help_frame', 'quote_frame', 'batch_frame'],  # frames by path
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
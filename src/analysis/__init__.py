@@ -0,0 +1,50 @@
+"""File analysis for quoting 3D printing jobs. Independent of the GUI."""
+
+from .gcode import (
+    AnalysisCancelled,
+    GcodeAnalyzer,
+    GcodeStats,
+    analyze_file,
+    analyze_stream,
+)
+from .cache import AnalysisCache, CacheStats
+from .formats import SUPPORTED_EXTENSIONS, analyze_path
+from .limits import MachineLimits
+from .material import MaterialOptions
+
+__all__ = [
+    "AnalysisCache",
+    "AnalysisCancelled",
+    "BgcodeFile",
+    "CacheStats",
+    "GcodeAnalyzer",
+    "GcodeStats",
+    "LayerTable",
+    "MachineLimits",
+    "MaterialOptions",
+    "SUPPORTED_EXTENSIONS",
+    "UfpPackage",
+    "analyze_file",
+    "analyze_path",
+    "analyze_stream",
+    "analyze_ufp",
+    "estimate_bgcode",
+]
+
+# Imported on first use, UFP packages need the zip and XML modules
+_LAZY_MODULES = {
+    "BgcodeFile": "bgcode",
+    "estimate_bgcode": "bgcode",
+    "LayerTable": "layers",
+    "UfpPackage": "ufp",
+    "analyze_ufp": "ufp",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        import importlib
+
+        module = importlib.import_module(f".{_LAZY_MODULES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
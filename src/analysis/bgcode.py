@@ -0,0 +1,451 @@
+"""Prusa binary G-code (.bgcode), decoded block by block into the analyzer.
+
+A .bgcode file is a file header and a sequence of blocks: metadata, thumbnails
+and G-code. Every block has a header with its type, compression and sizes, its
+parameters, its data and, when the file has checksums, a CRC32. G-code blocks
+are compressed with deflate or heatshrink and encoded with MeatPack, which packs
+two common characters in a byte. Both are decoded here in pure Python, one
+block at a time, so the G-code is never written out in full.
+
+The print and printer metadata hold the slicer's print time and filament, which
+are read without decoding any G-code by estimate_bgcode.
+"""
+
+import logging
+import os
+import re
+import struct
+import zlib
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Iterator
+
+from .gcode import CHUNK_SIZE, GcodeAnalyzer, GcodeStats
+
+MAGIC = b"GCDE"
+FILE_HEADER = struct.Struct("<4sIH")  # magic, version, checksum type
+BLOCK_HEADER = struct.Struct("<HHI")  # type, compression, uncompressed size
+COMPRESSED_SIZE = struct.Struct("<I")  # only when a block is compressed
+CHECKSUM_SIZE = 4  # CRC32, only when the checksum type is CHECKSUM_CRC32
+CHECKSUM_CRC32 = 1
+
+# Block types
+FILE_METADATA = 0
+GCODE = 1
+SLICER_METADATA = 2
+PRINTER_METADATA = 3
+PRINT_METADATA = 4
+THUMBNAIL = 5
+PARAMETERS_SIZE = {THUMBNAIL: 6}  # format, width and height, others an encoding
+
+# Compression types
+NO_COMPRESSION = 0
+DEFLATE = 1
+HEATSHRINK_11_4 = 2
+HEATSHRINK_12_4 = 3
+HEATSHRINK_PARAMETERS = {HEATSHRINK_11_4: (11, 4), HEATSHRINK_12_4: (12, 4)}
+
+# G-code encodings
+NO_ENCODING = 0
+MEATPACK = 1
+MEATPACK_COMMENTS = 2
+
+# Metadata keys of the slicer estimates, PrusaSlicer writes them in the print
+# and the printer metadata
+TIME_KEY = "estimated printing time (normal mode)"
+FILAMENT_KEY = "filament used [mm]"
+
+
+@dataclass
+class Block:
+    """The header of a block, with its offset in the file."""
+
+    type: int
+    compression: int
+    size: int  # uncompressed
+    stored_size: int  # of the data in the file
+    offset: int
+
+    @property
+    def parameters_size(self) -> int:
+        return PARAMETERS_SIZE.get(self.type, 2)
+
+
+class BgcodeFile:
+    """A binary G-code file, read block by block.
+
+    Use it as a context manager, the file stays open until it is closed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            header = self._file.read(FILE_HEADER.size)
+            if len(header) < FILE_HEADER.size or header[:4] != MAGIC:
+                raise ValueError(f"{path} is not a binary G-code file")
+            _, self.version, self.checksum_type = FILE_HEADER.unpack(header)
+            if self.version != 1:
+                raise ValueError(
+                    f"{path} is binary G-code version {self.version}, "
+                    "only version 1 is supported"
+                )
+        except BaseException:
+            self._file.close()
+            raise
+        self.size = os.fstat(self._file.fileno()).st_size
+
+    def __enter__(self) -> "BgcodeFile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def blocks(self) -> Iterator[Block]:
+        """The headers of the blocks, in file order."""
+        checksum_size = CHECKSUM_SIZE if self.checksum_type == CHECKSUM_CRC32 else 0
+        offset = FILE_HEADER.size
+        while offset < self.size:
+            self._file.seek(offset)
+            header = self._file.read(BLOCK_HEADER.size + COMPRESSED_SIZE.size)
+            if len(header) < BLOCK_HEADER.size:
+                raise ValueError(f"{self.path} ends in a block header")
+            block_type, compression, size = BLOCK_HEADER.unpack_from(header)
+            stored_size, header_size = size, BLOCK_HEADER.size
+            if compression != NO_COMPRESSION:
+                (stored_size,) = COMPRESSED_SIZE.unpack_from(header, BLOCK_HEADER.size)
+                header_size += COMPRESSED_SIZE.size
+            block = Block(block_type, compression, size, stored_size, offset)
+            offset += header_size + block.parameters_size + stored_size + checksum_size
+            if offset > self.size:
+                raise ValueError(f"{self.path} ends in a block")
+            yield block
+
+    def read_block(self, block: Block) -> tuple[int, bytes]:
+        """Read the encoding parameter and decompressed data of a block."""
+        header_size = BLOCK_HEADER.size
+        if block.compression != NO_COMPRESSION:
+            header_size += COMPRESSED_SIZE.size
+        self._file.seek(block.offset)
+        raw = self._file.read(header_size + block.parameters_size + block.stored_size)
+        if self.checksum_type == CHECKSUM_CRC32:
+            (checksum,) = struct.unpack("<I", self._file.read(CHECKSUM_SIZE))
+            if zlib.crc32(raw) != checksum:
+                raise ValueError(f"{self.path} has a corrupt block at {block.offset}")
+        (encoding,) = struct.unpack_from("<H", raw, header_size)
+        data = raw[header_size + block.parameters_size :]
+        return encoding, decompress(data, block.compression, block.size)
+
+    @cached_property
+    def metadata(self) -> dict[str, str]:
+        """The printer and print metadata, like the slicer's print time.
+
+        Metadata blocks come before the G-code, the G-code is not read.
+        """
+        metadata = {}
+        for block in self.blocks():
+            if block.type == GCODE:
+                break
+            if block.type in (PRINTER_METADATA, PRINT_METADATA):
+                _, data = self.read_block(block)
+                for line in data.decode("utf-8", errors="replace").splitlines():
+                    key, separator, value = line.partition("=")
+                    if separator:
+                        metadata.setdefault(key.strip(), value.strip())
+        return metadata
+
+    def slicer_estimates(self) -> tuple[float | None, float | None]:
+        """The slicer's print time in s and filament length in mm, if known."""
+        time = self.metadata.get(TIME_KEY)
+        filament = self.metadata.get(FILAMENT_KEY)
+        return (
+            parse_duration(time) if time else None,
+            _parse_lengths(filament) if filament else None,
+        )
+
+    def analyze(
+        self,
+        analyzer: GcodeAnalyzer = None,
+        progress: Callable[[int, int], None] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> GcodeStats:
+        """Decode the G-code blocks into the analyzer.
+
+        Decoded blocks are fed about chunk_size bytes at a time. progress is
+        called with the bytes of the file read and the file size after every
+        chunk, it can raise AnalysisCancelled to stop the analysis.
+        """
+        analyzer = analyzer or GcodeAnalyzer()
+        pending, pending_size = [], 0
+        for block in self.blocks():
+            if block.type != GCODE:
+                continue
+            encoding, data = self.read_block(block)
+            if encoding in (MEATPACK, MEATPACK_COMMENTS):
+                data = meatpack_decode(data)
+            elif encoding != NO_ENCODING:
+                raise ValueError(f"{self.path} has unknown G-code encoding {encoding}")
+            pending.append(data)
+            pending_size += len(data)
+            if pending_size >= chunk_size:
+                analyzer.feed(b"".join(pending))
+                pending, pending_size = [], 0
+                if progress:
+                    progress(self._file.tell(), self.size)
+        analyzer.feed(b"".join(pending))
+        if progress:
+            progress(self.size, self.size)
+        # PrusaSlicer keeps its estimates in the metadata, not in comments
+        slicer_time, slicer_filament_length = self.slicer_estimates()
+        if analyzer.slicer_time is None:
+            analyzer.slicer_time = slicer_time
+        if analyzer.slicer_filament_length is None:
+            analyzer.slicer_filament_length = slicer_filament_length
+        return analyzer.finish()
+
+
+def decompress(data: bytes, compression: int, size: int) -> bytes:
+    """Decompress the data of a block to its uncompressed size."""
+    if compression == NO_COMPRESSION:
+        return data
+    if compression == DEFLATE:
+        try:
+            return zlib.decompress(data)
+        except zlib.error as e:
+            raise ValueError(f"Corrupt deflate block: {e}") from e
+    if compression in HEATSHRINK_PARAMETERS:
+        return heatshrink_decompress(data, *HEATSHRINK_PARAMETERS[compression], size)
+    raise ValueError(f"Unknown block compression {compression}")
+
+
+def heatshrink_decompress(
+    data: bytes, window_bits: int, lookahead_bits: int, size: int
+) -> bytes:
+    """Decompress heatshrink (LZSS) data to size bytes.
+
+    Every item is a flag bit, then either an 8 bit literal or a back reference
+    of window_bits for the offset and lookahead_bits for the count, both minus
+    one, most significant bit first. The window starts out as zeros.
+    """
+    out = bytearray()
+    append = out.append
+    length = 0
+    window_mask = (1 << window_bits) - 1
+    count_mask = (1 << lookahead_bits) - 1
+    # Refills read 7 bytes at a time, the last of zeros past the end
+    end = len(data) + 7
+    data = bytes(data) + bytes(14)
+    from_bytes = int.from_bytes
+    position = 0
+    buffer = 0
+    bits = 0
+    while length < size:
+        if bits < 17:  # the longest item, a flag and a 12 + 4 bit reference
+            if position >= end:
+                raise ValueError("Heatshrink data ends before its size")
+            buffer = (buffer & ((1 << bits) - 1)) << 56 | from_bytes(
+                data[position : position + 7], "big"
+            )
+            position += 7
+            bits += 56
+        bits -= 1
+        if buffer >> bits & 1:
+            bits -= 8
+            append(buffer >> bits & 0xFF)
+            length += 1
+            continue
+        bits -= window_bits
+        offset = (buffer >> bits & window_mask) + 1
+        bits -= lookahead_bits
+        count = (buffer >> bits & count_mask) + 1
+        start = length - offset
+        if start >= 0 and count <= offset:
+            out += out[start : start + count]
+        else:
+            # The reference overlaps its own output, or starts before the data
+            window = bytes(-start) + out if start < 0 else out[start:]
+            out += (window * (count // offset + 1))[:count]
+        length += count
+    del out[size:]
+    return bytes(out)
+
+
+# MeatPack packs the characters below in a nibble each, two in a byte. A nibble
+# of 0xF means that character follows in full, in the next byte.
+MEATPACK_CHARACTERS = b"0123456789. \nGX"
+MEATPACK_SIGNAL = 0xFF  # twice, then a command byte
+MEATPACK_ENABLE_PACKING = 251
+MEATPACK_DISABLE_PACKING = 250
+MEATPACK_RESET_ALL = 249
+MEATPACK_ENABLE_NO_SPACES = 247  # spaces are left out, their nibble is an E
+MEATPACK_DISABLE_NO_SPACES = 246
+# G-code parameters that get their space back after no-spaces packing
+G_PARAMETERS = b"XYZEFIJRPWHCA"
+
+_COMMAND = re.compile(rb"\xff\xff(?:\xff\xff)*(.)", re.DOTALL)
+
+
+def _byte_class(predicate: Callable[[int], bool]) -> bytes:
+    return b"[" + re.escape(bytes(filter(predicate, range(256)))) + b"]"
+
+
+# A token is a packed byte and the full characters that follow it: one after a
+# first nibble of 0xF, one after a second nibble of 0xF unless the first is a
+# newline, two after 0xFF. Bytes without full characters go two to a token.
+_PACKED = re.compile(
+    _byte_class(lambda byte: byte & 0xF == 0xF and byte < 0xF0)
+    + rb".|[\xf0-\xfb\xfd\xfe].|\xfc|\xff..|"
+    + _byte_class(lambda byte: byte & 0xF != 0xF and byte < 0xF0)
+    + rb"{1,2}|.",
+    re.DOTALL,
+)
+# A ; after a newline or at the start, searched for the ; first as it is faster
+_COMMENT_LINE = re.compile(rb"(;(?<![^\n];).*\n?)")
+
+
+class _PackedTokens(dict):
+    """The decoded characters of a packed byte and its full characters.
+
+    Filled on first use, there are only some thousand different tokens.
+    """
+
+    def __init__(self, no_spaces: bool):
+        super().__init__()
+        characters = MEATPACK_CHARACTERS
+        if no_spaces:
+            characters = characters.replace(b" ", b"E")
+        self.characters = [characters[i : i + 1] for i in range(len(characters))]
+
+    def __missing__(self, token: bytes) -> bytes:
+        packed = token[0]
+        if len(token) == 2 and packed & 0xF != 0xF and packed < 0xF0:
+            # Two packed bytes, without full characters
+            decoded = self[token[:1]] + self[token[1:]]
+            self[token] = decoded
+            return decoded
+        first, second = packed & 0xF, packed >> 4
+        full = token[1:]
+        if packed == 0xFF:
+            decoded = full
+        elif first == 0xF:
+            decoded = full + self.characters[second]
+        elif self.characters[first] == b"\n":
+            decoded = b"\n"
+        elif second == 0xF:
+            decoded = self.characters[first] + full
+        else:
+            decoded = self.characters[first] + self.characters[second]
+        self[token] = decoded
+        return decoded
+
+
+_TOKENS = {False: _PackedTokens(False), True: _PackedTokens(True)}
+
+
+def meatpack_decode(data: bytes) -> bytes:
+    """Decode a MeatPack encoded G-code block.
+
+    Like Prusa's decoder, G-code lines get the spaces before their parameters
+    back when spaces were left out, and empty lines are dropped.
+    """
+    packing = no_spaces = used_no_spaces = False
+    decoded = []
+    # Commands split the data in parts of the same mode
+    parts = _COMMAND.split(data)
+    for index, part in enumerate(parts):
+        if index % 2:
+            command = part[0]
+            if command == MEATPACK_ENABLE_PACKING:
+                packing = True
+            elif command in (MEATPACK_DISABLE_PACKING, MEATPACK_RESET_ALL):
+                packing = False
+            elif command == MEATPACK_ENABLE_NO_SPACES:
+                no_spaces = used_no_spaces = True
+            elif command == MEATPACK_DISABLE_NO_SPACES:
+                no_spaces = False
+        elif not packing:
+            decoded.append(part)
+        elif part:
+            decoded.extend(map(_TOKENS[no_spaces].__getitem__, _PACKED.findall(part)))
+    text = b"".join(decoded)
+    if used_no_spaces:
+        # Splits in commands and comment lines, which are left as they are
+        text = b"".join(
+            part if index % 2 else _space_parameters(part)
+            for index, part in enumerate(_COMMENT_LINE.split(text))
+        )
+    while b"\n\n" in text:
+        text = text.replace(b"\n\n", b"\n")
+    return text
+
+
+def _space_parameters(commands: bytes) -> bytes:
+    """Put a space before every parameter of commands packed without spaces.
+
+    Other commands than G get them too, which the analyzer does not mind.
+    """
+    for parameter in G_PARAMETERS:
+        letter = bytes([parameter])
+        commands = commands.replace(letter, b" " + letter)
+    return commands
+
+
+def parse_duration(text: str) -> float | None:
+    """Parse a PrusaSlicer duration like 1d 2h 3m 4s to seconds."""
+    units = {"d": 86400, "h": 3600, "m": 60, "s": 1}
+    parts = re.findall(r"(\d+(?:\.\d+)?)\s*([dhms])", text)
+    if not parts:
+        return None
+    return float(sum(float(value) * units[unit] for value, unit in parts))
+
+
+def _parse_lengths(text: str) -> float | None:
+    """Sum a length, or a comma separated list of them for several extruders."""
+    try:
+        return sum(float(value) for value in text.split(",") if value.strip())
+    except ValueError:
+        return None
+
+
+def analyze_bgcode(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    chunk_size: int = CHUNK_SIZE,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze the G-code in a binary G-code file."""
+    with BgcodeFile(path) as bgcode:
+        return bgcode.analyze(
+            GcodeAnalyzer(**analyzer_options), progress=progress, chunk_size=chunk_size
+        )
+
+
+def estimate_bgcode(
+    path: str, progress: Callable[[int, int], None] = None, **analyzer_options
+) -> GcodeStats:
+    """Get the slicer's estimates of a binary G-code file from its metadata.
+
+    Only the metadata is read, which is much faster than analyze_bgcode, but
+    the stats only have the print time and filament. When the metadata has no
+    estimates, the G-code is analyzed after all.
+    """
+    with BgcodeFile(path) as bgcode:
+        slicer_time, slicer_filament_length = bgcode.slicer_estimates()
+    if slicer_time is None or slicer_filament_length is None:
+        logging.info(f"{path} has no slicer estimates, analyzing its G-code")
+        return analyze_bgcode(path, progress, **analyzer_options)
+    # Only the filament options apply, there are no moves or layers
+    analyzer = GcodeAnalyzer(
+        **{
+            name: analyzer_options[name]
+            for name in ("filament_diameter", "filament_density")
+            if name in analyzer_options
+        }
+    )
+    analyzer.slicer_time = slicer_time
+    analyzer.slicer_filament_length = slicer_filament_length
+    analyzer.filament_length = slicer_filament_length
+    return analyzer.stats
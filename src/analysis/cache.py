@@ -0,0 +1,402 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from atomic_file import write_json_atomic
+
+from .formats import options_for
+from .gcode import GcodeStats
+
+CACHE_FILE = "analysis_cache.json"
+LAYERS_DIRECTORY = "analysis_layers"  # beside the cache file
+CHECKPOINTS_DIRECTORY = "analysis_checkpoints"  # beside the cache file
+# Bump when an analyzer changes its results, older cache entries are then ignored
+PARSER_VERSION = 4
+HASH_CHUNK_SIZE = 1 << 20  # bytes hashed at a time
+MAX_BYTES = 256 << 20  # of the entries and their layer files
+MAX_CHECKPOINT_BYTES = 256 << 20  # of the checkpoints directory
+# Analyzer options that change how a file is analyzed, but not the results
+UNKEYED_OPTIONS = ("workers",)
+
+
+@dataclass
+class CacheStats:
+    """Counters of an analysis cache since it was created."""
+
+    hits: int = 0
+    misses: int = 0
+    hashed: int = 0  # files hashed because their size or mtime changed
+    entries: int = 0
+    size: int = 0  # bytes of the entries and their layer files
+
+
+def hash_file(path: str) -> str:
+    """A content hash of a file, SHA-256, which has hardware support on most CPUs."""
+    digest = hashlib.sha256()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as file:
+        while size := file.readinto(buffer):
+            digest.update(view[:size])
+    return digest.hexdigest()
+
+
+def options_key(analyzer_options: dict) -> str:
+    """A stable key for the analyzer options, results depend on them."""
+    options = {
+        name: dataclasses.asdict(value) if dataclasses.is_dataclass(value) else value
+        for name, value in analyzer_options.items()
+        if name not in UNKEYED_OPTIONS
+    }
+    return json.dumps(options, sort_keys=True)
+
+
+def _encode_result(result) -> dict:
+    return {"type": type(result).__name__, "fields": dataclasses.asdict(result)}
+
+
+def _decode_result(data: dict):
+    if data["type"] == "GcodeStats":
+        return GcodeStats(**data["fields"])
+    if data["type"] == "MeshStats":
+        # NumPy is only imported when a mesh result is read
+        from .threemf import MeshStats
+
+        fields = data["fields"]
+        fields["bbox_min"] = tuple(fields["bbox_min"])
+        fields["bbox_max"] = tuple(fields["bbox_max"])
+        return MeshStats(**fields)
+    raise ValueError(f"Unknown result type {data['type']}")
+
+
+class AnalysisCache:
+    """A persistent cache of analysis results, keyed by file content.
+
+    Results are stored by a content hash of the file, the parser version and the
+    analyzer options, so a renamed or copied file is a hit too. The size and
+    mtime of every path are kept with its hash, so unchanged files are not hashed
+    again. The least recently used entries are evicted when the entries and
+    their layer files take more than max_bytes.
+
+    The cache is a JSON file, loaded on first use and written atomically by
+    flush. A hit only moves its entry in memory, the new order is written with
+    the next change. It is safe to use from several threads.
+
+    With keep_layers, G-code results come with a layer file in a directory
+    beside the cache file, which is removed when its entry is evicted.
+
+    With keep_checkpoints, G-code analyses keep checkpoints by file path in
+    another directory beside the cache file. A file that was edited near its
+    end, or that grew, is then only parsed from its last matching checkpoint,
+    see checkpoints. flush removes the least recently written checkpoints when
+    the directory takes more than max_checkpoint_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_file: str = CACHE_FILE,
+        max_bytes: int = MAX_BYTES,
+        parser_version: int = PARSER_VERSION,
+        keep_layers: bool = True,
+        keep_checkpoints: bool = True,
+        max_checkpoint_bytes: int = MAX_CHECKPOINT_BYTES,
+    ):
+        if max_bytes < 1 or max_checkpoint_bytes < 1:
+            raise ValueError("An analysis cache must hold at least one byte.")
+        self.cache_file = cache_file
+        self.max_bytes = max_bytes
+        self.max_checkpoint_bytes = max_checkpoint_bytes
+        self.parser_version = parser_version
+        directory = os.path.dirname(os.path.abspath(cache_file))
+        self.layers_directory = None
+        if keep_layers:
+            self.layers_directory = os.path.join(directory, LAYERS_DIRECTORY)
+        self.checkpoints_directory = None
+        if keep_checkpoints:
+            self.checkpoints_directory = os.path.join(directory, CHECKPOINTS_DIRECTORY)
+        self._entries: OrderedDict[str, dict] = None  # loaded on first use
+        self._sizes: dict[str, int] = {}  # key: bytes of the entry and layer file
+        self._size = 0
+        self._files: dict[str, list] = {}  # path: [size, mtime_ns, hash]
+        self._stats = CacheStats()
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @classmethod
+    def beside(cls, settings_file: str, **kwargs) -> "AnalysisCache":
+        """Create a cache in the directory of a settings file."""
+        directory = os.path.dirname(os.path.abspath(settings_file))
+        return cls(os.path.join(directory, CACHE_FILE), **kwargs)
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the counters."""
+        with self._lock:
+            self._load()
+            return dataclasses.replace(
+                self._stats, entries=len(self._entries), size=self._size
+            )
+
+    def content_hash(self, path: str) -> str:
+        """Get the content hash of a file, only hashing it when it changed."""
+        path = os.path.abspath(path)
+        status = os.stat(path)
+        with self._lock:
+            self._load()
+            known = self._files.get(path)
+            if known and known[0] == status.st_size and known[1] == status.st_mtime_ns:
+                return known[2]
+
+        content_hash = hash_file(path)
+        with self._lock:
+            self._stats.hashed += 1
+            self._files[path] = [status.st_size, status.st_mtime_ns, content_hash]
+            self._dirty = True
+        return content_hash
+
+    def key(self, path: str, analyzer_options: dict = None) -> str:
+        """Get the cache key of a file analyzed with the given options.
+
+        Only the options that apply to the file are keyed, see options_for.
+        """
+        return (
+            f"{self.content_hash(path)}:{self.parser_version}:"
+            f"{options_key(options_for(path, analyzer_options or {}))}"
+        )
+
+    def layers_path(self, key: str) -> str | None:
+        """Get the path of the layer file of a key, None without keep_layers."""
+        if self.layers_directory is None:
+            return None
+        os.makedirs(self.layers_directory, exist_ok=True)
+        name = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return os.path.join(self.layers_directory, f"{name}.layers")
+
+    def checkpoint_path(self, path: str, analyzer_options: dict) -> str | None:
+        """Get the checkpoint file of a path, None without keep_checkpoints.
+
+        Checkpoints are by path, not content, as they are used when the content
+        changed. They also depend on the parser version and analyzer options.
+        """
+        if self.checkpoints_directory is None:
+            return None
+        os.makedirs(self.checkpoints_directory, exist_ok=True)
+        name = hashlib.sha256(
+            f"{os.path.abspath(path)}:{self.parser_version}:"
+            f"{options_key(options_for(path, analyzer_options))}".encode()
+        ).hexdigest()[:32]
+        return os.path.join(self.checkpoints_directory, f"{name}.json")
+
+    def analyzer_options(
+        self, key: str, analyzer_options: dict, path: str = None
+    ) -> dict:
+        """Add the layer file of a key and checkpoint file of a path to options."""
+        options = dict(analyzer_options)
+        layers_file = self.layers_path(key)
+        if layers_file is not None:
+            options["layers_file"] = layers_file
+        checkpoint_file = self.checkpoint_path(path, analyzer_options) if path else None
+        if checkpoint_file is not None:
+            options["checkpoint_file"] = checkpoint_file
+        return options
+
+    def get(self, key: str):
+        """Get a cached result and mark it as most recently used, None on a miss."""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            try:
+                result = _decode_result(entry)
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Dropping unreadable analysis cache entry: {e}")
+                self._remove(key)
+                self._dirty = True
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            layers_file = getattr(result, "layers_file", None)
+            if layers_file is not None and not os.path.exists(layers_file):
+                result.layers_file = None
+            return result
+
+    def put(self, key: str, result):
+        """Store a result, evicting the least recently used entries when full.
+
+        The newest entry is kept, even when it alone takes more than max_bytes.
+        """
+        with self._lock:
+            self._load()
+            if key in self._entries:
+                self._size -= self._sizes.pop(key)
+            self._entries[key] = entry = _encode_result(result)
+            self._entries.move_to_end(key)
+            self._sizes[key] = _entry_size(entry)
+            self._size += self._sizes[key]
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                _remove_layers(self._entries[oldest])
+                self._remove(oldest)
+            self._dirty = True
+
+    def analyze(
+        self,
+        path: str,
+        analyze: Callable[..., object],
+        progress: Callable[[int, int], None] = None,
+        **analyzer_options,
+    ) -> tuple[object, bool]:
+        """Get the result of a file from the cache or from analyze.
+
+        Returns the result and whether it came from the cache.
+        """
+        key = self.key(path, analyzer_options)
+        result = self.get(key)
+        if result is not None:
+            return result, True
+        result = analyze(
+            path,
+            progress=progress,
+            **self.analyzer_options(key, analyzer_options, path),
+        )
+        self.put(key, result)
+        return result, False
+
+    def flush(self) -> bool:
+        """Write the cache if it changed. Returns True if the file was written.
+
+        Checkpoints above max_checkpoint_bytes are removed as well.
+        """
+        with self._lock:
+            self._evict_checkpoints()
+            if not self._dirty:
+                return False
+            # Hashes of files that no longer exist are not worth keeping
+            self._files = {
+                path: known
+                for path, known in self._files.items()
+                if os.path.exists(path)
+            }
+            data = {
+                "parser_version": self.parser_version,
+                "files": self._files,
+                "entries": list(self._entries.items()),
+            }
+            write_json_atomic(self.cache_file, data)
+            self._dirty = False
+            return True
+
+    def clear(self):
+        """Remove all entries, the file is emptied on the next flush."""
+        with self._lock:
+            self._load()
+            for entry in self._entries.values():
+                _remove_layers(entry)
+            self._entries.clear()
+            self._sizes.clear()
+            self._size = 0
+            if self.checkpoints_directory and os.path.isdir(
+                self.checkpoints_directory
+            ):
+                for name in os.listdir(self.checkpoints_directory):
+                    try:
+                        os.remove(os.path.join(self.checkpoints_directory, name))
+                    except OSError:
+                        pass
+            self._files.clear()
+            self._dirty = True
+
+    def _load(self):
+        """Read the cache file on first use. Hold the lock."""
+        if self._entries is not None:
+            return
+        self._entries = OrderedDict()
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r") as file:
+                data = json.load(file)
+            if data.get("parser_version") != self.parser_version:
+                logging.info("Analysis cache is of another parser version, ignored")
+                return
+            self._files = data["files"]
+            self._entries = OrderedDict(data["entries"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Could not read analysis cache {self.cache_file}: {e}")
+            self._files = {}
+            self._entries = OrderedDict()
+        self._sizes = {key: _entry_size(entry) for key, entry in self._entries.items()}
+        self._size = sum(self._sizes.values())
+        logging.debug(f"Loaded {len(self._entries)} analysis cache entries")
+
+    def _remove(self, key: str):
+        """Remove an entry, not its layer file. Hold the lock."""
+        del self._entries[key]
+        self._size -= self._sizes.pop(key)
+
+    def _evict_checkpoints(self):
+        """Remove the least recently written checkpoints above the limit.
+
+        A checkpoint file and its layer file are removed together. Hold the lock.
+        """
+        if self.checkpoints_directory is None:
+            return
+        checkpoints: dict[str, list] = {}  # name: [last written, bytes, paths]
+        try:
+            with os.scandir(self.checkpoints_directory) as entries:
+                for entry in entries:
+                    # Temporary files are still being written
+                    if entry.name.endswith(".tmp"):
+                        continue
+                    try:
+                        status = entry.stat()
+                    except OSError:
+                        continue
+                    name = os.path.splitext(entry.name)[0]
+                    checkpoint = checkpoints.setdefault(name, [0, 0, []])
+                    checkpoint[0] = max(checkpoint[0], status.st_mtime_ns)
+                    checkpoint[1] += status.st_size
+                    checkpoint[2].append(entry.path)
+        except FileNotFoundError:
+            return
+        size = sum(checkpoint[1] for checkpoint in checkpoints.values())
+        for _, checkpoint_size, paths in sorted(checkpoints.values()):
+            if size <= self.max_checkpoint_bytes:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            size -= checkpoint_size
+
+
+def _entry_size(entry: dict) -> int:
+    """Bytes of an entry in the cache file and of its layer file."""
+    size = len(json.dumps(entry))
+    layers_file = entry.get("fields", {}).get("layers_file")
+    if layers_file is not None:
+        try:
+            size += os.path.getsize(layers_file)
+        except OSError:
+            pass
+    return size
+
+
+def _remove_layers(entry: dict):
+    """Remove the layer file of a cache entry, if it has one."""
+    layers_file = entry.get("fields", {}).get("layers_file")
+    if layers_file is not None:
+        try:
+            os.remove(layers_file)
+        except OSError:
+            pass
@@ -0,0 +1,136 @@
+"""Checkpoints of G-code analyses, to analyze an edited or growing file again.
+
+While a file is analyzed, the state of the analyzer is kept every
+CHECKPOINT_INTERVAL bytes and at the end of the file, with the SHA-256 of the
+bytes since the checkpoint before it. When the file is analyzed again, the
+segments are hashed in order and the analysis continues from the last
+checkpoint before the first segment that changed. An edit near the end of a
+file is parsed again from the checkpoint before it, a file that grew from where
+it ended. Hashing is a lot faster than parsing.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from atomic_file import write_json_atomic
+
+from .gcode import CHUNK_SIZE, GcodeAnalyzer
+from .layers import COLUMN_NAMES, LayerTable
+
+CHECKPOINT_INTERVAL = 16 << 20  # bytes between checkpoints
+FORMAT_VERSION = 2
+
+
+class Checkpoints:
+    """The checkpoints of the analysis of one file, saved in a JSON file.
+
+    The layer rows of the analysis are saved beside it in a layer file, with the
+    extension .layers, as a checkpoint only holds their number.
+    """
+
+    def __init__(self, checkpoint_file: str, interval: int = CHECKPOINT_INTERVAL):
+        self.checkpoint_file = checkpoint_file
+        self.layers_file = os.path.splitext(checkpoint_file)[0] + ".layers"
+        self.interval = interval
+        self.checkpoints: list[dict] = []  # offset, hash and state
+        self._segment = hashlib.sha256()  # of the bytes since the last checkpoint
+        self._segment_size = 0
+
+    def resume(self, path: str, analyzer: GcodeAnalyzer) -> int:
+        """Load the checkpoints and restore the analyzer to the last that matches.
+
+        Returns the offset in the file to continue from, 0 without a checkpoint.
+        """
+        size = os.path.getsize(path)
+        matching = []
+        offset = 0
+        with open(path, "rb", buffering=0) as stream:
+            for checkpoint in self._load():
+                end = checkpoint["offset"]
+                if end > size or _hash_range(stream, offset, end) != checkpoint["hash"]:
+                    break
+                matching.append(checkpoint)
+                offset = end
+        if matching and not self._restore(matching[-1]["state"], analyzer):
+            matching, offset = [], 0
+        self.checkpoints = matching
+        logging.debug(f"Resuming the analysis of {path} at byte {offset}")
+        return offset
+
+    @property
+    def segment_hash(self) -> str:
+        """The hash of the bytes fed since the last checkpoint."""
+        return self._segment.hexdigest()
+
+    def feed(self, data: bytes, analyzer: GcodeAnalyzer):
+        """Hash data just fed to the analyzer, adds a checkpoint every interval."""
+        self._segment.update(data)
+        self._segment_size += len(data)
+        if self._segment_size >= self.interval:
+            self.add(analyzer.bytes_read, self.segment_hash, analyzer)
+
+    def add(self, offset: int, segment_hash: str, analyzer: GcodeAnalyzer):
+        """Add a checkpoint at offset, with the hash of the bytes since the last."""
+        self.checkpoints.append(
+            {"offset": offset, "hash": segment_hash, "state": analyzer.save_state()}
+        )
+        self._segment = hashlib.sha256()
+        self._segment_size = 0
+
+    def save(self, analyzer: GcodeAnalyzer):
+        """Add a checkpoint at the end of the file and write the checkpoints.
+
+        Call it before the analyzer finishes, which parses the last line.
+        """
+        if self._segment_size:
+            self.add(analyzer.bytes_read, self.segment_hash, analyzer)
+        try:
+            if analyzer.layers is not None:
+                analyzer.layers.save(self.layers_file)
+            write_json_atomic(
+                self.checkpoint_file,
+                {"version": FORMAT_VERSION, "checkpoints": self.checkpoints},
+            )
+        except OSError as e:
+            # Checkpoints only save time later, the analysis goes on without
+            logging.warning(f"Could not save checkpoints {self.checkpoint_file}: {e}")
+
+    def _load(self) -> list[dict]:
+        try:
+            with open(self.checkpoint_file, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read checkpoints {self.checkpoint_file}: {e}")
+            return []
+        if data.get("version") != FORMAT_VERSION:
+            return []
+        return data["checkpoints"]
+
+    def _restore(self, state: dict, analyzer: GcodeAnalyzer) -> bool:
+        """Restore the analyzer and its layer rows, False if the rows are missing."""
+        rows = state["layer_rows"]
+        if analyzer.layers is not None and rows:
+            try:
+                with LayerTable(self.layers_file) as table:
+                    if len(table) < rows:
+                        return False
+                    for name in COLUMN_NAMES:
+                        analyzer.layers[name].frombytes(table[name][:rows].tobytes())
+            except (OSError, ValueError):
+                return False
+        analyzer.load_state(state)
+        return True
+
+
+def _hash_range(stream, start: int, end: int) -> str:
+    digest = hashlib.sha256()
+    stream.seek(start)
+    remaining = end - start
+    while remaining and (chunk := stream.read(min(CHUNK_SIZE, remaining))):
+        remaining -= len(chunk)
+        digest.update(chunk)
+    return digest.hexdigest()
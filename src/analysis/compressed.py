@@ -0,0 +1,77 @@
+"""G-code compressed with gzip or Zstandard, decompressed while it is analyzed.
+
+The decompressed G-code is streamed to the analyzer chunk by chunk, it is never
+written to disk or held in memory in full. Zstandard needs the optional
+zstandard package.
+"""
+
+import gzip
+import os
+import zlib
+from typing import BinaryIO, Callable
+
+from .gcode import CHUNK_SIZE, GcodeAnalyzer, GcodeStats, analyze_stream
+
+
+def analyze_compressed_stream(
+    raw: BinaryIO,
+    stream: BinaryIO,
+    total: int,
+    progress: Callable[[int, int], None] = None,
+    chunk_size: int = CHUNK_SIZE,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze the decompressed stream of a raw file.
+
+    progress is called with the compressed bytes read and the file size total.
+    """
+    return analyze_stream(
+        stream,
+        GcodeAnalyzer(**analyzer_options),
+        progress=(lambda _: progress(raw.tell(), total)) if progress else None,
+        chunk_size=chunk_size,
+    )
+
+
+def analyze_gzip(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    chunk_size: int = CHUNK_SIZE,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze gzip compressed G-code, like a .gcode.gz file."""
+    total = os.path.getsize(path)
+    with open(path, "rb") as raw, gzip.GzipFile(fileobj=raw) as stream:
+        try:
+            return analyze_compressed_stream(
+                raw, stream, total, progress, chunk_size, **analyzer_options
+            )
+        except (gzip.BadGzipFile, EOFError, zlib.error) as e:
+            raise ValueError(f"{path} is not valid gzip: {e}") from e
+
+
+def analyze_zstd(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    chunk_size: int = CHUNK_SIZE,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze Zstandard compressed G-code, like a .gcode.zst file."""
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            f"{path} is Zstandard compressed, reading it needs the zstandard "
+            "package (pip install zstandard)"
+        ) from None
+
+    total = os.path.getsize(path)
+    with open(path, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(
+        raw, read_size=chunk_size
+    ) as stream:
+        try:
+            return analyze_compressed_stream(
+                raw, stream, total, progress, chunk_size, **analyzer_options
+            )
+        except zstandard.ZstdError as e:
+            raise ValueError(f"{path} is not valid Zstandard: {e}") from e
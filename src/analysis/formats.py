@@ -0,0 +1,163 @@
+import os
+from typing import TYPE_CHECKING, Callable
+
+from .gcode import GcodeStats, analyze_file
+
+from .material import MaterialOptions
+
+if TYPE_CHECKING:
+    from .threemf import MeshStats
+
+# Analyzer options of mesh analyzers, all others are GcodeAnalyzer options
+MESH_OPTIONS = ("material",)
+
+
+def analyze_3mf(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    material: MaterialOptions = None,
+) -> "MeshStats":
+    """Measure the models in a 3MF file, see threemf.analyze_3mf."""
+    # NumPy is only imported when a mesh is measured
+    from .threemf import analyze_3mf
+
+    return analyze_3mf(path, progress, material)
+
+
+def analyze_stl(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    material: MaterialOptions = None,
+) -> "MeshStats":
+    """Measure the model in an STL file, see stl.analyze_stl."""
+    # NumPy is only imported when a mesh is measured
+    from .stl import analyze_stl
+
+    return analyze_stl(path, progress, material)
+
+
+def analyze_ufp(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    workers: int = 1,
+    checkpoint_file: str = None,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze the G-code in a UFP package, see ufp.analyze_ufp.
+
+    The G-code is compressed, it can not be split or resumed, so workers and
+    checkpoint_file are ignored.
+    """
+    # The zip and XML modules are only imported when a package is read
+    from .ufp import analyze_ufp
+
+    return analyze_ufp(path, progress, **analyzer_options)
+
+
+def analyze_gzip(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    workers: int = 1,
+    checkpoint_file: str = None,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze gzip compressed G-code, see compressed.analyze_gzip.
+
+    Like a UFP package, it is analyzed in one go, in one process.
+    """
+    from .compressed import analyze_gzip
+
+    return analyze_gzip(path, progress, **analyzer_options)
+
+
+def analyze_zstd(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    workers: int = 1,
+    checkpoint_file: str = None,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze Zstandard compressed G-code, see compressed.analyze_zstd.
+
+    Like a UFP package, it is analyzed in one go, in one process.
+    """
+    from .compressed import analyze_zstd
+
+    return analyze_zstd(path, progress, **analyzer_options)
+
+
+def analyze_bgcode(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    workers: int = 1,
+    checkpoint_file: str = None,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze binary G-code, see bgcode.analyze_bgcode.
+
+    The blocks are decoded in order, in one process and without checkpoints.
+    Without limits the print time is the slicer's, which the metadata holds, so
+    only the metadata is read then, see bgcode.estimate_bgcode.
+    """
+    from .bgcode import analyze_bgcode, estimate_bgcode
+
+    if analyzer_options.get("limits") is None:
+        return estimate_bgcode(path, progress, **analyzer_options)
+    return analyze_bgcode(path, progress, **analyzer_options)
+
+
+# Analysis functions by lower case file extension, which may have two suffixes.
+# G-code analyzers take the GcodeAnalyzer options, mesh analyzers the
+# MESH_OPTIONS.
+GCODE_ANALYZERS: dict[str, Callable[..., GcodeStats]] = {
+    ".gcode": analyze_file,
+    ".gcode.gz": analyze_gzip,
+    ".gcode.zst": analyze_zstd,
+    ".bgcode": analyze_bgcode,
+    ".ufp": analyze_ufp,
+}
+MESH_ANALYZERS: dict[str, Callable[..., "MeshStats"]] = {
+    ".3mf": analyze_3mf,
+    ".stl": analyze_stl,
+}
+SUPPORTED_EXTENSIONS = (*GCODE_ANALYZERS, *MESH_ANALYZERS)
+
+
+def analyze_path(
+    path: str, progress: Callable[[int, int], None] = None, **analyzer_options
+) -> "GcodeStats | MeshStats":
+    """Analyze a print job file with the analyzer for its extension.
+
+    Only the analyzer_options that apply to the file are passed, see options_for.
+    """
+    extension = file_extension(path)
+    options = options_for(path, analyzer_options)
+    if extension in GCODE_ANALYZERS:
+        return GCODE_ANALYZERS[extension](path, progress=progress, **options)
+    if extension in MESH_ANALYZERS:
+        return MESH_ANALYZERS[extension](path, progress=progress, **options)
+    raise ValueError(
+        f"Unsupported file type: {os.path.splitext(path)[1].lower() or path}"
+    )
+
+
+def file_extension(path: str) -> str | None:
+    """The supported extension a path ends with, the longest if several do."""
+    name = path.lower()
+    matches = [
+        extension for extension in SUPPORTED_EXTENSIONS if name.endswith(extension)
+    ]
+    return max(matches, key=len, default=None)
+
+
+def options_for(path: str, analyzer_options: dict) -> dict:
+    """The analyzer options that apply to a file, by its extension.
+
+    Meshes take the MESH_OPTIONS, G-code files all the others.
+    """
+    is_mesh = file_extension(path) in MESH_ANALYZERS
+    return {
+        name: value
+        for name, value in analyzer_options.items()
+        if (name in MESH_OPTIONS) == is_mesh
+    }
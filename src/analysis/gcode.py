@@ -0,0 +1,570 @@
+import math
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO, Callable
+
+if TYPE_CHECKING:
+    from .checkpoints import Checkpoints
+    from .limits import MachineLimits
+    from .scanner import Moves
+
+CHUNK_SIZE = 1 << 20  # bytes read from a file at a time
+
+# Modal state and running totals of an analyzer, see GcodeAnalyzer.save_state
+STATE_FIELDS = (
+    "x",
+    "y",
+    "z",
+    "e",
+    "feed_rate",
+    "relative_xyz",
+    "relative_e",
+    "filament_length",
+    "estimated_time",
+    "extrude_distance",
+    "travel_distance",
+    "moves",
+    "bytes_read",
+    "layer_comments",
+    "z_layers",
+    "layer_z",
+    "slicer_time",
+    "slicer_filament_length",
+)
+
+# Defaults for 1.75 mm PLA
+FILAMENT_DIAMETER = 1.75  # mm
+FILAMENT_DENSITY = 1.24  # g/cm³
+
+
+class AnalysisCancelled(Exception):
+    """Raised by a progress callback to stop an analysis."""
+
+
+@dataclass
+class GcodeStats:
+    """Running totals of a G-code analysis."""
+
+    filament_length: float = 0.0  # mm of filament extruded, retractions subtracted
+    filament_mass: float = 0.0  # g
+    print_time: float = 0.0  # s, kinematic, else from the slicer, else estimated
+    estimated_time: float = 0.0  # s, distance / feed rate, without acceleration
+    kinematic_time: float | None = None  # s, with acceleration, see kinematics
+    layer_count: int = 0
+    extrude_distance: float = 0.0  # mm travelled while extruding
+    travel_distance: float = 0.0  # mm travelled without extruding
+    moves: int = 0
+    bytes_read: int = 0
+    slicer_time: float | None = None  # s, from ;TIME: or ;PRINT.TIME:
+    slicer_filament_length: float | None = None  # mm, from ;Filament used:
+    layers_file: str | None = None  # per-layer stats, see layers.LayerTable
+
+
+class GcodeAnalyzer:
+    """A streaming G-code analyzer.
+
+    Data is fed in chunks of any size, lines split over two chunks are kept until
+    the next chunk arrives. Only the modal state and running totals are stored,
+    so memory use does not depend on the size of the file.
+
+    Handles G0/G1 moves, G90/G91 positioning, M82/M83 extrusion modes, G92
+    position resets, Cura ;LAYER: comments (Z changes while extruding when a file
+    has none) and the Cura/Griffin ;TIME:, ;PRINT.TIME: and ;Filament used: header.
+
+    With machine limits, the moves of every chunk are parsed at once with NumPy,
+    see scanner, and go in columns to the vectorized, acceleration aware print
+    time estimate. The lines between them that change the modes or are read for
+    their comment are parsed one by one, by the same line parser as without
+    limits.
+
+    With a layers_file, the totals of every layer are collected in columns and
+    saved to that file by finish. A layer ends at a ;LAYER: comment, or in files
+    without them, at a Z change while extruding.
+    """
+
+    def __init__(
+        self,
+        filament_diameter: float = FILAMENT_DIAMETER,
+        filament_density: float = FILAMENT_DENSITY,
+        limits: "MachineLimits" = None,
+        layers_file: str = None,
+    ):
+        self.filament_diameter = filament_diameter
+        self.filament_density = filament_density
+        self.layers_file = layers_file
+        self.layers = None  # LayerColumns, only with a layers_file
+        if layers_file is not None:
+            from .layers import LayerColumns
+
+            self.layers = LayerColumns()
+        # Totals at the start of the current layer
+        self._layer_start = (0.0, 0.0, 0.0, 0.0, 0)
+        self._layers_saved = False
+
+        # NumPy is only imported when the kinematic estimate is used
+        self._columns = None
+        self._kinematics = None
+        self._scan = None
+        if limits is not None:
+            from .kinematics import KinematicsEstimator, MoveColumns
+            from .scanner import ScannedBlock
+
+            self._columns = MoveColumns()
+            self._kinematics = KinematicsEstimator(limits)
+            self._scan = ScannedBlock
+
+        # Modal state
+        self.x = 0.0
+        self.y = 0.0
+        self.z = 0.0
+        self.e = 0.0
+        self.feed_rate = 1500.0  # mm/min
+        self.relative_xyz = False
+        self.relative_e = False
+
+        # Running totals
+        self.filament_length = 0.0
+        self.estimated_time = 0.0
+        self.extrude_distance = 0.0
+        self.travel_distance = 0.0
+        self.moves = 0
+        self.bytes_read = 0
+        self.layer_comments = 0
+        self.z_layers = 0
+        self.layer_z = -math.inf  # Z of the last layer found by Z changes
+        self.slicer_time: float = None
+        self.slicer_filament_length: float = None
+
+        self._tail = b""
+
+    def feed(self, data: bytes):
+        """Analyze a chunk of G-code."""
+        self.bytes_read += len(data)
+        data = self._tail + data
+        end = data.rfind(b"\n")
+        if end < 0:
+            self._tail = data
+            return
+        self._tail = data[end + 1 :]
+        self._parse_block(data[:end])
+
+    def finish(self) -> GcodeStats:
+        """Analyze the last line if it has no newline, and get the stats."""
+        if self._tail:
+            tail, self._tail = self._tail, b""
+            self._parse_block(tail)
+        if self._kinematics:
+            self._kinematics.finish()
+        if self.layers is not None and not self._layers_saved:
+            self._end_layer(
+                self.z,
+                self.filament_length,
+                self.extrude_distance,
+                self.travel_distance,
+                self.estimated_time,
+                self.moves,
+            )
+            self.layers.save(self.layers_file)
+            self._layers_saved = True
+        return self.stats
+
+    @property
+    def stats(self) -> GcodeStats:
+        """Get the totals of the G-code analyzed so far."""
+        filament_area = math.pi * (self.filament_diameter / 2) ** 2
+        kinematic_time = self._kinematics.time if self._kinematics else None
+        if kinematic_time is not None:
+            print_time = kinematic_time
+        elif self.slicer_time is not None:
+            print_time = self.slicer_time
+        else:
+            print_time = self.estimated_time
+        return GcodeStats(
+            filament_length=self.filament_length,
+            filament_mass=self.filament_length
+            * filament_area
+            * self.filament_density
+            / 1000,
+            print_time=print_time,
+            estimated_time=self.estimated_time,
+            kinematic_time=kinematic_time,
+            layer_count=self.layer_comments or self.z_layers,
+            extrude_distance=self.extrude_distance,
+            travel_distance=self.travel_distance,
+            moves=self.moves,
+            bytes_read=self.bytes_read,
+            slicer_time=self.slicer_time,
+            slicer_filament_length=self.slicer_filament_length,
+            layers_file=self.layers_file if self._layers_saved else None,
+        )
+
+    def save_state(self) -> dict:
+        """Get the state of the analysis so far, to continue it with load_state.
+
+        The values can be written as JSON. Of the layers only the number of rows
+        is included, the rows themselves are saved by the caller.
+        """
+        state = {name: getattr(self, name) for name in STATE_FIELDS}
+        state["tail"] = self._tail.decode("latin-1")
+        state["layer_start"] = list(self._layer_start)
+        state["layer_rows"] = len(self.layers) if self.layers is not None else 0
+        state["kinematics"] = None
+        if self._kinematics:
+            state["kinematics"] = self._kinematics.save_state()
+        return state
+
+    def load_state(self, state: dict):
+        """Continue an analysis from a state of save_state, of the same options.
+
+        The analysis continues with the bytes after the state's bytes_read. The
+        layer rows of the state must be added to layers by the caller.
+        """
+        for name in STATE_FIELDS:
+            setattr(self, name, state[name])
+        self._tail = state["tail"].encode("latin-1")
+        self._layer_start = tuple(state["layer_start"])
+        if self._kinematics:
+            self._kinematics.load_state(state["kinematics"])
+
+    def _parse_block(self, block: bytes):
+        """Parse whole lines, the last without its newline."""
+        columns = self._columns
+        if self._scan is None:
+            self._parse_lines(block.split(b"\n"))
+            if columns is not None:
+                self._kinematics.add(columns)
+                columns.clear()
+            return
+
+        batches = []
+        for part in self._scan(block).parts():
+            if isinstance(part, bytes):
+                self._parse_lines([part])
+                if len(columns):  # a move with an odd word
+                    batches.append(columns.take())
+            else:
+                self._parse_moves(part)
+                batches.append(part.columns())
+        if batches:
+            self._kinematics.add_batches(batches)
+
+    def _parse_moves(self, moves: "Moves"):
+        """Parse moves scanned at once, like _parse_lines parses them."""
+        moves.follow(
+            (self.x, self.y, self.z, self.e),
+            self.feed_rate,
+            self.relative_xyz,
+            self.relative_e,
+        )
+        totals = moves.running_totals(
+            self.filament_length,
+            self.extrude_distance,
+            self.travel_distance,
+            self.estimated_time,
+        )
+        for index in moves.new_layers(self.layer_z):
+            self.z_layers += 1
+            self.layer_z = float(moves.z[index + 1])
+            if self.layers is not None:
+                self._z_layer(
+                    self.layer_z,
+                    float(moves.z[index]),
+                    *(float(total[index]) for total in totals),
+                    self.moves + index,
+                )
+        self.x, self.y = float(moves.x[-1]), float(moves.y[-1])
+        self.z, self.e = float(moves.z[-1]), float(moves.e[-1])
+        self.feed_rate = float(moves.feed_rate[-1])
+        (
+            self.filament_length,
+            self.extrude_distance,
+            self.travel_distance,
+            self.estimated_time,
+        ) = (float(total[-1]) for total in totals)
+        self.moves += len(moves)
+
+    def _parse_lines(self, lines: list[bytes]):
+        # The modal state and totals live in locals while a chunk is parsed
+        x, y, z, e = self.x, self.y, self.z, self.e
+        feed_rate = self.feed_rate
+        relative_xyz, relative_e = self.relative_xyz, self.relative_e
+        filament_length = self.filament_length
+        estimated_time = self.estimated_time
+        extrude_distance = self.extrude_distance
+        travel_distance = self.travel_distance
+        moves = self.moves
+        z_layers, layer_z = self.z_layers, self.layer_z
+        sqrt = math.sqrt
+        layers = self.layers
+        columns = self._columns
+        if columns is not None:
+            append_dx, append_dy = columns.dx.append, columns.dy.append
+            append_dz, append_de = columns.dz.append, columns.de.append
+            append_feed_rate = columns.feed_rate.append
+
+        for line in lines:
+            if not line:
+                continue
+            first = line[0]
+
+            if first == 71:  # G
+                comment = line.find(b";")
+                words = (line[:comment] if comment >= 0 else line).split()
+                command = words[0]
+
+                if command in (b"G1", b"G0", b"G01", b"G00"):
+                    new_x, new_y, new_z, new_e = x, y, z, e
+                    has_e = False
+                    for word in words[1:]:
+                        axis = word[0]
+                        if axis == 88:  # X
+                            new_x = float(word[1:]) + (x if relative_xyz else 0.0)
+                        elif axis == 89:  # Y
+                            new_y = float(word[1:]) + (y if relative_xyz else 0.0)
+                        elif axis == 90:  # Z
+                            new_z = float(word[1:]) + (z if relative_xyz else 0.0)
+                        elif axis == 69:  # E
+                            new_e = float(word[1:]) + (e if relative_e else 0.0)
+                            has_e = True
+                        elif axis == 70:  # F
+                            feed_rate = float(word[1:])
+
+                    dx, dy, dz = new_x - x, new_y - y, new_z - z
+                    distance = sqrt(dx * dx + dy * dy + dz * dz)
+                    de = new_e - e if has_e else 0.0
+                    if de > 0.0:
+                        if new_z > layer_z:
+                            z_layers += 1
+                            layer_z = new_z
+                            if layers is not None:
+                                self._z_layer(
+                                    new_z,
+                                    z,
+                                    filament_length,
+                                    extrude_distance,
+                                    travel_distance,
+                                    estimated_time,
+                                    moves,
+                                )
+                        extrude_distance += distance
+                    else:
+                        travel_distance += distance
+                    filament_length += de
+                    if feed_rate > 0.0:
+                        estimated_time += (distance or abs(de)) * 60.0 / feed_rate
+                    if columns is not None:
+                        append_dx(dx)
+                        append_dy(dy)
+                        append_dz(dz)
+                        append_de(de)
+                        append_feed_rate(feed_rate)
+                    moves += 1
+                    x, y, z, e = new_x, new_y, new_z, new_e
+
+                elif command == b"G92":
+                    for word in words[1:]:
+                        axis = word[0]
+                        if axis == 88:
+                            x = float(word[1:])
+                        elif axis == 89:
+                            y = float(word[1:])
+                        elif axis == 90:
+                            z = float(word[1:])
+                        elif axis == 69:
+                            e = float(word[1:])
+                    if len(words) == 1:
+                        x = y = z = e = 0.0
+
+                elif command == b"G90":
+                    relative_xyz = relative_e = False
+                elif command == b"G91":
+                    relative_xyz = relative_e = True
+
+            elif first == 59:  # ;
+                if layers is not None and line.startswith(b";LAYER:"):
+                    self._end_layer(
+                        z,
+                        filament_length,
+                        extrude_distance,
+                        travel_distance,
+                        estimated_time,
+                        moves,
+                    )
+                self._parse_comment(line)
+
+            elif first == 77:  # M
+                if line.startswith(b"M82"):
+                    relative_e = False
+                elif line.startswith(b"M83"):
+                    relative_e = True
+
+        self.x, self.y, self.z, self.e = x, y, z, e
+        self.feed_rate = feed_rate
+        self.relative_xyz, self.relative_e = relative_xyz, relative_e
+        self.filament_length = filament_length
+        self.estimated_time = estimated_time
+        self.extrude_distance = extrude_distance
+        self.travel_distance = travel_distance
+        self.moves = moves
+        self.z_layers, self.layer_z = z_layers, layer_z
+
+    def _z_layer(
+        self,
+        new_z: float,
+        z: float,
+        filament_length: float,
+        extrude_distance: float,
+        travel_distance: float,
+        estimated_time: float,
+        moves: int,
+    ):
+        """A move extruded above the last layer, at new_z, so the layer at z ended.
+
+        Files with ;LAYER: comments end their layers at the comments instead.
+        """
+        if not self.layer_comments:
+            self._end_layer(
+                z,
+                filament_length,
+                extrude_distance,
+                travel_distance,
+                estimated_time,
+                moves,
+            )
+
+    def _end_layer(
+        self,
+        z: float,
+        filament_length: float,
+        extrude_distance: float,
+        travel_distance: float,
+        estimated_time: float,
+        moves: int,
+    ):
+        """Add a row for the layer ending at these totals, if it has any moves."""
+        start = self._layer_start
+        if moves > start[4]:
+            self.layers.append(
+                z,
+                filament_length - start[0],
+                extrude_distance - start[1],
+                travel_distance - start[2],
+                estimated_time - start[3],
+                moves - start[4],
+            )
+        self._layer_start = (
+            filament_length,
+            extrude_distance,
+            travel_distance,
+            estimated_time,
+            moves,
+        )
+
+    def _parse_comment(self, line: bytes):
+        if line.startswith(b";LAYER:"):
+            self.layer_comments += 1
+        elif line.startswith(b";TIME:") or line.startswith(b";PRINT.TIME:"):
+            if self.slicer_time is None:
+                self.slicer_time = _parse_number(line[line.index(b":") + 1 :])
+        elif line.startswith(b";Filament used:"):
+            if self.slicer_filament_length is None:
+                # Cura reports meters, possibly a list for multiple extruders
+                meters = line[len(b";Filament used:") :].replace(b"m", b"").split(b",")
+                self.slicer_filament_length = 1000 * sum(
+                    _parse_number(value) or 0.0 for value in meters
+                )
+
+
+def _parse_number(value: bytes) -> float | None:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def analyze_stream(
+    stream: BinaryIO,
+    analyzer: GcodeAnalyzer = None,
+    progress: Callable[[int], None] = None,
+    chunk_size: int = CHUNK_SIZE,
+    checkpoints: "Checkpoints" = None,
+) -> GcodeStats:
+    """Analyze G-code from a binary stream, chunk by chunk.
+
+    progress is called with the number of bytes read after every chunk, it can
+    raise AnalysisCancelled to stop the analysis. With checkpoints, the state of
+    the analyzer is kept as it goes and saved at the end of the stream.
+    """
+    analyzer = analyzer or GcodeAnalyzer()
+    read = stream.read
+    while chunk := read(chunk_size):
+        analyzer.feed(chunk)
+        if checkpoints is not None:
+            checkpoints.feed(chunk, analyzer)
+        if progress:
+            progress(analyzer.bytes_read)
+    if checkpoints is not None:
+        checkpoints.save(analyzer)
+    return analyzer.finish()
+
+
+def analyze_file(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    chunk_size: int = CHUNK_SIZE,
+    workers: int = 1,
+    checkpoint_file: str = None,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze a G-code file. progress is called with bytes read and file size.
+
+    With more than one worker, large files are split over worker processes, see
+    parallel.analyze_file_parallel. With a checkpoint_file, an edited or grown
+    file continues from the last state where it was the same, see checkpoints.
+    """
+    if workers > 1:
+        # The process pool is only imported when a file is split
+        from .parallel import analyze_file_parallel
+
+        return analyze_file_parallel(
+            path, workers, progress, checkpoint_file, **analyzer_options
+        )
+    analyzer, checkpoints = resume_analysis(path, checkpoint_file, **analyzer_options)
+    return analyze_rest(path, analyzer, progress, checkpoints, chunk_size)
+
+
+def resume_analysis(
+    path: str, checkpoint_file: str = None, **analyzer_options
+) -> tuple[GcodeAnalyzer, "Checkpoints | None"]:
+    """Get an analyzer for a file, at its last checkpoint that still matches."""
+    analyzer = GcodeAnalyzer(**analyzer_options)
+    if checkpoint_file is None:
+        return analyzer, None
+    # Only imported when checkpoints are kept
+    from .checkpoints import Checkpoints
+
+    checkpoints = Checkpoints(checkpoint_file)
+    checkpoints.resume(path, analyzer)
+    return analyzer, checkpoints
+
+
+def analyze_rest(
+    path: str,
+    analyzer: GcodeAnalyzer,
+    progress: Callable[[int, int], None] = None,
+    checkpoints: "Checkpoints" = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> GcodeStats:
+    """Analyze a file from the bytes_read of the analyzer to the end."""
+    total = os.path.getsize(path)
+    with open(path, "rb", buffering=0) as stream:
+        stream.seek(analyzer.bytes_read)
+        return analyze_stream(
+            stream,
+            analyzer,
+            progress=(lambda bytes_read: progress(bytes_read, total))
+            if progress
+            else None,
+            chunk_size=chunk_size,
+            checkpoints=checkpoints,
+        )
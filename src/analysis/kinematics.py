@@ -0,0 +1,408 @@
+import math
+from array import array
+
+import numpy as np
+
+from .limits import MachineLimits
+
+BATCH_SIZE = 1 << 20  # moves per vectorized batch
+MIN_SPEED = 0.1  # mm/s, for moves with a zero feed rate
+
+
+class MoveColumns:
+    """Columns of moves as typed arrays: the axis deltas and the feed rate."""
+
+    def __init__(self):
+        self.dx = array("d")
+        self.dy = array("d")
+        self.dz = array("d")
+        self.de = array("d")
+        self.feed_rate = array("d")  # mm/min, as in the G-code
+
+    def __len__(self) -> int:
+        return len(self.dx)
+
+    def clear(self):
+        for column in (self.dx, self.dy, self.dz, self.de, self.feed_rate):
+            del column[:]
+
+    def take(self) -> tuple[np.ndarray, ...]:
+        """Get copies of the columns as NumPy arrays, and clear the columns."""
+        arrays = tuple(
+            np.array(column)
+            for column in (self.dx, self.dy, self.dz, self.de, self.feed_rate)
+        )
+        self.clear()
+        return arrays
+
+    def as_arrays(self) -> tuple[np.ndarray, ...]:
+        """Get the columns as NumPy arrays, without copying."""
+        return tuple(
+            np.frombuffer(column, dtype=np.float64)
+            for column in (self.dx, self.dy, self.dz, self.de, self.feed_rate)
+        )
+
+
+class KinematicsEstimator:
+    """Estimates print time with trapezoidal, acceleration limited moves.
+
+    Moves are added in batches of columns and their durations are computed with
+    vectorized NumPy math. Every move accelerates from its entry speed to its
+    feed rate, limited by max_feed_rate, and decelerates to its exit speed. The
+    speed at the junction of two moves is at most the lower feed rate scaled by
+    the cosine of the angle between them, but at least the junction_speed.
+
+    Like the planner of a firmware, the junction speeds look ahead: the squared
+    speed changes by at most 2 * acceleration per mm, so a junction is as fast as
+    the nearest slow junction before or after it allows, see _plan_speeds. Many
+    short collinear moves are timed like one long move.
+
+    A junction speed is final once the moves after it are long enough to stop
+    from it, no later move can lower it then. The moves after the last final
+    junction of a batch are carried over to the next batch.
+
+    An estimator that keeps its head does not know the speed it starts with. Its
+    moves up to the first junction that is as fast as it can be whatever that
+    speed is, the head, are kept and timed when it is joined to the end of
+    another estimator, see join.
+    """
+
+    def __init__(self, limits: MachineLimits = None, keep_head: bool = False):
+        self.limits = limits or MachineLimits()
+        self.time = 0.0  # s, of all moves except the carried ones
+        self.moves = 0
+        # Moves that are not timed yet: lengths, unit vectors and speeds
+        self._carry: tuple[np.ndarray, ...] = None
+        # The final speed at the start of the carried moves, None before any move
+        # or while the head is not found
+        self._carry_entry: float = None
+        # The head and the final speed at its end, once found with keep_head
+        self._keep_head = keep_head
+        self._head: tuple[np.ndarray, ...] = None
+        self._head_exit: float = None
+
+    def add(self, columns: MoveColumns):
+        """Add the moves of a batch of columns."""
+        if len(columns):
+            self.add_arrays(*columns.as_arrays())
+
+    def add_arrays(
+        self,
+        dx: np.ndarray,
+        dy: np.ndarray,
+        dz: np.ndarray,
+        de: np.ndarray,
+        feed_rate: np.ndarray,
+    ):
+        """Add moves given as arrays of axis deltas in mm and feed rates in mm/min."""
+        moves = _moving(dx, dy, dz, de, feed_rate, self.limits)
+        if len(moves[0]):
+            self._add_moves(*moves)
+
+    def add_batches(self, batches: list[tuple[np.ndarray, ...]]):
+        """Add batches of arrays as in add_arrays, in order, at once."""
+        if len(batches) == 1:
+            self.add_arrays(*batches[0])
+        else:
+            self.add_arrays(*(np.concatenate(column) for column in zip(*batches)))
+
+    def _add_moves(self, length: np.ndarray, unit: np.ndarray, speed: np.ndarray):
+        if self._carry is not None:
+            length, unit, speed = (
+                np.concatenate((carried, new))
+                for carried, new in zip(self._carry, (length, unit, speed))
+            )
+        limits = self.limits
+        open_start = self._carry_entry is None
+        if open_start and not self._keep_head:
+            # The first move of all starts at the junction speed
+            self._carry_entry = min(limits.junction_speed, float(speed[0]))
+            open_start = False
+        # An open start or end is limited by the speed of its move only
+        entry = speed[0] if open_start else self._carry_entry
+        squared = _plan_speeds(length, unit, speed, entry, speed[-1], limits)
+
+        # Junctions after which the moves are long enough to stop, from the end
+        twice_accel_distance = 2.0 * limits.acceleration * np.cumsum(length[::-1])
+        final = squared[:-1] <= twice_accel_distance[::-1]
+        final[0] |= not open_start
+        last = len(final) if final.all() else int(np.argmin(final))
+        last -= 1  # the last final junction
+        first = 0
+        if open_start:
+            # Junctions that are as fast as they can be from any start speed
+            twice_accel_distance = 2.0 * limits.acceleration * np.cumsum(length)
+            free = np.flatnonzero(squared[1:] <= twice_accel_distance)
+            if not len(free) or free[0] + 1 > last:
+                self._carry = (length, unit, speed)
+                return
+            first = int(free[0]) + 1
+            self._head = (length[:first], unit[:first], speed[:first])
+            self._head_exit = float(np.sqrt(squared[first]))
+
+        self._time_moves(length, speed, squared, first, last)
+        self._carry = (length[last:], unit[last:], speed[last:])
+        self._carry_entry = float(np.sqrt(squared[last]))
+
+    def _time_moves(
+        self,
+        length: np.ndarray,
+        speed: np.ndarray,
+        squared: np.ndarray,
+        first: int,
+        last: int,
+    ):
+        """Add the times of the moves first to last, from their junction speeds."""
+        junction = np.sqrt(squared)
+        self.time += float(
+            np.sum(
+                _trapezoid_time(
+                    length[first:last],
+                    speed[first:last],
+                    junction[first:last],
+                    junction[first + 1 : last + 1],
+                    self.limits.acceleration,
+                )
+            )
+        )
+        self.moves += last - first
+
+    def _close(self, exit: float):
+        """Time the carried moves, with a known exit speed of the last one."""
+        if self._carry is None:
+            return
+        length, unit, speed = self._carry
+        entry = self._carry_entry
+        if entry is None:
+            # The head was never found, the moves start from rest
+            entry = min(self.limits.junction_speed, float(speed[0]))
+        squared = _plan_speeds(length, unit, speed, entry, exit, self.limits)
+        self._time_moves(length, speed, squared, 0, len(length))
+        self._carry = None
+        self._carry_entry = exit
+
+    def save_state(self) -> dict:
+        """Get the time so far and the carried moves, as JSON compatible values."""
+        carry = None
+        if self._carry is not None:
+            length, unit, speed = self._carry
+            carry = np.column_stack((length, unit, speed)).tolist()
+        return {
+            "time": self.time,
+            "moves": self.moves,
+            "carry": carry,
+            "carry_entry": self._carry_entry,
+        }
+
+    def load_state(self, state: dict):
+        """Continue from a state of save_state."""
+        self.time = state["time"]
+        self.moves = state["moves"]
+        self._carry = None
+        self._carry_entry = state["carry_entry"]
+        if state["carry"] is not None:
+            carry = np.array(state["carry"], dtype=np.float64).reshape(-1, 5)
+            self._carry = (carry[:, 0], carry[:, 1:4], carry[:, 4])
+
+    def join(self, other: "KinematicsEstimator"):
+        """Add the moves of another estimator, as if they were added here.
+
+        other must keep its head. The head is added here, where the moves before
+        it are known, and ends with the speed other found for it. The moves of
+        other after its head do not depend on what came before and are added as
+        they are.
+        """
+        if other._head is None:
+            # The head was not found, none of the moves of other were timed
+            if other._carry is not None:
+                self._add_moves(*other._carry)
+            return
+        self._add_moves(*other._head)
+        self._close(other._head_exit)
+        self.time += other.time
+        self.moves += other.moves
+        self._carry = other._carry
+        self._carry_entry = other._carry_entry
+
+    def finish(self) -> float:
+        """Time the carried moves, the last stops at the junction speed, and get
+        the time."""
+        if self._head is not None:
+            # Not joined, the head starts from rest
+            head = KinematicsEstimator(self.limits)
+            head._add_moves(*self._head)
+            head._close(self._head_exit)
+            self.time += head.time
+            self.moves += head.moves
+            self._head = None
+        if self._carry is not None:
+            speed = self._carry[2]
+            self._close(min(self.limits.junction_speed, float(speed[-1])))
+        return self.time
+
+
+def _moving(
+    dx: np.ndarray,
+    dy: np.ndarray,
+    dz: np.ndarray,
+    de: np.ndarray,
+    feed_rate: np.ndarray,
+    limits: MachineLimits,
+) -> tuple[np.ndarray, ...]:
+    """Lengths, unit vectors and speeds of the moves that move an axis."""
+    length = np.sqrt(dx * dx + dy * dy + dz * dz)
+    extruder_only = length == 0.0
+    length = np.where(extruder_only, np.abs(de), length)
+    moving = length > 0.0
+
+    length = length[moving]
+    extruder_only = extruder_only[moving]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        unit = np.stack((dx[moving], dy[moving], dz[moving]), axis=1)
+        unit /= np.where(extruder_only, 1.0, length)[:, None]
+    speed = np.clip(
+        feed_rate[moving] / 60.0,
+        MIN_SPEED,
+        np.where(extruder_only, limits.max_extruder_feed_rate, limits.max_feed_rate),
+    )
+    return length, unit, speed
+
+
+def _plan_speeds(
+    length: np.ndarray,
+    unit: np.ndarray,
+    speed: np.ndarray,
+    entry: float,
+    exit: float,
+    limits: MachineLimits,
+) -> np.ndarray:
+    """Squared junction speeds of moves, from the entry of the first move to the
+    exit of the last one.
+
+    The fastest speeds within the junction limits and the acceleration are, for
+    a squared limit L at the distance S along the moves, the minimum of
+    L[j] + 2 * acceleration * |S[i] - S[j]| over all junctions j. The forward
+    pass takes the minimum over the junctions before i and the reverse pass the
+    one over those after it, both with prefix sums and a running minimum.
+    """
+    # Junction limits between move i - 1 and move i
+    cosine = np.einsum("ij,ij->i", unit[:-1], unit[1:])
+    lower_speed = np.minimum(speed[:-1], speed[1:])
+    junction = np.maximum(
+        lower_speed * np.clip(cosine, 0.0, 1.0),
+        np.minimum(limits.junction_speed, lower_speed),
+    )
+    limit = np.concatenate(([entry], junction, [exit]))
+    limit *= limit
+
+    twice_accel_distance = np.empty(len(limit))
+    twice_accel_distance[0] = 0.0
+    np.cumsum(length, out=twice_accel_distance[1:])
+    twice_accel_distance *= 2.0 * limits.acceleration
+
+    forward = np.minimum.accumulate(limit - twice_accel_distance)
+    forward += twice_accel_distance
+    reverse = np.minimum.accumulate((limit + twice_accel_distance)[::-1])[::-1]
+    reverse -= twice_accel_distance
+    return np.maximum(np.minimum(forward, reverse), 0.0)
+
+
+def _trapezoid_time(
+    length: np.ndarray,
+    speed: np.ndarray,
+    entry: np.ndarray,
+    exit: np.ndarray,
+    acceleration: float,
+) -> np.ndarray:
+    """Duration of trapezoidal moves, triangular when the speed is not reached."""
+    twice_accel_length = 2.0 * acceleration * length
+    exit = np.minimum(exit, np.sqrt(entry * entry + twice_accel_length))
+    entry = np.minimum(entry, np.sqrt(exit * exit + twice_accel_length))
+
+    accelerate = (speed * speed - entry * entry) / (2.0 * acceleration)
+    decelerate = (speed * speed - exit * exit) / (2.0 * acceleration)
+    cruise = length - accelerate - decelerate
+
+    peak = np.where(
+        cruise >= 0.0,
+        speed,
+        np.sqrt((twice_accel_length + entry * entry + exit * exit) / 2.0),
+    )
+    ramp_time = (2.0 * peak - entry - exit) / acceleration
+    return ramp_time + np.where(cruise >= 0.0, cruise / speed, 0.0)
+
+
+def estimate_print_time(columns: MoveColumns, limits: MachineLimits = None) -> float:
+    """Estimate the print time of moves in columns, in batches of BATCH_SIZE."""
+    estimator = KinematicsEstimator(limits)
+    arrays = columns.as_arrays()
+    for start in range(0, len(columns), BATCH_SIZE):
+        estimator.add_arrays(*(column[start : start + BATCH_SIZE] for column in arrays))
+    return estimator.finish()
+
+
+def estimate_print_time_reference(
+    columns: MoveColumns, limits: MachineLimits = None
+) -> float:
+    """Pure Python version of estimate_print_time, one move at a time."""
+    limits = limits or MachineLimits()
+    acceleration = limits.acceleration
+
+    moves = []
+    for dx, dy, dz, de, feed_rate in zip(
+        columns.dx, columns.dy, columns.dz, columns.de, columns.feed_rate
+    ):
+        length = math.sqrt(dx * dx + dy * dy + dz * dz)
+        if length > 0.0:
+            unit = (dx / length, dy / length, dz / length)
+            max_speed = limits.max_feed_rate
+        elif de != 0.0:
+            length = abs(de)
+            unit = (0.0, 0.0, 0.0)
+            max_speed = limits.max_extruder_feed_rate
+        else:
+            continue
+        speed = min(max(feed_rate / 60.0, MIN_SPEED), max_speed)
+        moves.append((length, unit, speed))
+
+    if not moves:
+        return 0.0
+    # Junction limits, from the start of the first move to the end of the last
+    limits_squared = [min(limits.junction_speed, moves[0][2]) ** 2]
+    for (_, unit, speed), (_, next_unit, next_speed) in zip(moves, moves[1:]):
+        cosine = sum(a * b for a, b in zip(unit, next_unit))
+        lower_speed = min(speed, next_speed)
+        junction = max(
+            lower_speed * min(max(cosine, 0.0), 1.0),
+            min(limits.junction_speed, lower_speed),
+        )
+        limits_squared.append(junction * junction)
+    limits_squared.append(min(limits.junction_speed, moves[-1][2]) ** 2)
+
+    # Forward pass for acceleration, reverse pass for deceleration
+    squared = limits_squared
+    for index, (length, _, _) in enumerate(moves):
+        squared[index + 1] = min(
+            squared[index + 1], squared[index] + 2.0 * acceleration * length
+        )
+    for index in range(len(moves) - 1, -1, -1):
+        squared[index] = min(
+            squared[index], squared[index + 1] + 2.0 * acceleration * moves[index][0]
+        )
+
+    total = 0.0
+    for index, (length, _, speed) in enumerate(moves):
+        move_entry = math.sqrt(squared[index])
+        move_exit = math.sqrt(squared[index + 1])
+        accelerate = (speed * speed - move_entry * move_entry) / (2.0 * acceleration)
+        decelerate = (speed * speed - move_exit * move_exit) / (2.0 * acceleration)
+        cruise = length - accelerate - decelerate
+        if cruise >= 0.0:
+            total += (2.0 * speed - move_entry - move_exit) / acceleration
+            total += cruise / speed
+        else:
+            peak = math.sqrt(
+                (2.0 * acceleration * length + move_entry**2 + move_exit**2) / 2.0
+            )
+            total += (2.0 * peak - move_entry - move_exit) / acceleration
+    return total
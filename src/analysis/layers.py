@@ -0,0 +1,124 @@
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+# Columns of a layer table: name and typecode of the typed array
+LAYER_COLUMNS = (
+    ("z", "d"),  # mm, of the last move of the layer
+    ("filament_length", "d"),  # mm extruded, retractions subtracted
+    ("extrude_distance", "d"),  # mm travelled while extruding
+    ("travel_distance", "d"),  # mm travelled without extruding
+    ("estimated_time", "d"),  # s, distance / feed rate
+    ("moves", "q"),
+)
+COLUMN_NAMES = tuple(name for name, _ in LAYER_COLUMNS)
+
+# File layout: magic, format version and row count, then every column as one
+# block of values in native byte order, so a column can be read without the
+# others. Layer files are a local cache, they are not moved between machines.
+MAGIC = b"PLYR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("=4sIQ")
+
+
+class LayerColumns:
+    """Per-layer statistics as columns of typed arrays, one row per layer."""
+
+    def __init__(self):
+        self.columns = {name: array(typecode) for name, typecode in LAYER_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.columns["z"])
+
+    def __getitem__(self, name: str) -> array:
+        return self.columns[name]
+
+    def append(self, *row):
+        """Add a layer, with a value for every column in LAYER_COLUMNS order."""
+        for column, value in zip(self.columns.values(), row):
+            column.append(value)
+
+    def save(self, path: str):
+        """Write the columns to a layer file, atomically."""
+        directory = os.path.dirname(os.path.abspath(path))
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=os.path.basename(path), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(self)))
+                for column in self.columns.values():
+                    column.tofile(file)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+class LayerTable:
+    """A layer file, memory-mapped so only the pages that are read are loaded.
+
+    Columns are memoryviews on the map, rows are read a page at a time with
+    rows(). as_array gives a column as a NumPy array, also without copying.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path} is not a layer file")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows = HEADER.unpack_from(self._map)
+        expected = HEADER.size + rows * sum(
+            array(typecode).itemsize for _, typecode in LAYER_COLUMNS
+        )
+        if magic != MAGIC or version != FORMAT_VERSION or size != expected:
+            self._map.close()
+            raise ValueError(f"{path} is not a layer file of version {FORMAT_VERSION}")
+
+        self._rows = rows
+        self._view = memoryview(self._map)
+        self.columns: dict[str, memoryview] = {}
+        offset = HEADER.size
+        for name, typecode in LAYER_COLUMNS:
+            end = offset + rows * array(typecode).itemsize
+            self.columns[name] = self._view[offset:end].cast(typecode)
+            offset = end
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, name: str) -> memoryview:
+        return self.columns[name]
+
+    def rows(self, start: int = 0, stop: int | None = None) -> list[tuple]:
+        """Get the layers from start to stop as tuples in LAYER_COLUMNS order."""
+        columns = [column[start:stop].tolist() for column in self.columns.values()]
+        return list(zip(*columns))
+
+    def as_array(self, name: str):
+        """Get a column as a read-only NumPy array on the map."""
+        import numpy as np
+
+        return np.frombuffer(self.columns[name], dtype=self.columns[name].format)
+
+    def close(self):
+        """Release the views and close the map.
+
+        Raises BufferError while arrays of as_array are still referenced.
+        """
+        if self._map.closed:
+            return
+        for column in self.columns.values():
+            column.release()
+        self._view.release()
+        self._map.close()
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class MachineLimits:
+    """Firmware limits used to estimate the duration of moves."""
+
+    acceleration: float = 1500.0  # mm/s²
+    max_feed_rate: float = 300.0  # mm/s, for moves of X, Y and Z
+    max_extruder_feed_rate: float = 120.0  # mm/s, for extruder only moves
+    junction_speed: float = 10.0  # mm/s, speed at a sharp corner, like jerk
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class MaterialOptions:
+    """How a model that is not sliced would be printed, to estimate its material.
+
+    See voxels.estimate_material.
+    """
+
+    wall_thickness: float = 0.8  # mm, of the walls, top and bottom
+    infill: float = 0.2  # fraction of the inside filled by infill
+    memory_budget: int = 64 << 20  # bytes of the voxel grids
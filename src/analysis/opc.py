@@ -0,0 +1,145 @@
+import errno
+import io
+import mmap
+import posixpath
+import zipfile
+from functools import cached_property
+from typing import BinaryIO
+from xml.etree import ElementTree
+
+RELATIONSHIPS_PART = "_rels/.rels"
+THUMBNAIL_PART = "Metadata/thumbnail.png"
+THUMBNAIL_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/package/2006/relationships/metadata/thumbnail"
+)
+
+
+def normalize_part_name(name: str) -> str:
+    """Part names are case insensitive and may start with a slash."""
+    return posixpath.normpath(name).lstrip("/").lower()
+
+
+class MappedFile(io.RawIOBase):
+    """A read only, seekable file object over a memory map.
+
+    zipfile needs seekable(), which mmap only has since Python 3.13. Reads are
+    copied from the map into the caller's buffer, so nothing else is buffered.
+    """
+
+    def __init__(self, mapping: mmap.mmap):
+        self._view = memoryview(mapping)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            # Like a real file, zipfile expects this for files shorter than a
+            # zip end record
+            raise OSError(errno.EINVAL, f"Negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer) -> int:
+        data = self._view[self._position : self._position + len(buffer)]
+        size = len(data)
+        memoryview(buffer).cast("B")[:size] = data
+        self._position += size
+        return size
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+class OpcPackage:
+    """An Open Packaging Conventions (zip) container, like UFP and 3MF.
+
+    The package is read through a memory mapped file, nothing is extracted to
+    disk. Parts are decompressed while they are streamed, and the relationships
+    and thumbnail are only read when they are asked for.
+    """
+
+    FORMAT = "OPC"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = None
+        self._mapped_file = None
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_file = MappedFile(self._map)
+            self._zip = zipfile.ZipFile(self._mapped_file)
+        except (ValueError, zipfile.BadZipFile) as e:
+            self._close_file()
+            raise ValueError(f"{path} is not a valid {self.FORMAT} package: {e}") from e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+        self._close_file()
+
+    def _close_file(self):
+        # The view of the mapped file must be released before the map is closed
+        if self._mapped_file is not None:
+            self._mapped_file.close()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    @cached_property
+    def parts(self) -> dict[str, zipfile.ZipInfo]:
+        """The zip entries by lower case part name, part names are case insensitive."""
+        return {
+            normalize_part_name(info.filename): info for info in self._zip.infolist()
+        }
+
+    def get_part(self, name: str) -> zipfile.ZipInfo:
+        """Get the zip entry of a part, raises KeyError when it does not exist."""
+        return self.parts[normalize_part_name(name)]
+
+    def open_part(self, name: str) -> BinaryIO:
+        """Open a part as a stream, decompressed on the fly."""
+        return self._zip.open(self.get_part(name))
+
+    def read_part(self, name: str) -> bytes:
+        return self._zip.read(self.get_part(name))
+
+    @cached_property
+    def relationships(self) -> dict[str, str]:
+        """The package relationships, as part name by relationship type."""
+        try:
+            data = self.read_part(RELATIONSHIPS_PART)
+        except KeyError:
+            return {}
+        relationships = {}
+        for element in ElementTree.fromstring(data):
+            target = element.get("Target", "")
+            relationships[element.get("Type")] = posixpath.normpath(target).lstrip("/")
+        return relationships
+
+    @cached_property
+    def thumbnail(self) -> bytes | None:
+        """The PNG thumbnail of the print, None if the package has none."""
+        name = self.relationships.get(THUMBNAIL_RELATIONSHIP, THUMBNAIL_PART)
+        try:
+            return self.read_part(name)
+        except KeyError:
+            return None
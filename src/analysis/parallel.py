@@ -0,0 +1,539 @@
+"""Analyze a large G-code file split into byte ranges, in worker processes.
+
+A line of G-code only means something with the modal state before it: the
+positioning and extrusion modes, the position and the feed rate. That state is
+only known at the start of a range after the ranges before it were parsed, so
+a file is analyzed in three steps:
+
+1. Every worker finds the modes set last in its range with byte searches, the
+   modes at the start of every range follow from those in order.
+2. Every worker follows its range from those modes until a line sets the feed
+   rate, the prefix, and parses the rest in parts. An axis that is not known
+   at the start of a part is carried, as an offset from where it was. The part
+   ends before the first line that needs where the axis was: a line that sets
+   it with G92 or switches it to absolute positions, or a move that gives it
+   an absolute position. Those lines are followed, and the next part starts
+   after them. The totals of a part do not depend on anything before it.
+3. Here the prefix and the lines between the parts of every range are parsed
+   in order, which gives the state in which every part started, and the totals
+   of the part are added. Carried axes, layers found by Z changes and the
+   junctions of the moves around the start of the part are resolved then.
+
+The prefix is usually a few lines. Files with relative extrusion are carried
+on E, and Z is carried up to the next layer, so most ranges are one part or a
+few. A range in which no line sets the feed rate is parsed here.
+
+With checkpoints, the workers also hash their ranges in the first step, and a
+checkpoint is added at the end of every range.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import repeat
+from typing import TYPE_CHECKING, Callable
+
+from .gcode import (
+    CHUNK_SIZE,
+    GcodeAnalyzer,
+    GcodeStats,
+    analyze_rest,
+    resume_analysis,
+)
+
+if TYPE_CHECKING:
+    from .checkpoints import Checkpoints
+    from .limits import MachineLimits
+
+MIN_RANGE_SIZE = 8 << 20  # bytes, smaller files are split over fewer workers
+PROGRESS_INTERVAL = 0.2  # s between progress reports while the workers run
+
+MOVE_COMMANDS = (b"G1", b"G0", b"G01", b"G00")
+# Positioning and extrusion modes set by a command, None when unchanged
+MODE_COMMANDS = {
+    b"G90": (False, False),
+    b"G91": (True, True),
+    b"M82": (None, False),
+    b"M83": (None, True),
+}
+WORD_ENDS = b" \t\r\n\x0b\x0c;"  # bytes after a whole G command
+AXES = {88: 0, 89: 1, 90: 2, 69: 3}  # X, Y, Z and E
+# Lines after which a carried axis may not be an offset: G90, G92 and M82
+CARRY_ENDS = re.compile(rb"^(?:G9[02](?=[ \t\r\n\x0b\x0c;])|M82)", re.MULTILINE)
+
+
+def split_ranges(path: str, count: int, start: int = 0) -> list[tuple[int, int]]:
+    """Split a file from start, a line, into at most count byte ranges.
+
+    The ranges are about the same size. Every range starts at a line and ends
+    after a newline, or at the end of the file.
+    """
+    size = os.path.getsize(path)
+    starts = [start]
+    with open(path, "rb", buffering=0) as stream:
+        for index in range(1, count):
+            # The range starts at the first line after its share of the file
+            share = start + (size - start) * index // count
+            position = _next_line(stream, max(share, starts[-1] + 1) - 1)
+            if position >= size:
+                break
+            starts.append(position)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _next_line(stream, position: int) -> int:
+    """The offset after the first newline from position, or of the end."""
+    stream.seek(position)
+    while block := stream.read(1 << 16):
+        newline = block.find(b"\n")
+        if newline >= 0:
+            return position + newline + 1
+        position += len(block)
+    return position
+
+
+def scan_range(
+    path: str, start: int, end: int, hashed: bool = False
+) -> tuple[bool | None, bool | None, str | None]:
+    """The positioning and extrusion modes set last in a range, None if not set.
+
+    With hashed, also the SHA-256 of the range for a checkpoint, else None.
+    """
+    relative_xyz = relative_e = None
+    digest = hashlib.sha256() if hashed else None
+    with open(path, "rb", buffering=0) as stream:
+        stream.seek(start)
+        data = b"\n"  # the range starts at a line
+        remaining = end - start
+        while remaining and (chunk := stream.read(min(CHUNK_SIZE, remaining))):
+            remaining -= len(chunk)
+            if digest is not None:
+                digest.update(chunk)
+            data += chunk
+            # The last line is searched with the next chunk, unless this is the end
+            cut = data.rfind(b"\n") if remaining else len(data)
+            positions = {
+                command: _find_last(data, command, cut) for command in MODE_COMMANDS
+            }
+            command = max(positions, key=positions.get)
+            if positions[command] >= 0:
+                relative_e = MODE_COMMANDS[command][1]
+            command = max((b"G90", b"G91"), key=positions.get)
+            if positions[command] >= 0:
+                relative_xyz = MODE_COMMANDS[command][0]
+            data = data[cut:]
+    return relative_xyz, relative_e, digest.hexdigest() if digest else None
+
+
+def _find_last(data: bytes, command: bytes, end: int) -> int:
+    """Position of the last line before end that starts with command, or -1."""
+    needle = b"\n" + command
+    position = data.rfind(needle, 0, end)
+    if command[0] == 71:  # G commands are whole words, M82 and M83 prefixes
+        while (
+            position >= 0
+            and position + len(needle) < len(data)
+            and data[position + len(needle)] not in WORD_ENDS
+        ):
+            position = data.rfind(needle, 0, position + len(needle) - 1)
+    return position
+
+
+class _EntryState:
+    """The modal state of a range, followed line by line from its modes.
+
+    Positions and the feed rate are None until a line sets them. Lines are
+    interpreted as GcodeAnalyzer does.
+    """
+
+    def __init__(self, relative_xyz: bool, relative_e: bool):
+        self.position = [None, None, None, None]  # X, Y, Z and E
+        self.feed_rate = None
+        self.relative_xyz = relative_xyz
+        self.relative_e = relative_e
+
+    @classmethod
+    def after(cls, part: "RangeAnalyzer") -> "_EntryState":
+        """The state at the end of a part, its carried axes are still not known."""
+        state = cls(part.relative_xyz, part.relative_e)
+        state.position = [
+            None if carried else value
+            for value, carried in zip((part.x, part.y, part.z, part.e), part.carried)
+        ]
+        state.feed_rate = part.feed_rate
+        return state
+
+    def follow(self, data: bytes, start: int, end: int) -> int | None:
+        """Follow the lines of data from start up to end, which is after a newline.
+
+        Follows at least a line. Returns the offset after the line from where the
+        feed rate is known, or None.
+        """
+        position = start
+        while position < end:
+            newline = data.find(b"\n", position, end)
+            self._follow_line(data[position:newline])
+            position = newline + 1
+            if self.feed_rate is not None:
+                return position
+        return None
+
+    def find_stop(self, data: bytes, start: int, end: int) -> int:
+        """The offset of the first line from start that needs a carried axis, or end.
+
+        Those are G90, G92 and M82 lines, and moves with a word of an axis that
+        is carried in absolute positions.
+        """
+        carried = [axis for axis in AXES if self.position[AXES[axis]] is None]
+        if not carried:
+            return end
+        match = CARRY_ENDS.search(data, start, end)
+        if match:
+            end = match.start()
+        absolute = bytes(
+            axis
+            for axis in carried
+            if not (self.relative_e if axis == 69 else self.relative_xyz)
+        )
+        if not absolute:
+            return end
+        words = re.compile(rb"[ \t\r\x0b\x0c][" + absolute + b"]")
+        for match in words.finditer(data, start, end):
+            line = data.rfind(b"\n", 0, match.start()) + 1
+            before = data[line : match.start()]
+            if (
+                data[line] == 71  # G
+                and b";" not in before
+                and before.split()[0] in MOVE_COMMANDS
+            ):
+                return line
+        return end
+
+    def _follow_line(self, line: bytes):
+        if not line:
+            return
+        first = line[0]
+        if first == 71:  # G
+            comment = line.find(b";")
+            words = (line[:comment] if comment >= 0 else line).split()
+            command = words[0]
+            if command in MOVE_COMMANDS:
+                position = list(self.position)
+                for word in words[1:]:
+                    axis = word[0]
+                    if axis in AXES:
+                        index = AXES[axis]
+                        value = float(word[1:])
+                        relative = self.relative_e if axis == 69 else self.relative_xyz
+                        if not relative:
+                            position[index] = value + 0.0
+                        elif self.position[index] is not None:
+                            position[index] = value + self.position[index]
+                    elif axis == 70:  # F
+                        self.feed_rate = float(word[1:])
+                self.position = position
+            elif command == b"G92":
+                for word in words[1:]:
+                    if word[0] in AXES:
+                        self.position[AXES[word[0]]] = float(word[1:])
+                if len(words) == 1:
+                    self.position = [0.0, 0.0, 0.0, 0.0]
+            elif command in (b"G90", b"G91"):
+                self.relative_xyz, self.relative_e = MODE_COMMANDS[command]
+        elif first == 77:  # M
+            if line.startswith(b"M82"):
+                self.relative_e = False
+            elif line.startswith(b"M83"):
+                self.relative_e = True
+
+
+def _modal_state(analyzer: GcodeAnalyzer) -> tuple:
+    return (
+        analyzer.x,
+        analyzer.y,
+        analyzer.z,
+        analyzer.e,
+        analyzer.feed_rate,
+        analyzer.relative_xyz,
+        analyzer.relative_e,
+    )
+
+
+class RangeAnalyzer(GcodeAnalyzer):
+    """Analyzes a part of a range from the offset start, where the feed rate is known.
+
+    The axes that are not known are carried: they start at 0.0 and are added to
+    where they were by merge_into, like the Z of the layers found while Z is
+    carried. Layers can only be numbered with the layers before the part, so the
+    ends of layers are kept as they are found, and joined with merge_into.
+    """
+
+    def __init__(
+        self, start: int, state: _EntryState, limits: "MachineLimits" = None
+    ):
+        super().__init__(limits=limits)
+        if limits is not None:
+            from .kinematics import KinematicsEstimator
+
+            self._kinematics = KinematicsEstimator(limits, keep_head=True)
+        self.start = start
+        self.end = None  # offset after the last line of the part
+        self.carried = tuple(value is None for value in state.position)
+        self.x, self.y, self.z, self.e = (
+            0.0 if value is None else value for value in state.position
+        )
+        self.feed_rate = state.feed_rate
+        self.relative_xyz, self.relative_e = state.relative_xyz, state.relative_e
+        # The modal state at start, None for the carried axes
+        self.entry = (*state.position, *_modal_state(self)[4:])
+        # Ends of layers: the new Z, None at a ;LAYER: comment, Z and the totals
+        self.layers = self.boundaries = []
+
+    def follows(self, analyzer: GcodeAnalyzer) -> bool:
+        """Whether an analyzer that parsed the file up to start is in the entry
+        state, but for the carried axes."""
+        return all(
+            expected is None or expected == value
+            for expected, value in zip(self.entry, _modal_state(analyzer))
+        )
+
+    def merge_into(self, analyzer: GcodeAnalyzer):
+        """Add the results to an analyzer that parsed the file up to start."""
+        entry = analyzer.x, analyzer.y, analyzer.z, analyzer.e  # of the carried axes
+        carried_z = self.carried[2]
+        base = (
+            analyzer.filament_length,
+            analyzer.extrude_distance,
+            analyzer.travel_distance,
+            analyzer.estimated_time,
+            analyzer.moves,
+        )
+        for new_z, z, *totals in self.boundaries:
+            totals = [before + total for before, total in zip(base, totals)]
+            if carried_z:
+                z += entry[2]
+                if new_z is not None:
+                    new_z += entry[2]
+            if new_z is None:
+                if analyzer.layers is not None:
+                    analyzer._end_layer(z, *totals)
+                analyzer.layer_comments += 1
+            elif new_z > analyzer.layer_z:
+                analyzer.z_layers += 1
+                analyzer.layer_z = new_z
+                if analyzer.layers is not None:
+                    analyzer._z_layer(new_z, z, *totals)
+
+        analyzer.filament_length += self.filament_length
+        analyzer.extrude_distance += self.extrude_distance
+        analyzer.travel_distance += self.travel_distance
+        analyzer.estimated_time += self.estimated_time
+        analyzer.moves += self.moves
+        analyzer.bytes_read += self.bytes_read
+        analyzer._tail = self._tail  # the last line of a file without a newline
+        analyzer.x, analyzer.y, analyzer.z, analyzer.e = (
+            was + value if carried else value
+            for was, value, carried in zip(
+                entry, (self.x, self.y, self.z, self.e), self.carried
+            )
+        )
+        analyzer.feed_rate = self.feed_rate
+        analyzer.relative_xyz, analyzer.relative_e = self.relative_xyz, self.relative_e
+        if analyzer.slicer_time is None:
+            analyzer.slicer_time = self.slicer_time
+        if analyzer.slicer_filament_length is None:
+            analyzer.slicer_filament_length = self.slicer_filament_length
+        if analyzer._kinematics is not None:
+            analyzer._kinematics.join(self._kinematics)
+
+    def _z_layer(self, new_z: float, z: float, *totals):
+        self.boundaries.append((new_z, z, *totals))
+
+    def _end_layer(self, z: float, *totals):
+        self.boundaries.append((None, z, *totals))
+
+
+def analyze_range(
+    path: str,
+    start: int,
+    end: int,
+    relative_xyz: bool,
+    relative_e: bool,
+    limits: "MachineLimits" = None,
+) -> list[RangeAnalyzer]:
+    """Analyze a range of a file in parts, from the line where the feed rate is
+    known, see the module docstring.
+
+    The lines before and between the parts, and after the last, are parsed with
+    the state of the ranges before them. No parts when no line set the feed rate.
+    """
+    state = _EntryState(relative_xyz, relative_e)
+    parts = []
+    part = None
+    following = True  # lines are followed up to the start of the next part
+    with open(path, "rb", buffering=0) as stream:
+        stream.seek(start)
+        offset, data = start, b""
+        remaining = end - start
+        while remaining and (chunk := stream.read(min(CHUNK_SIZE, remaining))):
+            remaining -= len(chunk)
+            data += chunk
+            # A last line without a newline is left to be parsed in order
+            cut = data.rfind(b"\n") + 1
+            position = 0
+            while position < cut:
+                if following:
+                    position = state.follow(data, position, cut)
+                    if position is None:
+                        break
+                    following = False
+                stop = state.find_stop(data, position, cut)
+                if stop > position:
+                    if part is None:
+                        part = RangeAnalyzer(offset + position, state, limits)
+                    part.feed(data[position:stop])
+                    position = stop
+                if stop < cut:
+                    # The line at stop needs a carried axis
+                    if part is not None:
+                        part.end = offset + stop
+                        parts.append(part)
+                        state = _EntryState.after(part)
+                        part = None
+                    following = True
+            offset += cut
+            data = data[cut:]
+    if part is not None:
+        part.end = offset
+        parts.append(part)
+    return parts
+
+
+def _feed_range(
+    analyzer: GcodeAnalyzer,
+    stream,
+    start: int,
+    end: int,
+    checkpoints: "Checkpoints" = None,
+):
+    stream.seek(start)
+    remaining = end - start
+    while remaining and (chunk := stream.read(min(CHUNK_SIZE, remaining))):
+        remaining -= len(chunk)
+        analyzer.feed(chunk)
+        if checkpoints is not None:
+            checkpoints.feed(chunk, analyzer)
+
+
+def _terminate_workers(executor: ProcessPoolExecutor):
+    """Stop the workers of a pool now, instead of after the ranges they parse.
+
+    Python 3.14 has terminate_workers, before it the processes are only reachable
+    through the executor.
+    """
+    if hasattr(executor, "terminate_workers"):
+        executor.terminate_workers()
+        return
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def analyze_file_parallel(
+    path: str,
+    workers: int,
+    progress: Callable[[int, int], None] = None,
+    checkpoint_file: str = None,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze a G-code file split over worker processes, see the module docstring.
+
+    The stats are those of analyze_file, but for the rounding of the totals,
+    which are added in another order. Files are split in ranges of at least
+    MIN_RANGE_SIZE, a smaller file is analyzed in this process. progress is called
+    with the bytes of the ranges that were parsed and the file size, it can raise
+    AnalysisCancelled to stop the analysis, the workers are then terminated. With
+    a checkpoint_file, only the file after its last matching checkpoint is split,
+    see checkpoints.
+    """
+    analyzer, checkpoints = resume_analysis(path, checkpoint_file, **analyzer_options)
+    total = os.path.getsize(path)
+    count = min(workers, (total - analyzer.bytes_read) // MIN_RANGE_SIZE)
+    if count < 2:
+        return analyze_rest(path, analyzer, progress, checkpoints)
+
+    with open(path, "rb", buffering=0) as stream:
+        start = analyzer.bytes_read
+        if analyzer._tail:
+            # A checkpoint in the middle of a line, ranges start at a line
+            line_start = _next_line(stream, start)
+            _feed_range(analyzer, stream, start, line_start, checkpoints)
+            if checkpoints is not None:
+                checkpoints.add(line_start, checkpoints.segment_hash, analyzer)
+            start = line_start
+    ranges = split_ranges(path, count, start)
+
+    executor = ProcessPoolExecutor(max_workers=len(ranges))
+    try:
+        starts, ends = zip(*ranges)
+        entry = (analyzer.relative_xyz, analyzer.relative_e)
+        entries, hashes = [], []
+        for *modes, segment_hash in executor.map(
+            scan_range, repeat(path), starts, ends, repeat(checkpoints is not None)
+        ):
+            entries.append(entry)
+            hashes.append(segment_hash)
+            entry = tuple(old if new is None else new for old, new in zip(entry, modes))
+
+        futures = [
+            executor.submit(
+                analyze_range,
+                path,
+                start,
+                end,
+                *entry,
+                analyzer_options.get("limits"),
+            )
+            for (start, end), entry in zip(ranges, entries)
+        ]
+        pending = {future: end - start for future, (start, end) in zip(futures, ranges)}
+        parsed = start
+        while pending:
+            done, _ = wait(pending, PROGRESS_INTERVAL, FIRST_COMPLETED)
+            for future in done:
+                parsed += pending.pop(future)
+                future.result()  # raises the error of the worker, if any
+            if progress:
+                progress(parsed, total)
+
+        with open(path, "rb", buffering=0) as stream:
+            for (start, end), future, segment_hash in zip(ranges, futures, hashes):
+                position = start
+                for part in future.result():
+                    _feed_range(analyzer, stream, position, part.start)
+                    position = part.start
+                    if not part.follows(analyzer):
+                        # Lines are followed as the analyzer parses them, but a
+                        # coordinate like NaN never compares equal
+                        logging.warning(
+                            f"State of {path} at byte {part.start} differs, "
+                            "parsing the range in one process"
+                        )
+                        break
+                    part.merge_into(analyzer)
+                    position = part.end
+                _feed_range(analyzer, stream, position, end)
+                if checkpoints is not None:
+                    checkpoints.add(end, segment_hash, analyzer)
+    except BaseException:
+        # Cancelled or failed, the ranges that are still parsed are not needed
+        _terminate_workers(executor)
+        raise
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if checkpoints is not None:
+        checkpoints.save(analyzer)
+    return analyzer.finish()
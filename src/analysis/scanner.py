@@ -0,0 +1,271 @@
+"""Vectorized parsing of G-code moves, used with the kinematic estimate.
+
+A block of lines is scanned with NumPy: moves are found by their command, and
+the X, Y, Z, E and F words of all of them are parsed at once. The lines that
+change the modes or the position without moving, the comments GcodeAnalyzer
+reads and the moves with a word that is not a plain decimal number are left to
+be parsed one by one, in order with the moves around them.
+
+Numbers are parsed a character of all of them at a time, into the integer of
+their digits, which is divided by a power of ten. Both are exact in a float up
+to MAX_DIGITS digits, so the division rounds like float() does and the values
+are those of the line parser.
+"""
+
+import numpy as np
+
+WORDS = b"XYZEF"  # the columns of a parsed move
+MAX_DIGITS = 15
+MAX_WIDTH = 24  # characters of a number, longer numbers are parsed by float()
+# Newlines after a block, so words and prefixes can be read past its end
+PADDING = MAX_WIDTH + 8
+
+# Prefixes of the lines that are parsed one by one, besides odd moves
+STATE_PREFIXES = (b"G90", b"G91", b"G92", b"M82", b"M83")
+COMMENT_PREFIXES = (b";LAYER:", b";TIME:", b";PRINT.TIME:", b";Filament used:")
+
+# Codes of bytes, for bytes.translate: digits are their value, and a word ends
+# at a code from SPACE on
+POINT, OTHER, LETTER, SPACE, SEMICOLON, NEWLINE = range(10, 16)
+_CODES = bytearray([OTHER]) * 256
+_CODES[ord(b"0") : ord(b"9") + 1] = range(10)
+_CODES[ord(b".")] = POINT
+for _byte in WORDS:
+    _CODES[_byte] = LETTER
+for _byte in b" \t\r\x0b\x0c":
+    _CODES[_byte] = SPACE
+_CODES[ord(b";")] = SEMICOLON
+_CODES[ord(b"\n")] = NEWLINE
+_CODES = bytes(_CODES)
+
+_COLUMNS = np.zeros(256, dtype=np.int64)
+_COLUMNS[list(WORDS)] = range(len(WORDS))
+_POWERS = 10.0 ** np.arange(MAX_DIGITS + 1)
+
+
+class ScannedBlock:
+    """The moves of a block of lines and the lines to parse one by one."""
+
+    def __init__(self, block: bytes):
+        self.block = block
+        data = block + b"\n" * PADDING
+        raw = np.frombuffer(data, dtype=np.uint8)
+        codes = np.frombuffer(data.translate(_CODES), dtype=np.uint8)
+
+        newlines = np.flatnonzero(codes[: len(block) + 1] == NEWLINE)
+        starts = np.empty(len(newlines), dtype=np.int64)
+        starts[0] = 0
+        starts[1:] = newlines[:-1] + 1
+        self.starts, self.ends = starts, newlines
+
+        first = raw[starts]
+        is_move = (first == ord("G")) & (
+            ((raw[starts + 1] | 1) == ord("1")) & (codes[starts + 2] >= SPACE)
+            | (raw[starts + 1] == ord("0"))
+            & ((raw[starts + 2] | 1) == ord("1"))
+            & (codes[starts + 3] >= SPACE)
+        )
+        single = _starts_with(raw, starts, first, STATE_PREFIXES)
+        single |= _starts_with(raw, starts, first, COMMENT_PREFIXES)
+
+        # Words of moves start with a column letter after whitespace
+        letters = np.flatnonzero(
+            (codes[1 : len(block)] == LETTER) & (codes[: len(block) - 1] == SPACE)
+        )
+        letters += 1
+        lines = np.searchsorted(newlines, letters)
+        in_move = is_move[lines]
+        letters, lines = letters[in_move], lines[in_move]
+        # Words after a semicolon are part of the comment
+        semicolons = np.flatnonzero(codes[: len(block)] == SEMICOLON)
+        if len(semicolons):
+            before = np.searchsorted(semicolons, letters) - 1
+            commented = (before >= 0) & (
+                semicolons[np.maximum(before, 0)] > starts[lines]
+            )
+            letters, lines = letters[~commented], lines[~commented]
+
+        values, valid = _parse_numbers(raw, codes, letters + 1)
+
+        columns = _COLUMNS[raw[letters]]
+        cells = lines * len(WORDS) + columns
+        repeated = np.bincount(cells, minlength=len(starts) * len(WORDS)) > 1
+        odd = np.zeros(len(starts), dtype=bool)
+        odd[lines[~valid]] = True
+        odd[np.flatnonzero(repeated) // len(WORDS)] = True
+        single |= is_move & odd
+        is_move &= ~odd
+
+        table = np.full((len(starts), len(WORDS)), np.nan)
+        table[lines[valid], columns[valid]] = values[valid]
+        self.move_lines = np.flatnonzero(is_move)
+        self.values = table[self.move_lines]
+        self.single_lines = np.flatnonzero(single)
+
+    def parts(self):
+        """The moves and the lines to parse one by one, in the order of the block.
+
+        Moves come as Moves, lines as bytes.
+        """
+        block, starts, ends = self.block, self.starts, self.ends
+        cuts = np.searchsorted(self.move_lines, self.single_lines)
+        first = 0
+        for line, cut in zip(self.single_lines.tolist(), cuts.tolist()):
+            if cut > first:
+                yield Moves(self.values[first:cut])
+                first = cut
+            yield block[starts[line] : ends[line]]
+        if first < len(self.values):
+            yield Moves(self.values[first:])
+
+
+class Moves:
+    """Consecutive moves, with the values of their words, NaN when not given."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def follow(
+        self,
+        position: tuple[float, float, float, float],
+        feed_rate: float,
+        relative_xyz: bool,
+        relative_e: bool,
+    ):
+        """Follow the moves from the position and feed rate before them.
+
+        Sets the positions before and after every move, x, y, z and e, the axis
+        deltas and the feed rate of every move.
+        """
+        values = self.values
+        given = ~np.isnan(values)
+        axes = []
+        for column, start in enumerate(position):
+            relative = relative_e if column == 3 else relative_xyz
+            axes.append(_follow(values[:, column], given[:, column], start, relative))
+        self.x, self.y, self.z, self.e = axes
+        self.feed_rate = _follow(values[:, 4], given[:, 4], feed_rate, None)[1:]
+
+        self.dx = np.diff(self.x)
+        self.dy = np.diff(self.y)
+        self.dz = np.diff(self.z)
+        self.de = np.where(given[:, 3], np.diff(self.e), 0.0)
+        self.distance = np.sqrt(
+            self.dx * self.dx + self.dy * self.dy + self.dz * self.dz
+        )
+
+    def running_totals(
+        self,
+        filament_length: float,
+        extrude_distance: float,
+        travel_distance: float,
+        estimated_time: float,
+    ) -> tuple[np.ndarray, ...]:
+        """The totals before every move and after the last, from those before.
+
+        The totals are summed in order, so they are those of the line parser.
+        """
+        distance, de, feed_rate = self.distance, self.de, self.feed_rate
+        extruding = de > 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            time = np.where(distance != 0.0, distance, np.abs(de)) * 60.0 / feed_rate
+        time = np.where(feed_rate > 0.0, time, 0.0)
+        return tuple(
+            np.cumsum(np.concatenate(([start], steps)))
+            for start, steps in (
+                (filament_length, de),
+                (extrude_distance, np.where(extruding, distance, 0.0)),
+                (travel_distance, np.where(extruding, 0.0, distance)),
+                (estimated_time, time),
+            )
+        )
+
+    def new_layers(self, layer_z: float) -> list[int]:
+        """The moves that extrude above all before them, and layer_z."""
+        z = np.where(self.de > 0.0, self.z[1:], -np.inf)
+        highest = np.fmax.accumulate(np.concatenate(([layer_z], z)))
+        return np.flatnonzero(z > highest[:-1]).tolist()
+
+    def columns(self) -> tuple[np.ndarray, ...]:
+        """The columns of the kinematic estimate, see KinematicsEstimator."""
+        return self.dx, self.dy, self.dz, self.de, self.feed_rate
+
+
+def _follow(
+    values: np.ndarray, given: np.ndarray, start: float, relative: bool | None
+) -> np.ndarray:
+    """An axis before the first move and after every move.
+
+    Relative values are added, the others replace the axis. Absolute positions
+    get + 0.0 like the line parser gives them, which turns -0.0 into 0.0, values
+    of the feed rate, with relative None, are taken as they are.
+    """
+    if relative:
+        steps = np.where(given, values, 0.0)
+        return np.cumsum(np.concatenate(([start], steps)))
+    if relative is not None:
+        values = values + 0.0
+    latest = np.where(given, np.arange(1, len(values) + 1), 0)
+    np.maximum.accumulate(latest, out=latest)
+    return np.concatenate(([start], values))[np.concatenate(([0], latest))]
+
+
+def _starts_with(
+    raw: np.ndarray, starts: np.ndarray, first: np.ndarray, prefixes: tuple
+) -> np.ndarray:
+    """Lines that start with one of the prefixes."""
+    found = np.zeros(len(starts), dtype=bool)
+    for prefix in prefixes:
+        candidates = np.flatnonzero(first == prefix[0])
+        match = np.ones(len(candidates), dtype=bool)
+        for offset, byte in enumerate(prefix[1:], 1):
+            match &= raw[starts[candidates] + offset] == byte
+        found[candidates[match]] = True
+    return found
+
+
+def _parse_numbers(
+    raw: np.ndarray, codes: np.ndarray, starts: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Parse the numbers from starts to the end of their words, and which were
+    plain decimals.
+
+    A plain decimal has an optional sign, digits and at most one point, at most
+    MAX_DIGITS digits and at most MAX_WIDTH characters. Other numbers get NaN.
+    """
+    first = raw[starts]
+    negative = first == ord("-")
+    positions = starts + (negative | (first == ord("+")))
+
+    count = len(starts)
+    integer = np.zeros(count)
+    digits = np.zeros(count, dtype=np.int64)
+    decimals = np.zeros(count, dtype=np.int64)
+    points = np.zeros(count, dtype=np.int64)
+    others = np.zeros(count, dtype=bool)
+    ended = np.zeros(count, dtype=bool)
+    for _ in range(MAX_WIDTH + 1):
+        code = codes[positions]
+        ended |= code >= SPACE
+        if ended.all():
+            break
+        is_digit = code < 10
+        np.multiply(integer, 10.0, out=integer, where=is_digit)
+        np.add(integer, code, out=integer, where=is_digit)
+        digits += is_digit
+        decimals += is_digit & (points > 0)
+        points += code == POINT
+        others |= (code == OTHER) | (code == LETTER)
+        # Ended numbers stay at the whitespace after them
+        positions += ~ended
+
+    valid = (
+        ended & ~others & (points <= 1) & (digits > 0) & (digits <= MAX_DIGITS)
+    )
+    values = integer / _POWERS[np.minimum(decimals, MAX_DIGITS)]
+    np.negative(values, out=values, where=negative)
+    values[~valid] = np.nan
+    return values, valid
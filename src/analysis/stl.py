@@ -0,0 +1,168 @@
+"""STL models, binary or ASCII, measured without slicing.
+
+A binary STL is an 80 byte header, a triangle count and a 50 byte record per
+triangle: a normal, three corners and an attribute. Bytes after the records,
+which some exporters write, are ignored. The file is memory-mapped
+and the records are viewed as a structured NumPy array, so they are not copied,
+only a batch of TRIANGLE_BATCH triangles is converted to float64 at a time.
+
+An ASCII STL is read in full, its vertex lines are picked out with a regular
+expression and their coordinates are parsed by NumPy.
+
+STL has no units, coordinates are taken to be millimeters.
+"""
+
+import mmap
+import os
+import re
+import struct
+from typing import Callable
+
+import numpy as np
+
+from .material import MaterialOptions
+from .threemf import TRIANGLE_BATCH, MeshStats, measure_triangles
+from .voxels import estimate_material
+
+HEADER_SIZE = 80
+COUNT = struct.Struct("<I")
+RECORD = np.dtype(
+    [("normal", "<f4", (3,)), ("corners", "<f4", (3, 3)), ("attribute", "<u2")]
+)
+PROGRESS_TRIANGLES = 1 << 20  # triangles measured between progress reports
+ASCII_VERTEX = re.compile(rb"vertex([^\n]*)")
+ASCII_SNIFF_SIZE = 1024  # bytes searched for the keywords of an ASCII STL
+
+
+class StlFile:
+    """The triangles of an STL file, as an (n, 3, 3) array of their corners.
+
+    Binary files are memory-mapped, the corners are a float32 view on the map
+    until the file is closed. ASCII files are parsed to float64 corners.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.binary = False
+        self._map = None
+        with open(path, "rb") as file:
+            head = file.read(ASCII_SNIFF_SIZE)
+            binary_size = None
+            if len(head) >= HEADER_SIZE + COUNT.size:
+                (count,) = COUNT.unpack_from(head, HEADER_SIZE)
+                binary_size = HEADER_SIZE + COUNT.size + count * RECORD.itemsize
+            # ASCII files start with solid, but so do some binary ones
+            ascii = head.lstrip().startswith(b"solid") and (
+                b"facet" in head or b"endsolid" in head
+            )
+            if binary_size is not None and (
+                self.size == binary_size or (self.size > binary_size and not ascii)
+            ):
+                self.binary = True
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._records = np.frombuffer(
+                    self._map, RECORD, count, offset=HEADER_SIZE + COUNT.size
+                )
+                self.corners = self._records["corners"]
+            elif ascii:
+                file.seek(0)
+                self.corners = _parse_ascii(file.read(), path)
+            else:
+                raise ValueError(f"{path} is not an STL file, or it is truncated")
+        if not len(self.corners):
+            self.close()
+            raise ValueError(f"{path} has no triangles")
+
+    def __enter__(self) -> "StlFile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.corners)
+
+    def close(self):
+        """Release the corners and close the map of a binary file.
+
+        Raises BufferError while arrays on the corners are still referenced.
+        """
+        self.corners = None
+        if self._map is not None and not self._map.closed:
+            self._records = None
+            self._map.close()
+
+    def measure(
+        self,
+        progress: Callable[[int, int], None] = None,
+        material: MaterialOptions = None,
+    ) -> MeshStats:
+        """Compute the volume, area, bed area and bounding box of the model.
+
+        progress is called with the bytes of the triangles measured and the file
+        size, every PROGRESS_TRIANGLES triangles and at the end. With material
+        options, the shell and infill volume are estimated too.
+        """
+        corners = self.corners
+        stats = MeshStats(items=1, triangles=len(corners), bytes_read=self.size)
+        if not len(corners):
+            return stats
+        # The lowest Z first, the faces at it are the bed area
+        bed_z = float(corners[:, :, 2].min())
+        low = np.full(3, np.inf)
+        high = np.full(3, -np.inf)
+        record_size = RECORD.itemsize if self.binary else self.size / len(corners)
+        for start in range(0, len(corners), TRIANGLE_BATCH):
+            end = min(start + TRIANGLE_BATCH, len(corners))
+            volume, area, bed_area, batch_low, batch_high = measure_triangles(
+                corners[start:end], bed_z
+            )
+            stats.volume += volume
+            stats.surface_area += area
+            stats.bed_area += bed_area
+            low = np.minimum(low, batch_low)
+            high = np.maximum(high, batch_high)
+            if progress and (
+                end % PROGRESS_TRIANGLES < TRIANGLE_BATCH or end == len(corners)
+            ):
+                progress(int(end * record_size), self.size)
+        stats.bbox_min = tuple(float(value) for value in low)
+        stats.bbox_max = tuple(float(value) for value in high)
+        if material is not None:
+            stats.shell_volume, stats.infill_volume = estimate_material(
+                (
+                    corners[start : start + TRIANGLE_BATCH]
+                    for start in range(0, len(corners), TRIANGLE_BATCH)
+                ),
+                low,
+                high,
+                stats.volume,
+                material,
+            )
+        return stats
+
+
+def _parse_ascii(data: bytes, path: str) -> np.ndarray:
+    """Get the corners of the facets of an ASCII STL."""
+    vertices = ASCII_VERTEX.findall(data)
+    if len(vertices) % 3:
+        raise ValueError(f"{path} has a facet without three vertices")
+    try:
+        # NumPy parses all the coordinates in one go
+        coordinates = np.fromstring(b" ".join(vertices), dtype=np.float64, sep=" ")
+    except ValueError as e:
+        raise ValueError(f"{path} has an invalid vertex: {e}") from e
+    if len(coordinates) != 3 * len(vertices):
+        raise ValueError(f"{path} has a vertex without three numbers")
+    return coordinates.reshape(-1, 3, 3)
+
+
+def analyze_stl(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    material: MaterialOptions = None,
+) -> MeshStats:
+    """Measure the model in an STL file, see StlFile.measure."""
+    with StlFile(path) as stl:
+        return stl.measure(progress, material)
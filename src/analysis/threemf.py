@@ -0,0 +1,396 @@
+import zipfile
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Iterator
+from xml.etree import ElementTree
+
+import numpy as np
+
+from .gcode import CHUNK_SIZE
+from .material import MaterialOptions
+from .opc import OpcPackage, normalize_part_name
+from .voxels import estimate_material
+
+MODEL_PART = "3D/3dmodel.model"
+MODEL_RELATIONSHIP = "http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"
+CORE_NAMESPACE = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+PRODUCTION_NAMESPACE = "http://schemas.microsoft.com/3dmanufacturing/production/2015/06"
+TRIANGLE_BATCH = 1 << 14  # triangles per vectorized batch, fits in the CPU cache
+BED_TOLERANCE = 1e-3  # mm above the lowest point that still rests on the bed
+MAX_COMPONENT_DEPTH = 32
+
+# Millimeters per model unit
+UNITS = {
+    "micron": 0.001,
+    "millimeter": 1.0,
+    "centimeter": 10.0,
+    "inch": 25.4,
+    "foot": 304.8,
+    "meter": 1000.0,
+}
+
+MODEL = f"{{{CORE_NAMESPACE}}}model"
+OBJECT = f"{{{CORE_NAMESPACE}}}object"
+VERTICES = f"{{{CORE_NAMESPACE}}}vertices"
+VERTEX = f"{{{CORE_NAMESPACE}}}vertex"
+TRIANGLES = f"{{{CORE_NAMESPACE}}}triangles"
+TRIANGLE = f"{{{CORE_NAMESPACE}}}triangle"
+COMPONENT = f"{{{CORE_NAMESPACE}}}component"
+ITEM = f"{{{CORE_NAMESPACE}}}item"
+PATH = f"{{{PRODUCTION_NAMESPACE}}}path"
+
+# Objects are identified by model part and object id
+ObjectKey = tuple[str, str]
+
+
+@dataclass
+class Mesh:
+    """A triangle mesh as compact arrays, in model units."""
+
+    vertices: np.ndarray  # (n, 3) float64 coordinates
+    triangles: np.ndarray  # (m, 3) int32 vertex indices
+
+
+@dataclass
+class MeshStats:
+    """Geometry of all build items of a model, in millimeters."""
+
+    volume: float = 0.0  # mm³, signed, negative for inside out meshes
+    surface_area: float = 0.0  # mm²
+    bed_area: float = 0.0  # mm², of the faces resting on the bed, which stick to it
+    # mm³ of walls, top and bottom and of infill, when the material is estimated
+    shell_volume: float | None = None
+    infill_volume: float | None = None
+    bbox_min: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    bbox_max: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    triangles: int = 0  # of all build items, instances counted every time
+    items: int = 0
+    bytes_read: int = 0
+
+    @property
+    def size(self) -> tuple[float, float, float]:
+        """Width, depth and height of the bounding box."""
+        return tuple(high - low for low, high in zip(self.bbox_min, self.bbox_max))
+
+    @property
+    def footprint(self) -> float:
+        """mm² of the bed taken by the model, the XY extent of its bounding box."""
+        width, depth, _ = self.size
+        return width * depth
+
+    @property
+    def material_volume(self) -> float | None:
+        """mm³ of shell and infill, None when the material is not estimated."""
+        if self.shell_volume is None:
+            return None
+        return self.shell_volume + self.infill_volume
+
+
+def parse_transform(value: str | None) -> np.ndarray:
+    """Parse a 3MF transform into a 4x4 matrix for row vectors, p' = [p 1] @ M."""
+    matrix = np.identity(4)
+    if value:
+        numbers = [float(number) for number in value.split()]
+        if len(numbers) != 12:
+            raise ValueError(f"A transform needs 12 numbers, got {value!r}")
+        matrix[:, :3] = np.reshape(numbers, (4, 3))
+    return matrix
+
+
+class ThreeMfPackage(OpcPackage):
+    """A 3D Manufacturing Format package.
+
+    Model parts are parsed incrementally with a pull parser. Vertices and
+    triangles go straight into typed arrays and their elements are cleared once
+    read, so no tree of the model is kept. Parts referenced by components of the
+    production extension are parsed when a build item needs them.
+    """
+
+    FORMAT = "3MF"
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.unit = 1.0  # mm per model unit, of the root model
+        self.bytes_read = 0
+        self.objects: dict[ObjectKey, Mesh | list[tuple[ObjectKey, np.ndarray]]] = {}
+        self.items: list[tuple[ObjectKey, np.ndarray]] = []
+        self._parsed_parts: set[str] = set()
+        self._progress: Callable[[int, int], None] = None
+
+    @property
+    def model_part(self) -> str:
+        """The name of the root model part."""
+        return self.relationships.get(MODEL_RELATIONSHIP, MODEL_PART)
+
+    @property
+    def model_size(self) -> int:
+        """Uncompressed size of all model parts, for progress reports."""
+        return sum(
+            info.file_size
+            for name, info in self.parts.items()
+            if name.endswith(".model")
+        )
+
+    def analyze(
+        self,
+        progress: Callable[[int, int], None] = None,
+        material: MaterialOptions = None,
+    ) -> MeshStats:
+        """Parse the model and measure all build items.
+
+        progress is called with the model bytes read and the size of all models.
+        With material options, the shell and infill volume are estimated too.
+        """
+        self._progress = progress
+        try:
+            self._parse_part(normalize_part_name(self.model_part))
+            return self._measure(material)
+        except (zipfile.BadZipFile, zlib.error) as e:
+            raise ValueError(f"{self.path} has a corrupt model part: {e}") from e
+        except ElementTree.ParseError as e:
+            raise ValueError(f"{self.path} has an invalid model: {e}") from e
+        finally:
+            self._progress = None
+
+    def _parse_part(self, part: str):
+        """Parse the objects and build items of a model part."""
+        if part in self._parsed_parts:
+            return
+        self._parsed_parts.add(part)
+        is_root = part == normalize_part_name(self.model_part)
+        try:
+            stream = self.open_part(part)
+        except KeyError:
+            raise ValueError(f"{self.path} has no {part} part") from None
+
+        total = self.model_size
+        parser = ElementTree.XMLPullParser(events=("start", "end"))
+        handle_events = self._make_event_handler(part, is_root)
+        with stream:
+            while chunk := stream.read(CHUNK_SIZE):
+                self.bytes_read += len(chunk)
+                parser.feed(chunk)
+                handle_events(parser.read_events())
+                if self._progress:
+                    self._progress(self.bytes_read, total)
+        parser.close()
+        handle_events(parser.read_events())
+
+    def _make_event_handler(self, part: str, is_root: bool):
+        """Make a handler for the parser events of one model part.
+
+        The state of the object being parsed lives in the closure, so the
+        handler can be called with the events of every chunk. Part names are
+        normalized, see normalize_part_name.
+        """
+        objects, items = self.objects, self.items
+        container: ElementTree.Element = None
+        vertices = array("d")
+        triangles = array("i")
+        components: list[tuple[ObjectKey, np.ndarray]] = []
+
+        def reference(element: ElementTree.Element) -> tuple[ObjectKey, np.ndarray]:
+            path = element.get(PATH)
+            key = (normalize_part_name(path) if path else part, element.get("objectid"))
+            return key, parse_transform(element.get("transform"))
+
+        def handle_events(events: Iterator[tuple[str, ElementTree.Element]]):
+            nonlocal container, vertices, triangles, components
+            for event, element in events:
+                tag = element.tag
+                if event == "end":
+                    if tag == VERTEX:
+                        attributes = element.attrib
+                        vertices.append(float(attributes["x"]))
+                        vertices.append(float(attributes["y"]))
+                        vertices.append(float(attributes["z"]))
+                    elif tag == TRIANGLE:
+                        attributes = element.attrib
+                        triangles.append(int(attributes["v1"]))
+                        triangles.append(int(attributes["v2"]))
+                        triangles.append(int(attributes["v3"]))
+                    elif tag == COMPONENT:
+                        components.append(reference(element))
+                    elif tag == OBJECT:
+                        key = (part, element.get("id"))
+                        if vertices:
+                            objects[key] = _make_mesh(vertices, triangles)
+                        else:
+                            objects[key] = components
+                        vertices, triangles, components = array("d"), array("i"), []
+                        element.clear()
+                    elif tag == ITEM and is_root:
+                        items.append(reference(element))
+                elif tag == VERTICES or tag == TRIANGLES:
+                    container = element
+                elif tag == MODEL and is_root:
+                    unit = element.get("unit", "millimeter")
+                    if unit not in UNITS:
+                        raise ValueError(f"Unknown 3MF unit {unit}")
+                    self.unit = UNITS[unit]
+            # Drop the vertex and triangle elements read so far, the container
+            # would keep them alive until the end of the mesh
+            if container is not None:
+                container.clear()
+
+        return handle_events
+
+    def _resolve(
+        self, key: ObjectKey, matrix: np.ndarray, depth: int = 0
+    ) -> Iterator[tuple[Mesh, np.ndarray]]:
+        """Get the meshes of an object with their transforms to build space."""
+        if depth > MAX_COMPONENT_DEPTH:
+            raise ValueError(f"Components of object {key[1]} are nested too deep")
+        if key not in self.objects:
+            self._parse_part(key[0])
+        try:
+            resource = self.objects[key]
+        except KeyError:
+            raise ValueError(f"Object {key[1]} does not exist in {key[0]}") from None
+
+        if isinstance(resource, Mesh):
+            yield resource, matrix
+            return
+        for component_key, component_matrix in resource:
+            yield from self._resolve(
+                component_key, component_matrix @ matrix, depth + 1
+            )
+
+    def _measure(self, material: MaterialOptions = None) -> MeshStats:
+        """Compute the volume, area and bounding box of all build items."""
+        stats = MeshStats(items=len(self.items))
+        low = np.full(3, np.inf)
+        high = np.full(3, -np.inf)
+        bed_areas = []  # bed area and lowest Z of every mesh
+        for key, item_matrix in self.items:
+            for mesh, matrix in self._resolve(key, item_matrix):
+                volume, area, bed_area, mesh_low, mesh_high = measure_mesh(
+                    mesh, matrix, self.unit
+                )
+                stats.volume += volume
+                stats.surface_area += area
+                stats.triangles += len(mesh.triangles)
+                bed_areas.append((bed_area, mesh_low[2]))
+                low = np.minimum(low, mesh_low)
+                high = np.maximum(high, mesh_high)
+        # Only meshes at the lowest Z rest on the bed
+        stats.bed_area = sum(
+            bed_area
+            for bed_area, mesh_z in bed_areas
+            if mesh_z <= low[2] + BED_TOLERANCE
+        )
+        if stats.triangles:
+            stats.bbox_min = tuple(float(value) for value in low)
+            stats.bbox_max = tuple(float(value) for value in high)
+            if material is not None:
+                stats.shell_volume, stats.infill_volume = estimate_material(
+                    self._corners(), low, high, stats.volume, material
+                )
+        stats.bytes_read = self.bytes_read
+        return stats
+
+    def _corners(self) -> Iterator[np.ndarray]:
+        """The corners of the triangles of all build items, in batches, in mm."""
+        for key, item_matrix in self.items:
+            for mesh, matrix in self._resolve(key, item_matrix):
+                points = transform_points(mesh, matrix, self.unit)
+                for start in range(0, len(mesh.triangles), TRIANGLE_BATCH):
+                    yield points[mesh.triangles[start : start + TRIANGLE_BATCH]]
+
+
+def _make_mesh(vertices: array, triangles: array) -> Mesh:
+    """Wrap the typed arrays of an object in NumPy arrays, without copying."""
+    mesh = Mesh(
+        np.frombuffer(vertices, dtype=np.float64).reshape(-1, 3),
+        np.frombuffer(triangles, dtype=np.int32).reshape(-1, 3),
+    )
+    if len(mesh.triangles) and (
+        mesh.triangles.min() < 0 or mesh.triangles.max() >= len(mesh.vertices)
+    ):
+        raise ValueError("A triangle refers to a vertex that does not exist")
+    return mesh
+
+
+def measure_mesh(
+    mesh: Mesh, matrix: np.ndarray = None, unit: float = 1.0
+) -> tuple[float, float, float, np.ndarray, np.ndarray]:
+    """Get the signed volume, surface area, bed area and bounding box of a mesh.
+
+    The mesh is transformed by matrix and scaled to millimeters by unit, the
+    bed area is that of the faces at its lowest Z, see measure_triangles.
+    Triangles are gathered in batches of TRIANGLE_BATCH to bound the memory of
+    large meshes.
+    """
+    points = transform_points(mesh, matrix, unit)
+    if not len(points):
+        return 0.0, 0.0, 0.0, np.full(3, np.inf), np.full(3, -np.inf)
+
+    low, high = points.min(axis=0), points.max(axis=0)
+    volume = 0.0
+    area = 0.0
+    bed_area = 0.0
+    for start in range(0, len(mesh.triangles), TRIANGLE_BATCH):
+        batch_volume, batch_area, batch_bed_area, _, _ = measure_triangles(
+            points[mesh.triangles[start : start + TRIANGLE_BATCH]], low[2]
+        )
+        volume += batch_volume
+        area += batch_area
+        bed_area += batch_bed_area
+
+    # A mirroring transform turns the triangles inside out
+    if matrix is not None and np.linalg.det(matrix[:3, :3]) < 0:
+        volume = -volume
+    return volume, area, bed_area, low, high
+
+
+def transform_points(
+    mesh: Mesh, matrix: np.ndarray = None, unit: float = 1.0
+) -> np.ndarray:
+    """The vertices of a mesh transformed by matrix, in millimeters."""
+    points = mesh.vertices
+    if matrix is not None:
+        points = points @ matrix[:3, :3] + matrix[3, :3]
+    if unit != 1.0:
+        points = points * unit
+    return points
+
+
+def measure_triangles(
+    corners: np.ndarray, bed_z: float
+) -> tuple[float, float, float, np.ndarray, np.ndarray]:
+    """Get the signed volume, surface area, bed area and bounds of triangles.
+
+    corners is an (n, 3, 3) array of the corners of n triangles. The volume is
+    the sum of the signed volumes of the tetrahedra between the origin and every
+    triangle, v0 . (v1 - v0) x (v2 - v0) / 6. The bed area is that of the
+    triangles with all corners within BED_TOLERANCE of bed_z, which a model at
+    bed_z rests on.
+    """
+    # One row of float64 per corner coordinate, so every operation below runs
+    # over contiguous memory
+    columns = np.ascontiguousarray(corners.reshape(-1, 9).T, dtype=np.float64)
+    x0, y0, z0, x1, y1, z1, x2, y2, z2 = columns
+    ax, ay, az = x1 - x0, y1 - y0, z1 - z0
+    bx, by, bz = x2 - x0, y2 - y0, z2 - z0
+    nx = ay * bz - az * by
+    ny = az * bx - ax * bz
+    nz = ax * by - ay * bx
+    volume = float(x0 @ nx + y0 @ ny + z0 @ nz) / 6.0
+    area = float(np.sqrt(nx * nx + ny * ny + nz * nz).sum()) / 2.0
+    bed_z += BED_TOLERANCE
+    on_bed = (z0 <= bed_z) & (z1 <= bed_z) & (z2 <= bed_z)
+    bed_area = float(np.abs(nz[on_bed]).sum()) / 2.0
+    low = np.array([columns[axis::3].min() for axis in range(3)])
+    high = np.array([columns[axis::3].max() for axis in range(3)])
+    return volume, area, bed_area, low, high
+
+
+def analyze_3mf(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    material: MaterialOptions = None,
+) -> MeshStats:
+    """Measure the models in a 3MF file, see ThreeMfPackage.analyze."""
+    with ThreeMfPackage(path) as package:
+        return package.analyze(progress, material)
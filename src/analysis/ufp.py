@@ -0,0 +1,84 @@
+import zipfile
+import zlib
+from functools import cached_property
+from typing import BinaryIO, Callable
+
+from .gcode import CHUNK_SIZE, GcodeAnalyzer, GcodeStats, analyze_stream
+from .opc import OpcPackage
+
+GCODE_PART = "3D/model.gcode"
+HEADER_LIMIT = 64 * 1024  # bytes of G-code searched for the Griffin header
+
+
+class UfpPackage(OpcPackage):
+    """An Ultimaker Format Package, an OPC (zip) container with G-code.
+
+    The G-code is decompressed while it is streamed to the analyzer, the
+    metadata and thumbnail are only read when a frame needs them.
+    """
+
+    FORMAT = "UFP"
+
+    @cached_property
+    def gcode_info(self) -> zipfile.ZipInfo:
+        """The zip entry of the G-code part."""
+        try:
+            return self.get_part(GCODE_PART)
+        except KeyError:
+            raise ValueError(f"{self.path} has no {GCODE_PART} part") from None
+
+    def open_gcode(self) -> BinaryIO:
+        """Open the G-code part as a stream, decompressed on the fly."""
+        return self._zip.open(self.gcode_info)
+
+    def analyze(
+        self,
+        analyzer: GcodeAnalyzer = None,
+        progress: Callable[[int, int], None] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> GcodeStats:
+        """Stream the G-code part into the analyzer.
+
+        progress is called with the G-code bytes read and the G-code size.
+        """
+        total = self.gcode_info.file_size
+        try:
+            with self.open_gcode() as stream:
+                return analyze_stream(
+                    stream,
+                    analyzer,
+                    progress=(lambda bytes_read: progress(bytes_read, total))
+                    if progress
+                    else None,
+                    chunk_size=chunk_size,
+                )
+        except (zipfile.BadZipFile, zlib.error) as e:
+            raise ValueError(f"{self.path} has a corrupt G-code part: {e}") from e
+
+    @cached_property
+    def metadata(self) -> dict[str, str]:
+        """The Griffin header of the G-code, like PRINT.TIME and material names."""
+        metadata = {}
+        with self.open_gcode() as stream:
+            header = stream.read(HEADER_LIMIT)
+        for line in header.decode("utf-8", errors="replace").splitlines():
+            # The header is the block of comments before the first command
+            if line.startswith(";END_OF_HEADER") or not line.startswith(";"):
+                break
+            if ":" in line:
+                key, value = line[1:].split(":", 1)
+                metadata[key.strip()] = value.strip()
+        return metadata
+
+
+def analyze_ufp(
+    path: str,
+    progress: Callable[[int, int], None] = None,
+    chunk_size: int = CHUNK_SIZE,
+    **analyzer_options,
+) -> GcodeStats:
+    """Analyze the G-code in a UFP package."""
+    with UfpPackage(path) as package:
+        return package.analyze(
+            GcodeAnalyzer(**analyzer_options), progress=progress, chunk_size=chunk_size
+        )
@@ -0,0 +1,327 @@
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from app import AppControllerSkeleton, offload
+from app.events import ControllerEvent, EventPriority, FrameEvent, SettingEvent
+from app.frame_factory import FrameFactory
+from app.settings import IntSliderSettingSkeleton
+
+from analysis import (
+    AnalysisCache,
+    AnalysisCancelled,
+    CacheStats,
+    GcodeStats,
+    MachineLimits,
+    MaterialOptions,
+    analyze_path,
+)
+from quoting import Invoice, JobCost, JobResult, PriceParameters
+
+if TYPE_CHECKING:
+    from analysis.threemf import MeshStats
+
+ACCELERATION_SETTING = "Printer acceleration"
+MAX_SPEED_SETTING = "Printer max speed"
+JUNCTION_SPEED_SETTING = "Printer junction speed"
+WORKERS_SETTING = "Analysis processes"
+WALL_THICKNESS_SETTING = "Wall thickness"
+INFILL_SETTING = "Infill"
+VOXEL_MEMORY_SETTING = "Voxel memory"
+MATERIAL_COST_SETTING = "Material cost"
+MACHINE_RATE_SETTING = "Machine rate"
+PRINTER_POWER_SETTING = "Printer power"
+ENERGY_PRICE_SETTING = "Energy price"
+LABOR_RATE_SETTING = "Labor rate"
+HANDLING_TIME_SETTING = "Handling time"
+MARGIN_SETTING = "Margin"
+
+# Setting name, PriceParameters field and how many setting units make one unit
+PRICE_SETTINGS = (
+    (MATERIAL_COST_SETTING, "material_cost", 1),
+    (MACHINE_RATE_SETTING, "machine_rate", 100),
+    (PRINTER_POWER_SETTING, "printer_power", 1),
+    (ENERGY_PRICE_SETTING, "energy_price", 100),
+    (LABOR_RATE_SETTING, "labor_rate", 1),
+    (HANDLING_TIME_SETTING, "labor_minutes", 1),
+    (MARGIN_SETTING, "margin_percent", 1),
+)
+PRICE_SETTING_NAMES = frozenset(name for name, _, _ in PRICE_SETTINGS)
+
+
+def kinematics_options() -> list[IntSliderSettingSkeleton]:
+    """Settings with the firmware limits used to estimate print time."""
+    defaults = MachineLimits()
+    return [
+        IntSliderSettingSkeleton(
+            ACCELERATION_SETTING, int(defaults.acceleration), 100, 10000
+        ).with_description("Maximum acceleration while printing [mm/s²]"),
+        IntSliderSettingSkeleton(
+            MAX_SPEED_SETTING, int(defaults.max_feed_rate), 10, 1000
+        ).with_description("Maximum speed of the X, Y and Z axes [mm/s]"),
+        IntSliderSettingSkeleton(
+            JUNCTION_SPEED_SETTING, int(defaults.junction_speed), 1, 50
+        ).with_description("Speed at sharp corners, jerk [mm/s]"),
+    ]
+
+
+def machine_limits_from_settings(settings) -> MachineLimits:
+    """Get the machine limits from the settings, defaults for missing settings."""
+    limits = MachineLimits()
+    for name, field in (
+        (ACCELERATION_SETTING, "acceleration"),
+        (MAX_SPEED_SETTING, "max_feed_rate"),
+        (JUNCTION_SPEED_SETTING, "junction_speed"),
+    ):
+        setting = settings.get_setting(name)
+        if setting is not None:
+            setattr(limits, field, float(setting.value))
+    return limits
+
+
+def analysis_options() -> list[IntSliderSettingSkeleton]:
+    """Settings of how files are analyzed."""
+    cores = os.cpu_count() or 1
+    return [
+        IntSliderSettingSkeleton(
+            WORKERS_SETTING, cores, 1, max(cores, 2)
+        ).with_description("Processes a large G-code file is split over"),
+    ]
+
+
+def workers_from_settings(settings) -> int:
+    """Get the number of analysis processes from the settings, 1 if missing."""
+    setting = settings.get_setting(WORKERS_SETTING)
+    return int(setting.value) if setting is not None else 1
+
+
+def material_options() -> list[IntSliderSettingSkeleton]:
+    """Settings of how a model that is not sliced would be printed."""
+    defaults = MaterialOptions()
+    return [
+        IntSliderSettingSkeleton(
+            WALL_THICKNESS_SETTING, round(defaults.wall_thickness * 10), 1, 50
+        ).with_description("Walls, top and bottom of unsliced models [0.1 mm]"),
+        IntSliderSettingSkeleton(
+            INFILL_SETTING, round(defaults.infill * 100), 0, 100
+        ).with_description("Infill inside the walls of unsliced models [%]"),
+        IntSliderSettingSkeleton(
+            VOXEL_MEMORY_SETTING, defaults.memory_budget >> 20, 8, 1024
+        ).with_description("Memory to estimate the walls of a model with [MB]"),
+    ]
+
+
+def material_options_from_settings(settings) -> MaterialOptions:
+    """Get the material options from the settings, defaults for missing settings."""
+    options = MaterialOptions()
+    for name, field, scale in (
+        (WALL_THICKNESS_SETTING, "wall_thickness", 10),
+        (INFILL_SETTING, "infill", 100),
+    ):
+        setting = settings.get_setting(name)
+        if setting is not None:
+            setattr(options, field, float(setting.value) / scale)
+    setting = settings.get_setting(VOXEL_MEMORY_SETTING)
+    if setting is not None:
+        options.memory_budget = int(setting.value) << 20
+    return options
+
+
+def pricing_options() -> list[IntSliderSettingSkeleton]:
+    """Settings with the prices used to quote print jobs."""
+    defaults = PriceParameters()
+    return [
+        IntSliderSettingSkeleton(
+            MATERIAL_COST_SETTING, int(defaults.material_cost), 1, 200
+        ).with_description("Filament cost [per kg]"),
+        IntSliderSettingSkeleton(
+            MACHINE_RATE_SETTING, int(defaults.machine_rate * 100), 0, 1000
+        ).with_description("Printer wear and depreciation [cents per hour]"),
+        IntSliderSettingSkeleton(
+            PRINTER_POWER_SETTING, int(defaults.printer_power), 10, 1000
+        ).with_description("Average power use while printing [W]"),
+        IntSliderSettingSkeleton(
+            ENERGY_PRICE_SETTING, int(defaults.energy_price * 100), 0, 100
+        ).with_description("Electricity price [cents per kWh]"),
+        IntSliderSettingSkeleton(
+            LABOR_RATE_SETTING, int(defaults.labor_rate), 0, 200
+        ).with_description("Cost of work on a print job [per hour]"),
+        IntSliderSettingSkeleton(
+            HANDLING_TIME_SETTING, int(defaults.labor_minutes), 0, 120
+        ).with_description("Work to prepare, remove and pack a print [minutes]"),
+        IntSliderSettingSkeleton(
+            MARGIN_SETTING, int(defaults.margin_percent), 0, 200
+        ).with_description("Margin on top of all costs [%]"),
+    ]
+
+
+def price_parameters_from_settings(settings) -> PriceParameters:
+    """Get the prices from the settings, defaults for missing settings."""
+    parameters = PriceParameters()
+    for name, field, scale in PRICE_SETTINGS:
+        setting = settings.get_setting(name)
+        if setting is not None:
+            setattr(parameters, field, float(setting.value) / scale)
+    return parameters
+
+
+class AnalyzeFileEvent(FrameEvent):
+    """Request to analyze a file."""
+
+    def __init__(self, path: str):
+        super().__init__("AnalyzeFileEvent")
+        self.path = path
+
+
+class AnalysisProgressEvent(ControllerEvent):
+    """Progress of a file analysis. Only the latest progress of a file is kept."""
+
+    priority = EventPriority.LOW
+
+    def __init__(self, path: str, bytes_read: int, total_bytes: int):
+        super().__init__("AnalysisProgressEvent")
+        self.path = path
+        self.bytes_read = bytes_read
+        self.total_bytes = total_bytes
+
+    @property
+    def fraction(self) -> float:
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    def coalesce_key(self):
+        return (AnalysisProgressEvent, self.path)
+
+
+class AnalysisFinishedEvent(ControllerEvent):
+    """The result of a file analysis, G-code stats or mesh stats of a model."""
+
+    def __init__(
+        self,
+        path: str,
+        stats: "GcodeStats | MeshStats",
+        cost: JobCost,
+        cached: bool = False,
+        cache_stats: CacheStats = None,
+    ):
+        super().__init__("AnalysisFinishedEvent")
+        self.path = path
+        self.stats = stats
+        self.cost = cost
+        self.cached = cached
+        self.cache_stats = cache_stats
+
+
+class AnalysisRepricedEvent(ControllerEvent):
+    """The last analyzed file was priced again, after prices changed."""
+
+    def __init__(self, path: str, cost: JobCost):
+        super().__init__("AnalysisRepricedEvent")
+        self.path = path
+        self.cost = cost
+
+    def coalesce_key(self):
+        return (AnalysisRepricedEvent, self.path)
+
+
+class AnalysisFailedEvent(ControllerEvent):
+    """A file could not be analyzed."""
+
+    def __init__(self, path: str, error: str):
+        super().__init__("AnalysisFailedEvent")
+        self.path = path
+        self.error = error
+
+
+class AnalysisController(AppControllerSkeleton):
+    """Analyzes files on a worker thread and reports progress and results.
+
+    Large G-code files are split over the processes of the analysis setting.
+    With a cache, files analyzed before with the same settings are not parsed
+    again. The last file is kept priced, so when only prices change it is priced
+    again without analyzing it.
+    """
+
+    def __init__(self, cache: AnalysisCache = None):
+        self.cache = cache
+        self.invoice: Invoice = None  # of the last analyzed file
+        self._invoice_lock = threading.Lock()
+
+    def init(self):
+        logging.info("AnalysisController initialized")
+
+    @offload()
+    def on_event(self, event):
+        if isinstance(event, SettingEvent):
+            return self._reprice(event)
+        if not isinstance(event, AnalyzeFileEvent):
+            return None
+
+        logging.info(f"Analyzing {event.path}")
+        progress = self._make_progress(event.path)
+        limits = machine_limits_from_settings(FrameFactory.settings)
+        workers = workers_from_settings(FrameFactory.settings)
+        material = material_options_from_settings(FrameFactory.settings)
+        cached = False
+        try:
+            if self.cache is None:
+                stats = analyze_path(
+                    event.path,
+                    progress=progress,
+                    limits=limits,
+                    workers=workers,
+                    material=material,
+                )
+            else:
+                stats, cached = self.cache.analyze(
+                    event.path,
+                    analyze_path,
+                    progress=progress,
+                    limits=limits,
+                    workers=workers,
+                    material=material,
+                )
+                self.cache.flush()
+        except AnalysisCancelled:
+            logging.info(f"Analysis of {event.path} cancelled")
+            return None
+        except (OSError, ValueError) as e:
+            logging.error(f"Error analyzing {event.path}: {e}")
+            return AnalysisFailedEvent(event.path, str(e))
+        except Exception as e:
+            # A reader that fails in an unexpected way must still end the
+            # analysis in the Quote frame
+            logging.exception(f"Unexpected error analyzing {event.path}")
+            return AnalysisFailedEvent(event.path, f"{type(e).__name__}: {e}")
+        invoice = Invoice(price_parameters_from_settings(FrameFactory.settings))
+        result = JobResult(event.path, stats, cached=cached)
+        invoice.add(result)
+        with self._invoice_lock:
+            self.invoice = invoice
+        return AnalysisFinishedEvent(
+            event.path,
+            stats,
+            result.cost,
+            cached=cached,
+            cache_stats=self.cache.stats if self.cache else None,
+        )
+
+    def _reprice(self, event: SettingEvent):
+        if event.setting not in PRICE_SETTING_NAMES:
+            return None
+        with self._invoice_lock:
+            if self.invoice is None:
+                return None
+            parameters = price_parameters_from_settings(FrameFactory.settings)
+            if not self.invoice.reprice(parameters):
+                return None
+            job = self.invoice.jobs[0]
+        return AnalysisRepricedEvent(job.path, job.cost)
+
+    def _make_progress(self, path: str):
+        def progress(bytes_read: int, total_bytes: int):
+            if self.is_cancelled():
+                raise AnalysisCancelled(path)
+            self._push_event(AnalysisProgressEvent(path, bytes_read, total_bytes))
+
+        return progress
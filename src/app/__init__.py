@@ -2,9 +2,11 @@ from .app_controller import AppControllerSkeleton
 from .application import Application
 
 from .app_frame import AppFrameSkeleton
+from .worker_pool import offload
 
 __all__ = [
     "AppControllerSkeleton",
     "Application",
     "AppFrameSkeleton",
+    "offload",
 ]
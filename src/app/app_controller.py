@@ -1,7 +1,10 @@
 from typing import Callable
+import functools
 import logging
+import time
 from abc import ABC, abstractmethod
 from .frame_factory import FrameFactory
+from .worker_pool import WorkerPool, get_pool, is_cancelled
 from .events import (
     AppEvent,
     MenuEvent,
@@ -58,7 +61,11 @@ class AppControlLogicInterface(ABC):
 
 
 class AppControllerSkeleton(AppControlLogicInterface):
-    """A skeleton implementation of the AppControlLogicInterface"""
+    """A skeleton implementation of the AppControlLogicInterface
+
+    on_event can be defined as `async def`, it then runs concurrently on the
+    asyncio event loop of the AppController instead of on the Tk thread.
+    """
 
     def init(self):
         raise NotImplementedError("init method must be implemented in subclasses")
@@ -79,39 +86,85 @@ class AppControllerSkeleton(AppControlLogicInterface):
         else:
             raise ValueError("Event queue is not set in the controller")
 
+    def is_cancelled(self) -> bool:
+        """Check if the offloaded handler that is running was cancelled."""
+        return is_cancelled()
+
+    def __getstate__(self):
+        # Handlers offloaded to the process pool run on a copy of the controller,
+        # the event queue can not be shared with another process.
+        state = self.__dict__.copy()
+        state["event_queue"] = None
+        return state
+
 
 class AppController:
     def __init__(self, frame_manager: FrameManagerInterface, event_queue: EventQueue):
         self.frame_manager = frame_manager
         self.event_queue = event_queue
         self._controllers = []
+        self._workers = WorkerPool(event_queue)
+        self._compile_event_routing()
+
+        # Events are taken from the queue in batches of one lane, and handled
+        # until the time budget of a tick runs out. Whatever is left goes back in
+        # the queue for the next tick.
+        self._time_budget = 20  # milliseconds
+        self.batch_size = 64
 
     def add_controller(self, controller: AppControlLogicInterface):
         controller.set_queue(self.event_queue)
         self._controllers.append(controller)
         controller.init()
+        self._compile_event_routing()
+
+    @property
+    def time_budget(self) -> int:
+        """Get the time budget for handling events per tick in milliseconds."""
+        return self._time_budget
+
+    @time_budget.setter
+    def time_budget(self, value: int):
+        """Set the time budget for handling events per tick in milliseconds."""
+        if value <= 0:
+            raise ValueError("Time budget must be a positive number.")
+        self._time_budget = value
+
+    def shutdown(self):
+        """Cancel offloaded work, shut the worker pools and asyncio loop down."""
+        self._workers.shutdown()
 
     def _handle_menu_event(self, event: MenuEvent):
+        # Work for the frame the user navigates away from is no longer needed
+        self._workers.cancel_all()
+
         # Try to create a new frame based on the menu event
         try:
             new_frame = FrameFactory.create_frame(event.item, self.frame_manager)
             self.frame_manager.frame = new_frame
-            FrameFactory.settings.save_settings()
         except ValueError as e:
             logging.error(
                 f"Error creating frame, event is probably not implemented: {e}"
             )
             self.frame_manager.clear()
 
+    def _handle_setting_event(self, event: SettingEvent):
+        # The settings are written behind, only after they changed
+        FrameFactory.settings.mark_dirty()
+
     def _handle_frame_event(self, event: FrameEvent):
         # Handle frame events, such as switching frames or updating the current frame
         if hasattr(self.frame_manager.frame, "on_event"):
             self.frame_manager.frame.on_event(event)
 
-    def _update_event_handlers(self):
-        """Create a mapping of event types to their handlers."""
+    def _compile_event_routing(self):
+        """Create a mapping of event types to their handlers.
+
+        Only called when the set of controllers changes. The handlers for a
+        concrete event class are resolved lazily by `_get_handlers`.
+        """
         all_controller_handlers = [
-            controller.on_event for controller in self._controllers
+            self._offloaded(controller.on_event) for controller in self._controllers
         ]
 
         self._event_routing: dict[type, list[Callable[[AppEvent], None]]] = {
@@ -120,6 +173,7 @@ class AppController:
                 *all_controller_handlers,
             ],
             SettingEvent: [
+                self._handle_setting_event,
                 *all_controller_handlers,
             ],
             ControllerEvent: [
@@ -129,15 +183,51 @@ class AppController:
                 *all_controller_handlers,
             ],
         }
-
-    def process_events(self):
-        """Process all events currently in the event queue"""
-        self._update_event_handlers()
-
-        available_events = iter(lambda: self.event_queue.get(), None)
-
-        for event in available_events:
-            for event_type, handlers in self._event_routing.items():
-                if isinstance(event, event_type):
-                    for handler in handlers:
-                        handler(event)
+        self._handler_cache: dict[type, tuple[Callable[[AppEvent], None], ...]] = {}
+
+    def _offloaded(
+        self, handler: Callable[[AppEvent], None]
+    ) -> Callable[[AppEvent], None]:
+        """Wrap a handler that is marked with @offload, or is a coroutine function,
+        to run on the worker pool."""
+        pool = get_pool(handler)
+        if pool is None:
+            return handler
+        return functools.partial(self._workers.submit, pool, handler)
+
+    def _get_handlers(self, event_type: type) -> tuple[Callable[[AppEvent], None]]:
+        """Get the handlers for a concrete event class, resolved through its MRO."""
+        handlers = self._handler_cache.get(event_type)
+        if handlers is None:
+            mro = event_type.__mro__
+            handlers = tuple(
+                handler
+                for routed_type, routed_handlers in self._event_routing.items()
+                if routed_type in mro
+                for handler in routed_handlers
+            )
+            self._handler_cache[event_type] = handlers
+        return handlers
+
+    def process_events(self) -> bool:
+        """Process events from the event queue until the time budget runs out.
+
+        Every batch is taken from the highest priority lane that has events, so
+        a higher priority event waits for one batch at most. Events of a batch
+        that are not handled in time are requeued, where newer events can
+        coalesce with them.
+
+        Returns True if events are left over for the next tick.
+        """
+        deadline = time.perf_counter() + self._time_budget / 1000
+        while True:
+            events = self.event_queue.drain_lane(self.batch_size)
+            if not events:
+                return False
+            for index, event in enumerate(events):
+                for handler in self._get_handlers(type(event)):
+                    handler(event)
+
+                if time.perf_counter() >= deadline:
+                    self.event_queue.requeue(events[index + 1 :])
+                    return not self.event_queue.empty()
@@ -29,6 +29,14 @@ class AppFrameInterface(ABC, ctk.CTkFrame):
         """Get the name of the interface. used for buttons"""
         pass
 
+    def on_show(self):
+        """Called when the frame is shown, also when it is reused from the cache."""
+        pass
+
+    def on_hide(self):
+        """Called when the frame is hidden or about to be destroyed."""
+        pass
+
 
 class AppFrameSkeleton(AppFrameInterface):
     """A skeleton implementation of the AppFrameInterface"""
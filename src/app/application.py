@@ -7,20 +7,20 @@ import os
 from app.app_frame import AppFrameInterface
 from .events.app_events import MenuEvent
 from .events.app_event_queue import EventQueue
+from .event_dispatcher import EventDispatcher
 from .frame_factory import FrameFactory
+from .frame_cache import FrameCache
 from app.app_controller import (
     AppControlLogicInterface,
     AppController,
     FrameManagerInterface,
 )
-from .settings.settings_manager import SettingInterface
+from .settings.settings_manager import SettingInterface, SettingsManager
 from .settings.settings_frame import SettingsFrame
 
 
-# setup logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+SETTINGS_FILE = "app_settings.json"
+LOGO_SIZE = 140  # px, width of the logo in the menu
 
 
 class AppTitleBar(ctk.CTkFrame):
@@ -58,7 +58,7 @@ class AppMenu(ctk.CTkFrame):
         self.PADDING = {"padx": 10, "pady": 10}
 
         self.logo_label = ctk.CTkLabel(
-            self, text="", bg_color="transparent", width=140, height=140
+            self, text="", bg_color="transparent", width=LOGO_SIZE, height=LOGO_SIZE
         )
         self.logo_label.pack(side="top", anchor="w", **self.PADDING)
 
@@ -73,9 +73,13 @@ class AppMenu(ctk.CTkFrame):
     def set_logo(self, logo_path: str):
         """Set the logo image for the menu."""
         pil_logo_image = Image.open(logo_path)
+        # Decode a JPEG at a fraction of its size, room for 2x display scaling
+        pil_logo_image.draft("RGB", (2 * LOGO_SIZE, 2 * LOGO_SIZE))
+        pil_logo_image.thumbnail((2 * LOGO_SIZE, 2 * LOGO_SIZE))
         height_ratio = pil_logo_image.height / pil_logo_image.width
         self.logo_image = ctk.CTkImage(
-            light_image=pil_logo_image, size=(140, int(140 * height_ratio))
+            light_image=pil_logo_image,
+            size=(LOGO_SIZE, int(LOGO_SIZE * height_ratio)),
         )
         self.logo_label.configure(image=self.logo_image)
 
@@ -92,15 +96,23 @@ class AppMenu(ctk.CTkFrame):
 
         # Create new buttons
         for item in self.menu_items:
-            button = ctk.CTkButton(
-                self, text=item, command=lambda item=item: self.on_button_click(item)
-            )
-            button.pack(
-                **self.PADDING,
-                fill="x",
-                side="bottom",
-            )
-            self.buttons.append(button)
+            self._add_button(item)
+
+    def add_item(self, item: str):
+        """Add an item to the menu, without rebuilding the other buttons."""
+        self.menu_items.append(item)
+        self._add_button(item)
+
+    def _add_button(self, item: str):
+        button = ctk.CTkButton(
+            self, text=item, command=lambda item=item: self.on_button_click(item)
+        )
+        button.pack(
+            **self.PADDING,
+            fill="x",
+            side="bottom",
+        )
+        self.buttons.append(button)
 
 
 class AppActionFrame(ctk.CTkFrame, FrameManagerInterface):
@@ -117,17 +129,30 @@ class AppActionFrame(ctk.CTkFrame, FrameManagerInterface):
     @frame.setter
     def frame(self, frame: ctk.CTkFrame):
         """Set the current frame."""
+        if frame is self.current_frame:
+            return
         if self.current_frame:
-            self.current_frame.destroy()
+            self._release(self.current_frame)
         self.current_frame = frame
         self.current_frame.pack(fill="both", expand=True)
+        if hasattr(self.current_frame, "on_show"):
+            self.current_frame.on_show()
 
     def clear(self):
         """Clear the current frame."""
         if self.current_frame:
-            self.current_frame.destroy()
+            self._release(self.current_frame)
             self.current_frame = None
 
+    def _release(self, frame: ctk.CTkFrame):
+        """Hide a cached frame so it can be reused, destroy any other frame."""
+        if hasattr(frame, "on_hide"):
+            frame.on_hide()
+        if FrameFactory.is_cached(frame):
+            frame.pack_forget()
+        else:
+            frame.destroy()
+
 
 class Application(ctk.CTkToplevel):
 
@@ -136,15 +161,19 @@ class Application(ctk.CTkToplevel):
         name: str = "MyApplication",
         copyright: str = "Loek © 2025",
         *args,
+        dispatch_mode: str = EventDispatcher.PUSH,
+        settings_file: str = SETTINGS_FILE,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
 
+        # Settings are only read once there is an application, not on import
+        if FrameFactory.settings is None:
+            FrameFactory.set_settings(SettingsManager(settings_file))
+
         self.event_queue = EventQueue()
         FrameFactory.set_event_queue(self.event_queue)
 
-        self._refresh_rate = 100  # milliseconds
-
         # If theme file not found, try to load from PyInstaller bundle
         if hasattr(sys, "_MEIPASS"):
             theme_path = os.path.join(sys._MEIPASS, "assets", "theme.json")
@@ -178,17 +207,26 @@ class Application(ctk.CTkToplevel):
         self.app_frame.grid(row=1, column=1, sticky="nsew")
 
         self._controller = AppController(self.app_frame, self.event_queue)
+        self._dispatcher = EventDispatcher(
+            self,
+            self.event_queue,
+            self._controller.process_events,
+            mode=dispatch_mode,
+            refresh_rate=100,  # milliseconds, only used in poll mode
+        )
 
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
 
         self.add_new_frame("Settings", SettingsFrame)
 
-        self._periodic_task()
+        self._dispatcher.start()
 
     def _on_closing(self):
         """Handle the window closing event."""
         logging.info("Application is closing.")
-        FrameFactory.settings.save_settings()
+        self._dispatcher.stop()
+        self._controller.shutdown()
+        FrameFactory.settings.flush()
         self.quit()
         self.destroy()
 
@@ -196,33 +234,65 @@ class Application(ctk.CTkToplevel):
         self.after(300, lambda: self.iconbitmap(icon_path))
 
     def set_logo(self, logo_path: str):
-        self.menu.set_logo(logo_path)
+        """Set the logo of the menu once the window is shown, decoding it is slow."""
+        self.after_idle(self.menu.set_logo, logo_path)
 
     @property
     def refresh_rate(self) -> int:
-        """Get the refresh rate in milliseconds."""
-        return self._refresh_rate
+        """Get the refresh rate in milliseconds. Only used in poll mode."""
+        return self._dispatcher.refresh_rate
 
     @refresh_rate.setter
     def refresh_rate(self, value: int):
-        """Set the refresh rate in milliseconds."""
-        if value <= 0:
-            raise ValueError("Refresh rate must be a positive integer.")
-        self._refresh_rate = value
-        logging.info(f"Refresh rate set to {self._refresh_rate} milliseconds")
-
-    def _periodic_task(self):
-        """Handle periodic events."""
-        self._controller.process_events()
-        self.after(self._refresh_rate, self._periodic_task)
-
-    def add_new_frame(self, name: str, frame_type: AppFrameInterface):
-        """Add a new frame to the application."""
-        if not issubclass(frame_type, AppFrameInterface):
+        """Set the refresh rate in milliseconds. Only used in poll mode."""
+        self._dispatcher.refresh_rate = value
+        logging.info(f"Refresh rate set to {value} milliseconds")
+
+    @property
+    def time_budget(self) -> int:
+        """Get the time budget for handling events per tick in milliseconds."""
+        return self._controller.time_budget
+
+    @time_budget.setter
+    def time_budget(self, value: int):
+        """Set the time budget for handling events per tick in milliseconds."""
+        self._controller.time_budget = value
+        logging.info(f"Time budget set to {value} milliseconds")
+
+    @property
+    def dispatch_mode(self) -> str:
+        """Get the event dispatch mode, either "push" or "poll"."""
+        return self._dispatcher.mode
+
+    @dispatch_mode.setter
+    def dispatch_mode(self, value: str):
+        """Set the event dispatch mode, either "push" or "poll"."""
+        self._dispatcher.mode = value
+        logging.info(f"Dispatch mode set to {value}")
+
+    def enable_frame_cache(self, max_frames: int = 4, max_weight: int | None = None):
+        """Reuse frames instead of rebuilding them on every visit.
+
+        max_frames limits the number of cached frames, max_weight the estimated
+        number of widgets in them. Least recently used frames are evicted first.
+        """
+        FrameFactory.set_frame_cache(FrameCache(max_frames, max_weight))
+        logging.info(f"Frame cache enabled for {max_frames} frames")
+
+    def add_new_frame(self, name: str, frame_type: type[AppFrameInterface] | str):
+        """Add a new frame to the application.
+
+        frame_type is a frame class, or its dotted path like
+        "quote_frame.QuoteFrame". A path is only imported when the frame is first
+        shown, so its module does not slow down the start of the application.
+        """
+        if isinstance(frame_type, str):
+            if "." not in frame_type:
+                raise ValueError("Frame path must be 'module.Class'")
+        elif not issubclass(frame_type, AppFrameInterface):
             raise ValueError("Frame must be a type of AppFrameInterface")
         FrameFactory.frames[f"{name.lower()}"] = frame_type
-        self.menu.menu_items.append(name)
-        self.menu.create_buttons()
+        self.menu.add_item(name)
         logging.info(f"Added new frame: {name.lower()}")
 
     def add_controller(self, controller: AppControlLogicInterface):
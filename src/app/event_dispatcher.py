@@ -0,0 +1,142 @@
+import logging
+import threading
+import tkinter as tk
+from typing import Callable
+
+from .events import EventQueue
+
+WAKEUP_EVENT = "<<Wakeup>>"
+
+
+class EventDispatcher:
+    """Schedules event processing on the Tk main loop.
+
+    In push mode the event queue wakes the dispatcher up when an event arrives,
+    so events are handled on the next Tk tick and an idle application does not
+    run any periodic work. In poll mode the queue is processed every
+    `refresh_rate` milliseconds, like the application used to do.
+
+    `process_events` returns True when it ran out of time with events left. The
+    dispatcher then continues right after Tk had the chance to redraw.
+
+    A wakeup from another thread, like a worker putting its result, generates
+    the WAKEUP_EVENT virtual event at the tail of the Tk event queue. Tkinter
+    hands that call over to the Tk thread, which then dispatches, so no timer
+    runs while the application is idle. This needs Tcl built with threads,
+    which is the default for the Tcl that ships with Python.
+    """
+
+    PUSH = "push"
+    POLL = "poll"
+    MODES = (PUSH, POLL)
+
+    def __init__(
+        self,
+        widget,
+        event_queue: EventQueue,
+        process_events: Callable[[], bool],
+        mode: str = PUSH,
+        refresh_rate: int = 100,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Dispatch mode must be one of {self.MODES}")
+
+        self._widget = widget
+        self._event_queue = event_queue
+        self._process_events = process_events
+        self._mode = mode
+        self._refresh_rate = refresh_rate
+        self._after_id = None
+        self._bind_id = None
+        self._running = False
+        self._tk_thread: threading.Thread = None
+
+    @property
+    def mode(self) -> str:
+        """Get the dispatch mode."""
+        return self._mode
+
+    @mode.setter
+    def mode(self, value: str):
+        """Set the dispatch mode, restarting the dispatcher if it is running."""
+        if value not in self.MODES:
+            raise ValueError(f"Dispatch mode must be one of {self.MODES}")
+        running = self._running
+        self.stop()
+        self._mode = value
+        if running:
+            self.start()
+
+    @property
+    def refresh_rate(self) -> int:
+        """Get the polling interval in milliseconds."""
+        return self._refresh_rate
+
+    @refresh_rate.setter
+    def refresh_rate(self, value: int):
+        """Set the polling interval in milliseconds."""
+        if value <= 0:
+            raise ValueError("Refresh rate must be a positive integer.")
+        self._refresh_rate = value
+
+    def start(self):
+        """Start dispatching events."""
+        if self._running:
+            return
+        self._running = True
+        self._tk_thread = threading.current_thread()
+        if self._mode == self.PUSH:
+            self._bind_id = self._widget.bind(
+                WAKEUP_EVENT, lambda event: self._dispatch(), add="+"
+            )
+            self._event_queue.set_wakeup(self._on_wakeup)
+            # Handle anything that was queued before the dispatcher started
+            self._on_wakeup()
+        else:
+            self._poll()
+        logging.debug(f"Event dispatcher started in {self._mode} mode")
+
+    def stop(self):
+        """Stop dispatching events."""
+        self._running = False
+        self._event_queue.set_wakeup(None)
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+            self._after_id = None
+        if self._bind_id is not None:
+            self._widget.unbind(WAKEUP_EVENT, self._bind_id)
+            self._bind_id = None
+
+    def _on_wakeup(self):
+        """Called by the event queue when an event arrives in an idle queue.
+
+        Called from whichever thread put the event.
+        """
+        if threading.current_thread() is self._tk_thread:
+            self._widget.after(0, self._dispatch)
+            return
+        try:
+            self._widget.event_generate(WAKEUP_EVENT, when="tail")
+        except (RuntimeError, tk.TclError) as e:
+            # The Tk main loop did not start yet or already ended. Whatever was
+            # queued is handled by the dispatch that start() scheduled.
+            logging.debug(f"Could not wake the event dispatcher up: {e}")
+
+    def _dispatch(self):
+        if not self._running:
+            return
+        self._event_queue.acknowledge_wakeup()
+        if self._process_events():
+            self._continue()
+
+    def _poll(self):
+        self._after_id = None
+        if not self._running:
+            return
+        if self._process_events():
+            self._continue()
+        self._after_id = self._widget.after(self._refresh_rate, self._poll)
+
+    def _continue(self):
+        """Dispatch the left over events once Tk has handled its idle tasks."""
+        self._widget.after_idle(self._widget.after, 0, self._dispatch)
@@ -1,6 +1,7 @@
-from .app_event_queue import EventQueue
+from .app_event_queue import EventQueue, EventQueueStats
 from .app_events import (
     AppEvent,
+    EventPriority,
     MenuEvent,
     ControllerEvent,
     FrameEvent,
@@ -9,7 +10,9 @@ from .app_events import (
 
 __all__ = [
     "EventQueue",
+    "EventQueueStats",
     "AppEvent",
+    "EventPriority",
     "MenuEvent",
     "ControllerEvent",
     "FrameEvent",
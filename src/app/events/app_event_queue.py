@@ -1,23 +1,165 @@
-import queue
 import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
 
-from .app_events import AppEvent
+from .app_events import AppEvent, EventPriority
+
+
+@dataclass
+class EventQueueStats:
+    """Counters of the event queue."""
+
+    queued: int = 0  # Events put in the queue
+    coalesced: int = 0  # Events that replaced an older event with the same key
+    dropped: int = 0  # Events dropped because their lane was full
+    dispatched: int = 0  # Events taken from the queue
 
 
 class EventQueue:
-    def __init__(self):
-        self.queue = queue.Queue()
+    """A thread safe event queue with priority lanes and event coalescing.
+
+    Events are dispatched lane by lane, in order of `AppEvent.priority`. An event
+    with a `coalesce_key` replaces a queued event with the same key in place. A
+    lane can be limited in size, in which case its oldest event is dropped.
+    """
+
+    def __init__(self, max_lane_size: dict[EventPriority, int] | None = None):
+        # Every queued event is stored in a cell [event, coalesce_key], so a
+        # newer event can replace it without searching the lane.
+        self._lanes: list[deque[list]] = [deque() for _ in EventPriority]
+        self._max_lane_size = {
+            priority: (max_lane_size or {}).get(priority) for priority in EventPriority
+        }
+        if any(size is not None and size < 1 for size in self._max_lane_size.values()):
+            raise ValueError("Lane sizes must be positive integers.")
+        self._coalesce_index: dict = {}
+        self._size = 0
+        self._stats = EventQueueStats()
+        self._lock = threading.Lock()
+
+        # Optional callback used to wake up the consumer when an event arrives.
+        # Repeated puts are coalesced into a single wakeup until the consumer
+        # acknowledges it.
+        self._wakeup: Callable[[], None] = None
+        self._wakeup_pending = False
+
+    @property
+    def stats(self) -> EventQueueStats:
+        """Get a copy of the queue counters."""
+        with self._lock:
+            return EventQueueStats(**self._stats.__dict__)
+
+    def set_wakeup(self, wakeup: Callable[[], None] | None):
+        """Set the callback that is called when an event is put in an idle queue."""
+        with self._lock:
+            self._wakeup = wakeup
+            self._wakeup_pending = False
+
+    def acknowledge_wakeup(self):
+        """Allow the next put to trigger a new wakeup. Call before draining."""
+        with self._lock:
+            self._wakeup_pending = False
 
     def put(self, event: AppEvent):
         """Put an event in the queue."""
-        self.queue.put(event)
+        key = event.coalesce_key()
+        with self._lock:
+            self._stats.queued += 1
+            cell = self._coalesce_index.get(key) if key is not None else None
+            if cell is not None:
+                cell[0] = event
+                self._stats.coalesced += 1
+            else:
+                self._append(event, key)
+            wakeup = self._claim_wakeup()
         logging.debug(f"Event {event} added to the queue.")
+        if wakeup:
+            wakeup()
 
     def get(self):
         """Get an event from the queue."""
-        try:
-            event = self.queue.get_nowait()
-            logging.debug(f"Event {event} retrieved from the queue.")
-            return event
-        except queue.Empty:
+        events = self.drain(1)
+        return events[0] if events else None
+
+    def drain(self, max_items: int | None = None) -> list[AppEvent]:
+        """Get up to max_items events from the queue at once, all if None."""
+        events = []
+        with self._lock:
+            remaining = self._size if max_items is None else min(max_items, self._size)
+            for lane in self._lanes:
+                while lane and remaining:
+                    event, key = lane.popleft()
+                    if key is not None:
+                        del self._coalesce_index[key]
+                    events.append(event)
+                    remaining -= 1
+            self._size -= len(events)
+            self._stats.dispatched += len(events)
+        logging.debug(f"{len(events)} events drained from the queue.")
+        return events
+
+    def drain_lane(self, max_items: int) -> list[AppEvent]:
+        """Get up to max_items events at once from the highest non-empty lane."""
+        events = []
+        with self._lock:
+            for lane in self._lanes:
+                if lane:
+                    for _ in range(min(max_items, len(lane))):
+                        event, key = lane.popleft()
+                        if key is not None:
+                            del self._coalesce_index[key]
+                        events.append(event)
+                    break
+            self._size -= len(events)
+            self._stats.dispatched += len(events)
+        logging.debug(f"{len(events)} events drained from the queue.")
+        return events
+
+    def requeue(self, events: list[AppEvent]):
+        """Put drained events that were not handled back in front of their lanes.
+
+        An event for which a newer event with the same coalesce key was queued in
+        the meantime is dropped, the newer one replaces it.
+        """
+        with self._lock:
+            for event in reversed(events):
+                key = event.coalesce_key()
+                if key is not None and key in self._coalesce_index:
+                    self._stats.coalesced += 1
+                    continue
+                cell = [event, key]
+                self._lanes[event.priority].appendleft(cell)
+                if key is not None:
+                    self._coalesce_index[key] = cell
+                self._size += 1
+                self._stats.dispatched -= 1
+
+    def empty(self) -> bool:
+        """Check if the queue is empty."""
+        return not self._size
+
+    def _append(self, event: AppEvent, key):
+        """Append an event to its lane, dropping the oldest if full. Hold the lock."""
+        lane = self._lanes[event.priority]
+        max_size = self._max_lane_size[event.priority]
+        if max_size is not None and len(lane) >= max_size:
+            _, dropped_key = lane.popleft()
+            if dropped_key is not None:
+                del self._coalesce_index[dropped_key]
+            self._size -= 1
+            self._stats.dropped += 1
+
+        cell = [event, key]
+        lane.append(cell)
+        if key is not None:
+            self._coalesce_index[key] = cell
+        self._size += 1
+
+    def _claim_wakeup(self) -> Callable[[], None] | None:
+        """Return the wakeup callback once for a burst of puts. Hold the lock."""
+        if self._wakeup is None or self._wakeup_pending:
             return None
+        self._wakeup_pending = True
+        return self._wakeup
@@ -1,4 +1,14 @@
 from abc import ABC
+from enum import IntEnum
+from typing import Hashable
+
+
+class EventPriority(IntEnum):
+    """The lane an event is queued in. Lower values are dispatched first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
 
 
 class AppEvent(ABC):
@@ -6,12 +16,24 @@ class AppEvent(ABC):
     It is an abstract base class that defines the methods that must be implemented by all events.
     """
 
+    priority: EventPriority = EventPriority.NORMAL
+
+    def coalesce_key(self) -> Hashable | None:
+        """Key of the event for coalescing in the queue.
+
+        A queued event that was not dispatched yet is replaced by a newer event
+        with the same key. None means the event is never coalesced.
+        """
+        return None
+
 
 class MenuEvent(AppEvent):
     """An event that is triggered by the menu. This class is used to define the interface for all menu events in the application.
     It is an abstract base class that defines the methods that must be implemented by all menu events.
     """
 
+    priority = EventPriority.HIGH
+
     def __init__(self, menu_item: str):
         self.item = menu_item
 
@@ -42,3 +64,7 @@ class SettingEvent(AppEvent):
     def __init__(self, setting, value):
         self.setting = setting
         self.value = value
+
+    def coalesce_key(self) -> Hashable | None:
+        """Only the last value of a setting matters."""
+        return (SettingEvent, self.setting)
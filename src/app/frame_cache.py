@@ -0,0 +1,96 @@
+import logging
+from collections import OrderedDict
+
+import customtkinter as ctk
+
+# Generated by a frame that added or removed widgets, so its weight is estimated
+# again: frame.event_generate(FRAME_CHANGED)
+FRAME_CHANGED = "<<FrameChanged>>"
+
+
+def estimate_weight(widget) -> int:
+    """Estimate the weight of a frame as the number of widgets it contains."""
+    return 1 + sum(estimate_weight(child) for child in widget.winfo_children())
+
+
+class FrameCache:
+    """A least recently used cache of frame instances.
+
+    Cached frames are hidden with pack_forget instead of being destroyed, so
+    visiting a frame again does not rebuild its widgets. When the cache holds
+    more than max_frames frames, or their estimated weight exceeds max_weight,
+    the least recently used hidden frames are destroyed.
+
+    The weight of a frame is estimated when it is added, and again when it
+    generates FRAME_CHANGED.
+    """
+
+    def __init__(self, max_frames: int = 4, max_weight: int | None = None):
+        if max_frames < 1:
+            raise ValueError("A frame cache must hold at least one frame.")
+        self.max_frames = max_frames
+        self.max_weight = max_weight
+        self._frames: OrderedDict[str, ctk.CTkFrame] = OrderedDict()
+        self._weights: dict[str, int] = {}
+
+    def get(self, key: str) -> ctk.CTkFrame | None:
+        """Get a cached frame and mark it as most recently used."""
+        frame = self._frames.get(key)
+        if frame is not None:
+            if not frame.winfo_exists():
+                self._remove(key)
+                return None
+            self._frames.move_to_end(key)
+        return frame
+
+    def put(self, key: str, frame: ctk.CTkFrame):
+        """Add a frame to the cache, evicting frames when the cache is full."""
+        self._frames[key] = frame
+        self._frames.move_to_end(key)
+        self._weights[key] = estimate_weight(frame)
+        frame.bind(FRAME_CHANGED, lambda _: self._reweigh(key, frame), add="+")
+        self._evict()
+
+    def contains(self, frame: ctk.CTkFrame) -> bool:
+        """Check if a frame instance is cached."""
+        return any(cached is frame for cached in self._frames.values())
+
+    def clear(self):
+        """Destroy all hidden frames in the cache."""
+        for key in list(self._frames):
+            if not self._frames[key].winfo_manager():
+                self._frames[key].destroy()
+            self._remove(key)
+
+    @property
+    def weight(self) -> int:
+        """Get the estimated weight of all cached frames."""
+        return sum(self._weights.values())
+
+    def _is_full(self) -> bool:
+        return len(self._frames) > self.max_frames or (
+            self.max_weight is not None and self.weight > self.max_weight
+        )
+
+    def _evict(self):
+        """Destroy least recently used frames until the cache fits its limits."""
+        most_recent = next(reversed(self._frames), None)
+        for key, frame in list(self._frames.items()):
+            if not self._is_full():
+                break
+            # The newest frame and frames that are packed, on screen, are kept
+            if key == most_recent or frame.winfo_manager():
+                continue
+            logging.debug(f"Evicting frame {key} from the frame cache")
+            frame.destroy()
+            self._remove(key)
+
+    def _reweigh(self, key: str, frame: ctk.CTkFrame):
+        """Estimate the weight of a frame that changed, if it is still cached."""
+        if self._frames.get(key) is frame:
+            self._weights[key] = estimate_weight(frame)
+            self._evict()
+
+    def _remove(self, key: str):
+        self._frames.pop(key, None)
+        self._weights.pop(key, None)
@@ -1,19 +1,51 @@
+import importlib
+import logging
+
 from .app_frame import AppFrameInterface
+from .frame_cache import FrameCache
 from app.settings.settings_manager import SettingsManager
 
 
 class FrameFactory:
 
-    settings = SettingsManager("app_settings.json")
+    settings: SettingsManager = None  # set by the application, see set_settings
     event_queue = None
+    cache: FrameCache = None
+
+    # Frame classes, or dotted paths to them that are imported on first use
+    frames: dict[str, type[AppFrameInterface] | str] = {}
 
-    frames: dict[str, AppFrameInterface] = {}
+    @staticmethod
+    def set_settings(settings: SettingsManager):
+        """Set the settings passed to frames and used by controllers."""
+        FrameFactory.settings = settings
 
     @staticmethod
     def set_event_queue(event_queue):
         """Set the event queue for the factory."""
         FrameFactory.event_queue = event_queue
 
+    @staticmethod
+    def set_frame_cache(cache: FrameCache | None):
+        """Set the cache used to reuse frame instances, None disables caching."""
+        if FrameFactory.cache:
+            FrameFactory.cache.clear()
+        FrameFactory.cache = cache
+
+    @staticmethod
+    def is_cached(frame) -> bool:
+        """Check if a frame instance is owned by the frame cache."""
+        return FrameFactory.cache is not None and FrameFactory.cache.contains(frame)
+
+    @staticmethod
+    def frame_class(frame_type: str) -> type[AppFrameInterface]:
+        """Get the class of a registered frame, importing it if it is a path."""
+        frame_class = FrameFactory.frames[frame_type]
+        if isinstance(frame_class, str):
+            frame_class = import_frame_class(frame_class)
+            FrameFactory.frames[frame_type] = frame_class
+        return frame_class
+
     @staticmethod
     def create_frame(frame_type: str, *args, **kwargs) -> AppFrameInterface:
         if not FrameFactory.event_queue:
@@ -24,6 +56,32 @@ class FrameFactory:
                 f"Frame type '{frame_type}' is not registered in FrameFactory."
             )
 
-        return FrameFactory.frames[frame_type](
+        if FrameFactory.cache:
+            frame = FrameFactory.cache.get(frame_type)
+            if frame is not None:
+                return frame
+
+        frame = FrameFactory.frame_class(frame_type)(
             FrameFactory.settings, FrameFactory.event_queue, *args, **kwargs
         )
+        if FrameFactory.cache:
+            FrameFactory.cache.put(frame_type, frame)
+        return frame
+
+
+def import_frame_class(path: str) -> type[AppFrameInterface]:
+    """Import a frame class by its dotted path, like "quote_frame.QuoteFrame"."""
+    module_name, _, class_name = path.rpartition(".")
+    if not module_name:
+        raise ValueError(f"Frame path '{path}' must be 'module.Class'.")
+    logging.info(f"Importing frame {path}")
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        raise ValueError(f"Could not import frame '{path}': {e}") from e
+    frame_class = getattr(module, class_name, None)
+    if not isinstance(frame_class, type) or not issubclass(
+        frame_class, AppFrameInterface
+    ):
+        raise ValueError(f"'{path}' is not a type of AppFrameInterface")
+    return frame_class
@@ -1,23 +1,212 @@
+import re
+import tkinter
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+
 from app.app_frame import AppFrameSkeleton
+from .settings_manager import SettingInterface
 import customtkinter as ctk
 
 
+class SettingsSearchIndex:
+    """A prefix index over the words in the names and descriptions of settings."""
+
+    WORD_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, settings: dict[str, SettingInterface]):
+        self.names = list(settings)
+
+        postings: dict[str, set[int]] = {}
+        for position, setting in enumerate(settings.values()):
+            text = f"{setting.name} {getattr(setting, 'description', '')}".lower()
+            for word in self.WORD_PATTERN.findall(text):
+                postings.setdefault(word, set()).add(position)
+
+        self._words = sorted(postings)
+        self._postings = [postings[word] for word in self._words]
+
+    def search(self, query: str) -> list[str]:
+        """Get the names of the settings with a word starting with every query word."""
+        query_words = self.WORD_PATTERN.findall(query.lower())
+        if not query_words:
+            return list(self.names)
+
+        result: set[int] = None
+        for query_word in query_words:
+            matches = set()
+            # All words with this prefix are next to each other in the sorted list
+            start = bisect_left(self._words, query_word)
+            for word, positions in zip(self._words[start:], self._postings[start:]):
+                if not word.startswith(query_word):
+                    break
+                matches |= positions
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        return [self.names[position] for position in sorted(result)]
+
+
 class SettingsFrame(AppFrameSkeleton):
+    """A frame that lists all settings, with a search filter.
+
+    The list is virtualized: only rows in or near the viewport have widgets. Rows
+    that scroll out of view are kept in a small pool, so scrolling back reuses
+    their widgets, and are destroyed when the pool is full.
+    """
+
+    ESTIMATED_ROW_HEIGHT = 110
+    ROW_PADDING = 5
+    POOL_SIZE = 20
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # All settings are packed in a scrollable frame
-        self.scrollable_frame = ctk.CTkScrollableFrame(self, width=400, height=300)
-        self.scrollable_frame.pack(fill="both", expand=True)
+        self.search_variable = ctk.StringVar()
+        self.search_entry = ctk.CTkEntry(
+            self, textvariable=self.search_variable, placeholder_text="Search settings"
+        )
+        self.search_entry.pack(fill="x", padx=10, pady=(10, 5))
+        self.search_variable.trace_add("write", lambda *args: self.apply_filter())
 
-        self.setting_frames = []
+        self.list_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.list_frame.pack(fill="both", expand=True)
+
+        self.canvas = ctk.CTkCanvas(
+            self.list_frame,
+            highlightthickness=0,
+            bg=self._apply_appearance_mode(
+                ctk.ThemeManager.theme["CTkFrame"]["fg_color"]
+            ),
+        )
+        self.scrollbar = ctk.CTkScrollbar(self.list_frame, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.bind("<Configure>", lambda event: self._update_viewport())
+        self._bind_mouse_wheel(self.canvas)
+
+        # Rows on the canvas by setting name, with their canvas window ids
+        self.setting_frames: dict[str, tuple[ctk.CTkFrame, int]] = {}
+        # Hidden rows that can be reused when they scroll into view again
+        self._row_pool: OrderedDict[str, ctk.CTkFrame] = OrderedDict()
+        self._row_heights: dict[str, int] = {}
+        self._visible_names: list[str] = []
+        self._offsets: list[int] = [0]
 
         self.refresh()
 
+    def on_show(self):
+        """Rebuild the list when settings were added while the frame was hidden."""
+        if self._index.names != list(self.settings.settings):
+            self.refresh()
+
     def refresh(self):
-        for setting_frame in self.setting_frames:
+        """Rebuild the search index and all rows."""
+        for setting_frame, _ in self.setting_frames.values():
             setting_frame.destroy()
         self.setting_frames.clear()
+        for setting_frame in self._row_pool.values():
+            setting_frame.destroy()
+        self._row_pool.clear()
+        self._row_heights.clear()
+
+        self._index = SettingsSearchIndex(self.settings.settings)
+        self.apply_filter()
+
+    def apply_filter(self):
+        """Show the settings that match the search query."""
+        self._visible_names = self._index.search(self.search_variable.get())
+        self._layout()
+        self.canvas.yview_moveto(0)
+        self._update_viewport()
+
+    def _layout(self):
+        """Compute the offset of every visible row and the scrollable height."""
+        padding = 2 * self.ROW_PADDING
+        heights = (
+            self._row_heights.get(name, self.ESTIMATED_ROW_HEIGHT) + padding
+            for name in self._visible_names
+        )
+        self._offsets = [0, *accumulate(heights)]
+        self.canvas.configure(scrollregion=(0, 0, 0, self._offsets[-1]))
+
+    def _update_viewport(self):
+        """Place the rows in or near the viewport, release all others."""
+        viewport_height = max(self.canvas.winfo_height(), 1)
+        top = self.canvas.canvasy(0)
+        # Build rows one viewport above and below the visible part
+        first = max(bisect_right(self._offsets, top - viewport_height) - 1, 0)
+        last = bisect_left(self._offsets, top + 2 * viewport_height)
+        wanted = self._visible_names[first:last]
+
+        for name in set(self.setting_frames) - set(wanted):
+            self._release_row(name)
+
+        relayout = False
+        width = self.canvas.winfo_width()
+        for position, name in enumerate(wanted, start=first):
+            y = self._offsets[position] + self.ROW_PADDING
+            if name in self.setting_frames:
+                _, window_id = self.setting_frames[name]
+                self.canvas.coords(window_id, self.ROW_PADDING, y)
+                self.canvas.itemconfigure(window_id, width=width - 2 * self.ROW_PADDING)
+                continue
+
+            setting_frame = self._get_row(name)
+            window_id = self.canvas.create_window(
+                self.ROW_PADDING,
+                y,
+                window=setting_frame,
+                anchor="nw",
+                width=width - 2 * self.ROW_PADDING,
+            )
+            self.setting_frames[name] = (setting_frame, window_id)
+
+            height = setting_frame.winfo_reqheight()
+            if self._row_heights.get(name) != height:
+                self._row_heights[name] = height
+                relayout = True
+
+        if relayout:
+            # Measured heights differ from the estimate, place the rows again
+            self._layout()
+            self._update_viewport()
+
+    def _get_row(self, name: str) -> ctk.CTkFrame:
+        """Get the row of a setting from the pool, or build it."""
+        setting_frame = self._row_pool.pop(name, None)
+        if setting_frame is None:
+            setting_frame = self.settings.settings[name].get_frame(self.canvas)
+            setting_frame.update_idletasks()
+            self._bind_mouse_wheel(setting_frame)
+        return setting_frame
+
+    def _release_row(self, name: str):
+        """Remove a row from the canvas and keep its widgets in the pool."""
+        setting_frame, window_id = self.setting_frames.pop(name)
+        self.canvas.delete(window_id)
+        self._row_pool[name] = setting_frame
+        while len(self._row_pool) > self.POOL_SIZE:
+            _, old_frame = self._row_pool.popitem(last=False)
+            old_frame.destroy()
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._update_viewport()
+
+    def _on_mouse_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+        self._update_viewport()
 
-        for name, setting in self.settings.settings.items():
-            setting.get_frame(self.scrollable_frame).pack(fill="x", padx=10, pady=5)
+    def _bind_mouse_wheel(self, widget):
+        """Scroll the list when the mouse wheel is used over a widget or children."""
+        # Bind on the tkinter widgets themselves, CTk widgets forward bind calls
+        # to their internal canvas, which is also one of their children.
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tkinter.Misc.bind(widget, sequence, self._on_mouse_wheel, "+")
+        for child in widget.winfo_children():
+            self._bind_mouse_wheel(child)
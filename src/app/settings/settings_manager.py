@@ -3,10 +3,14 @@ from dataclasses import dataclass
 import os
 import os.path
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
 import customtkinter as ctk
 import queue
 
+from atomic_file import write_json_atomic
+
 
 @dataclass
 class SettingInterface(ABC):
@@ -38,12 +42,24 @@ class SettingInterface(ABC):
 
 
 class SettingsManager:
-    def __init__(self, settings_file):
+    def __init__(self, settings_file, save_delay: float = 1.0):
         self.settings_file = settings_file
         self.settings_raw = {"settings": []}
+        # Raw settings by name, kept in sync with settings_raw
+        self._raw_index: dict[str, dict] = {}
         self.settings: dict[str, SettingInterface] = {}
         self.load_raw_settings()
 
+        # Changes are written behind, save_delay seconds after the last change.
+        # One timer runs for a burst of changes, it waits again when the last
+        # change moved the deadline.
+        self.save_delay = save_delay
+        self._dirty = False
+        self._save_deadline = 0.0
+        self._save_timer: threading.Timer = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # one writer of the file at a time
+
     def add_setting(self, setting: SettingInterface):
         if not isinstance(setting, SettingInterface):
             raise TypeError("Setting must be an instance of SettingInterface.")
@@ -51,14 +67,18 @@ class SettingsManager:
         if setting.name in self.settings:
             raise KeyError(f"Setting '{setting.name}' already exists.")
 
-        if setting.name in [item["name"] for item in self.settings_raw["settings"]]:
+        if setting.name in self._raw_index:
             logging.debug(
                 f"Setting '{setting.name}' already exists in raw settings. Overwriting."
             )
             # Attempt to populate the setting from raw data
             self._try_populate_setting(setting)
+        else:
+            # A new setting is not in the file yet
+            self.mark_dirty()
 
-        self.settings[setting.name] = setting
+        with self._lock:
+            self.settings[setting.name] = setting
 
         logging.debug(f"Added setting: {setting.name}")
 
@@ -66,15 +86,15 @@ class SettingsManager:
         """
         Attemps to populate a setting from raw data.
         """
-        for raw_setting in self.settings_raw["settings"]:
-            if raw_setting["name"] == setting.name:
-                for key, value in raw_setting.items():
-                    if hasattr(setting, key):
-                        setattr(setting, key, value)
-                logging.debug(
-                    f"Populated setting '{setting.name}' from raw data: {raw_setting}"
-                )
-                return
+        raw_setting = self._raw_index.get(setting.name)
+        if raw_setting is None:
+            return
+        for key, value in raw_setting.items():
+            if hasattr(setting, key):
+                setattr(setting, key, value)
+        logging.debug(
+            f"Populated setting '{setting.name}' from raw data: {raw_setting}"
+        )
 
     def load_raw_settings(self):
         try:
@@ -93,25 +113,108 @@ class SettingsManager:
                 "Error decoding JSON from settings file. Starting with empty settings."
             )
             self.settings_raw = {"settings": []}
+        self._index_raw_settings()
+
+    def _index_raw_settings(self):
+        self._raw_index = {
+            raw_setting["name"]: raw_setting
+            for raw_setting in self.settings_raw["settings"]
+        }
 
     @property
     def setting_names(self):
         return list(self.settings.keys())
 
     def create_raw_settings(self):
-        self.settings_raw["settings"] = []
-        for item in self.settings.values():
-            filtered_dict = {
-                k: v
-                for k, v in item.__dict__.items()
-                if isinstance(v, (str, int, float, bool, list))
+        """Take a snapshot of the settings as raw settings."""
+        with self._lock:
+            self.settings_raw = {
+                **self.settings_raw,
+                "settings": [
+                    {
+                        k: list(v) if isinstance(v, list) else v
+                        for k, v in list(item.__dict__.items())
+                        if isinstance(v, (str, int, float, bool, list))
+                    }
+                    for item in list(self.settings.values())
+                ],
             }
-            self.settings_raw["settings"].append(filtered_dict)
+            self._index_raw_settings()
+
+    def mark_dirty(self):
+        """Mark the settings as changed and schedule a write behind."""
+        with self._lock:
+            self._dirty = True
+            self._save_deadline = time.monotonic() + self.save_delay
+            if self._save_timer is None:
+                self._start_save_timer(self.save_delay)
+
+    def _start_save_timer(self, delay: float):
+        """Start the save timer. Hold the lock."""
+        self._save_timer = threading.Timer(delay, self._on_save_timer)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _on_save_timer(self):
+        with self._lock:
+            if self._save_timer is not threading.current_thread():
+                return  # cancelled by a flush
+            remaining = self._save_deadline - time.monotonic()
+            if remaining > 0:
+                self._start_save_timer(remaining)
+                return
+        self.flush()
+
+    @property
+    def dirty(self) -> bool:
+        """Check if there are changes that are not written yet."""
+        return self._dirty
+
+    def flush(self) -> bool:
+        """Write the settings if they changed. Returns True if the file was written.
+
+        The settings are written from a snapshot, taken under the lock, so they
+        can change while the file is written. Snapshots are written in the order
+        they are taken.
+        """
+        with self._write_lock:
+            with self._lock:
+                self._cancel_save_timer()
+                if not self._dirty:
+                    return False
+                self._dirty = False
+
+                previous_settings = self.settings_raw["settings"]
+                self.create_raw_settings()
+                snapshot = self.settings_raw
+                if snapshot["settings"] == previous_settings and os.path.exists(
+                    self.settings_file
+                ):
+                    logging.debug("Settings did not change, not writing settings file.")
+                    return False
+            self._write_settings_file(snapshot)
+            return True
 
     def save_settings(self):
-        self.create_raw_settings()
-        with open(self.settings_file, "w") as file:
-            json.dump(self.settings_raw, file, indent=4)
+        """Write all settings now."""
+        with self._write_lock:
+            with self._lock:
+                self._cancel_save_timer()
+                self._dirty = False
+                self.create_raw_settings()
+                snapshot = self.settings_raw
+            self._write_settings_file(snapshot)
+
+    def _cancel_save_timer(self):
+        """Cancel the save timer. Hold the lock."""
+        if self._save_timer:
+            self._save_timer.cancel()
+            self._save_timer = None
+
+    def _write_settings_file(self, settings_raw: dict):
+        """Write raw settings atomically, see write_json_atomic."""
+        write_json_atomic(self.settings_file, settings_raw, indent=4)
+        logging.debug(f"Settings written to {self.settings_file}")
 
     def get_setting(self, key, default=None) -> SettingInterface:
         return self.settings.get(key, default)
@@ -0,0 +1,183 @@
+import inspect
+import logging
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from .events import ControllerEvent, EventQueue
+
+THREAD = "thread"
+PROCESS = "process"
+ASYNC = "async"
+POOLS = (THREAD, PROCESS, ASYNC)
+
+_task_state = threading.local()
+
+
+def offload(pool: str = THREAD):
+    """Mark a controller event handler to run on the worker pool of the AppController.
+
+    The handler runs on a worker thread, or in a worker process for the process
+    pool. Whatever it returns, a ControllerEvent or an iterable of them, is put in
+    the event queue. Handlers on the process pool run on a copy of the controller
+    without event queue, so they can only report back by returning events.
+    """
+    if pool not in (THREAD, PROCESS):
+        raise ValueError(f"Pool must be one of {(THREAD, PROCESS)}")
+
+    def decorator(handler: Callable) -> Callable:
+        handler._offload_pool = pool
+        return handler
+
+    return decorator
+
+
+def get_pool(handler: Callable) -> str | None:
+    """Get the pool a handler runs on, None if it runs on the Tk thread.
+
+    Coroutine handlers always run on the asyncio event loop.
+    """
+    if inspect.iscoroutinefunction(handler):
+        return ASYNC
+    return getattr(handler, "_offload_pool", None)
+
+
+def is_cancelled() -> bool:
+    """Check if the task running on the current worker thread was cancelled."""
+    cancel_event = getattr(_task_state, "cancel_event", None)
+    return cancel_event is not None and cancel_event.is_set()
+
+
+def _run_thread_task(cancel_event: threading.Event, fn: Callable, *args) -> Any:
+    _task_state.cancel_event = cancel_event
+    try:
+        return fn(*args)
+    finally:
+        _task_state.cancel_event = None
+
+
+class AsyncLoop:
+    """An asyncio event loop running on a background thread.
+
+    Offers the part of the Executor interface the WorkerPool uses, so coroutine
+    handlers run concurrently with each other and with the Tk main loop.
+    """
+
+    def __init__(self):
+        # asyncio is slow to import, only import it for coroutine handlers
+        import asyncio
+
+        self._asyncio = asyncio
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="asyncio", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Schedule the coroutine fn(*args) on the event loop."""
+        return self._asyncio.run_coroutine_threadsafe(fn(*args), self.loop)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Stop the event loop."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if wait:
+            self._thread.join()
+
+    def _run(self):
+        self._asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+
+class WorkerPool:
+    """Runs offloaded handlers on thread and process pools, and coroutine
+    handlers on an asyncio event loop.
+
+    Results are put in the event queue as long as the task was not cancelled.
+    Cancelling removes tasks that did not start yet and asks running thread tasks
+    to stop, which they can check with `is_cancelled`.
+    """
+
+    def __init__(self, event_queue: EventQueue, max_workers: int | None = None):
+        self.event_queue = event_queue
+        self.max_workers = max_workers
+        self._executors: dict[str, Executor | AsyncLoop] = {}
+        self._tasks: dict[Future, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, pool: str, fn: Callable, *args) -> Future:
+        """Run fn(*args) on the given pool and queue the events it returns."""
+        cancel_event = threading.Event()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down")
+            executor = self._get_executor(pool)
+            if pool == THREAD:
+                future = executor.submit(_run_thread_task, cancel_event, fn, *args)
+            else:
+                future = executor.submit(fn, *args)
+            self._tasks[future] = cancel_event
+        future.add_done_callback(self._on_done)
+        return future
+
+    def cancel_all(self):
+        """Cancel all pending and running tasks."""
+        with self._lock:
+            tasks = list(self._tasks.items())
+        for future, cancel_event in tasks:
+            cancel_event.set()
+            future.cancel()
+        if tasks:
+            logging.debug(f"Cancelled {len(tasks)} worker tasks")
+
+    def shutdown(self, wait: bool = False):
+        """Cancel all tasks and shut the pools down."""
+        self.cancel_all()
+        with self._lock:
+            self._closed = True
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _get_executor(self, pool: str) -> Executor | AsyncLoop:
+        """Get the executor of a pool, creating it on first use. Hold the lock."""
+        executor = self._executors.get(pool)
+        if executor is None:
+            if pool == THREAD:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="worker"
+                )
+            elif pool == PROCESS:
+                from concurrent.futures import ProcessPoolExecutor
+
+                executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            elif pool == ASYNC:
+                executor = AsyncLoop()
+            else:
+                raise ValueError(f"Pool must be one of {POOLS}")
+            self._executors[pool] = executor
+        return executor
+
+    def _on_done(self, future: Future):
+        with self._lock:
+            cancel_event = self._tasks.pop(future, None)
+        if future.cancelled() or cancel_event is None or cancel_event.is_set():
+            return
+
+        error = future.exception()
+        if error is not None:
+            logging.error(f"Worker task failed: {error!r}")
+            return
+
+        result = future.result()
+        if result is None:
+            return
+        events = [result] if isinstance(result, ControllerEvent) else result
+        for event in events:
+            if not isinstance(event, ControllerEvent):
+                logging.error(f"Worker task returned {event!r}, not a ControllerEvent")
+                continue
+            self.event_queue.put(event)
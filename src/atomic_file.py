@@ -0,0 +1,42 @@
+"""Atomic writes of JSON files, shared by the settings and the analysis cache."""
+
+import json
+import os
+import stat
+import tempfile
+
+# The umask can only be read by setting it, do that once while importing rather
+# than racing other threads that create files.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_json_atomic(path: str, data, indent: int | None = None):
+    """Write JSON to a temporary file and rename it over the file.
+
+    The temporary file is flushed to disk before the rename, so a crash halfway a
+    write never leaves a corrupt file. The file keeps the permissions of the file
+    it replaces, a new file gets the default permissions of the umask.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=os.path.basename(path), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w") as file:
+            json.dump(data, file, indent=indent)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _file_mode(path: str) -> int:
+    """Get the permissions of the file at path, or of a new file if it is missing."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
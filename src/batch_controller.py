@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from app import AppControllerSkeleton, offload
+from app.events import ControllerEvent, FrameEvent, SettingEvent
+from app.frame_factory import FrameFactory
+
+from analysis import AnalysisCache, CacheStats
+from analysis_controller import (
+    PRICE_SETTING_NAMES,
+    machine_limits_from_settings,
+    material_options_from_settings,
+    price_parameters_from_settings,
+)
+from quoting import Invoice, JobResult, find_jobs, format_invoice, quote_batch
+
+
+@dataclass(frozen=True)
+class InvoiceSnapshot:
+    """What the Batch frame shows of an invoice, taken under the invoice lock.
+
+    Reading the invoice itself on the Tk thread would race with a reprice in the
+    worker thread, which updates its cost model.
+    """
+
+    total: float
+    quoted: int  # files
+    text: str  # the invoice table, see format_invoice
+
+    @classmethod
+    def of(cls, invoice: Invoice) -> "InvoiceSnapshot":
+        return cls(invoice.total, len(invoice.quoted), format_invoice(invoice))
+
+
+class BatchQuoteEvent(FrameEvent):
+    """Request to quote files, directories are searched for print jobs."""
+
+    def __init__(self, paths: list[str]):
+        super().__init__("BatchQuoteEvent")
+        self.paths = paths
+
+
+class BatchJobEvent(ControllerEvent):
+    """A file of a batch was quoted, or failed."""
+
+    def __init__(self, result: JobResult, done: int, total: int):
+        super().__init__("BatchJobEvent")
+        self.result = result
+        self.done = done
+        self.total = total
+
+
+class BatchFinishedEvent(ControllerEvent):
+    """All files of a batch were quoted."""
+
+    def __init__(
+        self, invoice: InvoiceSnapshot, elapsed: float, cache_stats: CacheStats = None
+    ):
+        super().__init__("BatchFinishedEvent")
+        self.invoice = invoice
+        self.elapsed = elapsed
+        self.cache_stats = cache_stats
+
+
+class BatchRepricedEvent(ControllerEvent):
+    """The last batch was priced again, after prices changed."""
+
+    def __init__(
+        self, invoice: InvoiceSnapshot, recomputed: list[str], elapsed: float
+    ):
+        super().__init__("BatchRepricedEvent")
+        self.invoice = invoice
+        self.recomputed = recomputed  # quantities of the cost model
+        self.elapsed = elapsed
+
+    def coalesce_key(self):
+        return BatchRepricedEvent
+
+
+class BatchController(AppControllerSkeleton):
+    """Quotes batches of files in a process pool, reporting every finished file.
+
+    The batch is driven from a worker thread, which collects the results of the
+    worker processes as they finish. Files found in the cache are not analyzed.
+    When prices change, the last batch is priced again from its cost model.
+    """
+
+    def __init__(self, cache: AnalysisCache = None):
+        self.cache = cache
+        self.invoice: Invoice = None  # of the last batch
+        self._invoice_lock = threading.Lock()
+
+    def init(self):
+        logging.info("BatchController initialized")
+
+    @offload()
+    def on_event(self, event):
+        if isinstance(event, SettingEvent):
+            return self._reprice(event)
+        if not isinstance(event, BatchQuoteEvent):
+            return None
+
+        start = time.perf_counter()
+        paths = find_jobs(event.paths)
+        logging.info(f"Quoting a batch of {len(paths)} files")
+        settings = FrameFactory.settings
+        results = quote_batch(
+            paths,
+            price_parameters_from_settings(settings),
+            analyzer_options={
+                "limits": machine_limits_from_settings(settings),
+                "material": material_options_from_settings(settings),
+            },
+            cancelled=self.is_cancelled,
+            cache=self.cache,
+        )
+
+        invoice = Invoice(price_parameters_from_settings(settings))
+        with self._invoice_lock:
+            self.invoice = invoice
+        for done, result in enumerate(results, start=1):
+            with self._invoice_lock:
+                invoice.add(result)
+            self._push_event(BatchJobEvent(result, done, len(paths)))
+        if self.is_cancelled():
+            return None
+        with self._invoice_lock:
+            snapshot = InvoiceSnapshot.of(invoice)
+        return BatchFinishedEvent(
+            snapshot,
+            time.perf_counter() - start,
+            self.cache.stats if self.cache else None,
+        )
+
+    def _reprice(self, event: SettingEvent):
+        if event.setting not in PRICE_SETTING_NAMES:
+            return None
+        start = time.perf_counter()
+        with self._invoice_lock:
+            if self.invoice is None:
+                return None
+            parameters = price_parameters_from_settings(FrameFactory.settings)
+            recomputed = self.invoice.reprice(parameters)
+            if not recomputed:
+                return None
+            elapsed = time.perf_counter() - start
+            jobs = len(self.invoice.jobs)
+            snapshot = InvoiceSnapshot.of(self.invoice)
+        logging.info(
+            f"Repriced {jobs} jobs in {elapsed * 1000:.1f} ms, "
+            f"recomputed {', '.join(recomputed)}"
+        )
+        return BatchRepricedEvent(snapshot, recomputed, elapsed)
@@ -0,0 +1,135 @@
+import logging
+import os
+from tkinter import filedialog
+
+import customtkinter as ctk
+
+from app.app_frame import AppFrameSkeleton
+from batch_controller import (
+    BatchFinishedEvent,
+    BatchJobEvent,
+    BatchQuoteEvent,
+    BatchRepricedEvent,
+)
+from quote_frame import FILE_TYPES, format_cache_stats
+
+
+class BatchFrame(AppFrameSkeleton):
+    """A frame to quote many print job files at once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._name = "Batch"
+        self.configure(border_width=1, corner_radius=1, fg_color="transparent")
+        self.paths: list[str] = []
+
+        self.button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.button_frame.pack(padx=20, pady=(20, 5))
+        for text, command in (
+            ("Add files", self.add_files),
+            ("Add folder", self.add_folder),
+            ("Clear", self.clear),
+            ("Quote", self.quote),
+        ):
+            ctk.CTkButton(self.button_frame, text=text, command=command).pack(
+                side="left", padx=5
+            )
+
+        self.selection_label = ctk.CTkLabel(self, text="No files selected")
+        self.selection_label.pack(padx=20, pady=5)
+
+        self.progress_bar = ctk.CTkProgressBar(self)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(fill="x", padx=20, pady=10)
+
+        self.summary_label = ctk.CTkLabel(
+            self, text="", font=("TkDefaultFont", 18, "bold")
+        )
+        self.summary_label.pack(padx=20, pady=5)
+
+        self.result_box = ctk.CTkTextbox(self, font=("Courier", 13), wrap="none")
+        self.result_box.pack(fill="both", expand=True, padx=20, pady=(5, 20))
+        self.result_box.configure(state="disabled")
+
+    def add_files(self):
+        """Ask for print job files to add to the batch."""
+        self._add_paths(filedialog.askopenfilenames(filetypes=FILE_TYPES))
+
+    def add_folder(self):
+        """Ask for a folder, its print jobs are added when the batch is quoted."""
+        folder = filedialog.askdirectory()
+        if folder:
+            self._add_paths([folder])
+
+    def clear(self):
+        """Remove all files from the batch."""
+        self.paths.clear()
+        self._show_selection()
+
+    def quote(self):
+        """Request the quote of all files in the batch."""
+        if not self.paths:
+            return
+        logging.info(f"Quoting a batch of {len(self.paths)} paths")
+        self.progress_bar.set(0)
+        self.summary_label.configure(text="Quoting...")
+        self._set_results("")
+        self._push_event(BatchQuoteEvent(list(self.paths)))
+
+    def on_event(self, event):
+        if isinstance(event, BatchJobEvent):
+            self.progress_bar.set(event.done / event.total)
+            result = event.result
+            name = os.path.basename(result.path)
+            if result.ok and result.cached:
+                line = f"{name}: €{result.cost.total:.2f} (cached)"
+            elif result.ok:
+                line = f"{name}: €{result.cost.total:.2f} ({result.elapsed:.2f} s)"
+            else:
+                line = f"{name}: failed, {result.error}"
+            self._append_result(line)
+        elif isinstance(event, BatchFinishedEvent):
+            invoice = event.invoice
+            self.progress_bar.set(1)
+            summary = (
+                f"Total €{invoice.total:.2f} for {invoice.quoted} files "
+                f"in {event.elapsed:.1f} s"
+            )
+            if event.cache_stats is not None:
+                summary += "\n" + format_cache_stats(event.cache_stats)
+            self.summary_label.configure(text=summary)
+            self._set_results(invoice.text)
+        elif isinstance(event, BatchRepricedEvent):
+            invoice = event.invoice
+            self.summary_label.configure(
+                text=f"Total €{invoice.total:.2f} for {invoice.quoted} files, "
+                f"repriced in {event.elapsed * 1000:.0f} ms"
+            )
+            self._set_results(invoice.text)
+
+    def _add_paths(self, paths):
+        for path in paths:
+            if path not in self.paths:
+                self.paths.append(path)
+        self._show_selection()
+
+    def _show_selection(self):
+        folders = sum(1 for path in self.paths if os.path.isdir(path))
+        files = len(self.paths) - folders
+        if not self.paths:
+            text = "No files selected"
+        else:
+            text = f"{files} files, {folders} folders"
+        self.selection_label.configure(text=text)
+
+    def _append_result(self, line: str):
+        self.result_box.configure(state="normal")
+        self.result_box.insert("end", line + "\n")
+        self.result_box.see("end")
+        self.result_box.configure(state="disabled")
+
+    def _set_results(self, text: str):
+        self.result_box.configure(state="normal")
+        self.result_box.delete("1.0", "end")
+        self.result_box.insert("end", text)
+        self.result_box.configure(state="disabled")
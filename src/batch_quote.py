@@ -0,0 +1,160 @@
+"""Quote a batch of print jobs without the GUI.
+
+Files and directories of .gcode (also gzip or Zstandard compressed), .bgcode,
+.ufp, .3mf and .stl files are analyzed in a process pool. Every file is reported when
+it finishes, followed by the combined invoice. The analysis cache of the app is only
+used with --cache, so a run does not leave cache files in the working directory.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from analysis import AnalysisCache, MachineLimits, MaterialOptions
+from quoting import Invoice, PriceParameters, find_jobs, format_invoice, quote_batch
+
+
+def parse_args(
+    argv: list[str] | None = None, prog: str | None = None
+) -> argparse.Namespace:
+    prices = PriceParameters()
+    limits = MachineLimits()
+    material = MaterialOptions()
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__)
+    parser.add_argument("paths", nargs="+", help="print job files or directories")
+    parser.add_argument("--workers", type=int, help="worker processes, all cores")
+    parser.add_argument(
+        "--no-recursive",
+        dest="recursive",
+        action="store_false",
+        help="only look at the top level of directories",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="SETTINGS_FILE",
+        help="use the analysis cache beside this settings file, like the app's "
+        "app_settings.json, files are not cached without it",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_const",
+        const=None,
+        help="do not use the analysis cache, the default",
+    )
+    parser.add_argument(
+        "--material-cost", type=float, default=prices.material_cost, help="per kg"
+    )
+    parser.add_argument(
+        "--machine-rate", type=float, default=prices.machine_rate, help="per hour"
+    )
+    parser.add_argument(
+        "--printer-power", type=float, default=prices.printer_power, help="W"
+    )
+    parser.add_argument(
+        "--energy-price", type=float, default=prices.energy_price, help="per kWh"
+    )
+    parser.add_argument(
+        "--labor-rate", type=float, default=prices.labor_rate, help="per hour"
+    )
+    parser.add_argument(
+        "--handling-time",
+        type=float,
+        default=prices.labor_minutes,
+        help="minutes of work per job",
+    )
+    parser.add_argument(
+        "--margin", type=float, default=prices.margin_percent, help="%% on top"
+    )
+    parser.add_argument(
+        "--acceleration", type=float, default=limits.acceleration, help="mm/s²"
+    )
+    parser.add_argument(
+        "--max-speed", type=float, default=limits.max_feed_rate, help="mm/s"
+    )
+    parser.add_argument(
+        "--slicer-estimates",
+        action="store_true",
+        help="use the slicer's print time instead of estimating it, binary "
+        "G-code is then only read for its metadata",
+    )
+    parser.add_argument(
+        "--wall-thickness",
+        type=float,
+        default=material.wall_thickness,
+        help="mm of walls, top and bottom of models that are not sliced",
+    )
+    parser.add_argument(
+        "--infill",
+        type=float,
+        default=material.infill * 100,
+        help="%% infill of models that are not sliced",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None, prog: str | None = None) -> int:
+    """Quote the files, returns the exit code: 1 when any file failed."""
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+    args = parse_args(argv, prog)
+    parameters = PriceParameters(
+        material_cost=args.material_cost,
+        machine_rate=args.machine_rate,
+        printer_power=args.printer_power,
+        energy_price=args.energy_price,
+        labor_rate=args.labor_rate,
+        labor_minutes=args.handling_time,
+        margin_percent=args.margin,
+    )
+    limits = None
+    if not args.slicer_estimates:
+        limits = MachineLimits(
+            acceleration=args.acceleration, max_feed_rate=args.max_speed
+        )
+    material = MaterialOptions(
+        wall_thickness=args.wall_thickness, infill=args.infill / 100
+    )
+
+    paths = find_jobs(args.paths, recursive=args.recursive)
+    if not paths:
+        print("No print jobs found", file=sys.stderr)
+        return 1
+    order = {path: position for position, path in enumerate(paths)}
+    cache = AnalysisCache.beside(args.cache) if args.cache else None
+
+    invoice = Invoice(parameters)
+    start = time.perf_counter()
+    results = quote_batch(
+        paths,
+        parameters,
+        args.workers,
+        analyzer_options={"limits": limits, "material": material},
+        cache=cache,
+    )
+    for count, result in enumerate(results, start=1):
+        invoice.add(result)
+        status = "cached" if result.cached else "ok" if result.ok else "failed"
+        print(
+            f"[{count}/{len(paths)}] {os.path.basename(result.path)}: {status} "
+            f"in {result.elapsed:.2f} s",
+            file=sys.stderr,
+        )
+    elapsed = time.perf_counter() - start
+
+    invoice.jobs.sort(key=lambda job: order[job.path])
+    print(format_invoice(invoice))
+    print(f"Quoted {len(paths)} files in {elapsed:.2f} s", file=sys.stderr)
+    if cache is not None:
+        stats = cache.stats
+        print(f"Cache: {stats.hits} hits, {stats.misses} misses", file=sys.stderr)
+    return 1 if invoice.failed else 0
+
+
+if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+
+        multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""Benchmarks for printonomics. Run them from the src directory, for example:
+
+    python -m benchmarks.event_latency
+"""
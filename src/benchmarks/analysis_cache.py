@@ -0,0 +1,45 @@
+"""Quote a synthetic G-code file three times: new, unchanged and touched.
+
+The second run finds the result by the size and mtime of the file, the third
+has to hash the file again but still finds the result by its content.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from analysis import AnalysisCache, analyze_path
+
+from .gcode_analysis import write_synthetic_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.gcode")
+        print(f"Writing {args.size_mb} MB synthetic G-code...")
+        write_synthetic_file(path, args.size_mb * 1024 * 1024)
+        cache_file = os.path.join(directory, "analysis_cache.json")
+
+        for run in ("new", "unchanged", "touched"):
+            if run == "touched":
+                os.utime(path)
+            # A new cache object every run, as if the application was restarted
+            cache = AnalysisCache(cache_file)
+            start = time.perf_counter()
+            _, cached = cache.analyze(path, analyze_path)
+            cache.flush()
+            elapsed = time.perf_counter() - start
+            stats = cache.stats
+            print(
+                f"{run:9} {elapsed * 1000:10.1f} ms, cached {cached}, "
+                f"files hashed {stats.hashed}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Run N simulated slow I/O handlers as blocking and as coroutine handlers.
+
+Blocking handlers on the Tk thread finish in about sum(latency), coroutine
+handlers on the asyncio loop in about max(latency).
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.app_controller import AppController, AppControllerSkeleton
+from app.events import ControllerEvent, EventQueue, FrameEvent
+
+
+class IoDoneEvent(ControllerEvent):
+    def __init__(self):
+        super().__init__("IoDoneEvent")
+
+
+class BlockingIoController(AppControllerSkeleton):
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def init(self):
+        pass
+
+    def on_event(self, event):
+        if isinstance(event, FrameEvent):
+            time.sleep(self.latency)
+            self._push_event(IoDoneEvent())
+
+
+class AsyncIoController(BlockingIoController):
+    async def on_event(self, event):
+        if isinstance(event, FrameEvent):
+            await asyncio.sleep(self.latency)
+            return IoDoneEvent()
+
+
+class NullFrameManager:
+    frame = None
+
+    def clear(self):
+        pass
+
+
+def run(controller_type: type, latencies: list[float]) -> float:
+    event_queue = EventQueue()
+    app_controller = AppController(NullFrameManager(), event_queue)
+    for latency in latencies:
+        app_controller.add_controller(controller_type(latency))
+
+    start = time.perf_counter()
+    event_queue.put(FrameEvent("start"))
+    app_controller.process_events()
+
+    done = 0
+    while done < len(latencies):
+        done += sum(isinstance(e, IoDoneEvent) for e in event_queue.drain())
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    app_controller.shutdown()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--handlers", type=int, default=20)
+    parser.add_argument("--max-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    latencies = [rng.uniform(0.01, args.max_latency) for _ in range(args.handlers)]
+    print(
+        f"{args.handlers} handlers, sum(latency) {sum(latencies):.3f} s, "
+        f"max(latency) {max(latencies):.3f} s"
+    )
+    for name, controller_type in (
+        ("blocking", BlockingIoController),
+        ("async", AsyncIoController),
+    ):
+        print(f"{name:>8}: {run(controller_type, latencies):.3f} s")
+
+
+if __name__ == "__main__":
+    main()
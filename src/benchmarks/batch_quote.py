@@ -0,0 +1,48 @@
+"""Quote a batch of synthetic G-code files with an increasing number of workers."""
+
+import argparse
+import os
+import tempfile
+import time
+
+from quoting import PriceParameters, quote_batch
+
+from .gcode_analysis import write_synthetic_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--size-mb", type=int, default=8, help="size of every file")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Writing {args.files} files of {args.size_mb} MB...")
+        template = os.path.join(directory, "template.gcode")
+        write_synthetic_file(template, args.size_mb * 1024 * 1024)
+        paths = []
+        for number in range(args.files):
+            path = os.path.join(directory, f"job{number}.gcode")
+            os.link(template, path)
+            paths.append(path)
+
+        workers = 1
+        baseline = None
+        while workers <= args.max_workers:
+            start = time.perf_counter()
+            results = list(quote_batch(paths, PriceParameters(), workers))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            failed = sum(not result.ok for result in results)
+            print(
+                f"{workers:2} workers: {elapsed:.2f} s, "
+                f"{len(paths) / elapsed:.1f} files/s, "
+                f"speedup {baseline / elapsed:.2f}"
+                + (f", {failed} failed" if failed else "")
+            )
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
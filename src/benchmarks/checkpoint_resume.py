@@ -0,0 +1,65 @@
+"""Quote a large G-code file again after its end was edited, and after it grew.
+
+Quotes a synthetic file with an analysis cache, which keeps checkpoints, then
+changes the end G-code and quotes it again, then appends to it and quotes it
+again. The second and third quotes hash the file and parse only the end, the
+time of every quote is reported with the fraction of the first.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from analysis import AnalysisCache, MachineLimits
+from quoting import PriceParameters, quote_file
+
+from .gcode_analysis import write_synthetic_file
+
+END_GCODE = b"M104 S0\nM140 S0\nG28 X0\nM84\n"
+
+
+def timed_quote(path: str, cache: AnalysisCache) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = quote_file(
+        path, PriceParameters(), {"limits": MachineLimits()}, cache=cache
+    )
+    if not result.ok:
+        raise RuntimeError(result.error)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.gcode")
+        print(f"Writing {args.size_mb} MB synthetic G-code...")
+        write_synthetic_file(path, args.size_mb * 1024 * 1024)
+        with open(path, "ab") as file:
+            file.write(END_GCODE)
+        cache = AnalysisCache(os.path.join(directory, "analysis_cache.json"))
+
+        full, first = timed_quote(path, cache)
+        print(f"first quote        {full:7.2f} s, {first.stats.moves} moves")
+
+        # Park the head somewhere else at the end, as an operator would
+        with open(path, "r+b") as file:
+            file.seek(-len(END_GCODE), os.SEEK_END)
+            file.write(END_GCODE.replace(b"G28 X0", b"G0 Y200"))
+        elapsed, _ = timed_quote(path, cache)
+        print(f"end G-code edited  {elapsed:7.2f} s, {elapsed / full:.1%} of the first")
+
+        with open(path, "ab") as file:
+            file.write(b"G1 X100 Y100 E5 F1800\n" * 1000)
+        elapsed, grown = timed_quote(path, cache)
+        print(
+            f"file grew          {elapsed:7.2f} s, {elapsed / full:.1%} of the first, "
+            f"{grown.stats.moves - first.stats.moves} moves more"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measure the startup of the headless quote command.
+
+Runs `python -m printonomics quote --help` in new interpreters and reports the
+best wall time next to an empty interpreter, and checks that the command does
+not import the GUI or NumPy.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+GUI_MODULES = ("tkinter", "customtkinter", "PIL", "numpy")
+
+CHECK_IMPORTS = f"""
+import sys
+import printonomics, batch_quote
+print(",".join(name for name in {GUI_MODULES!r} if name in sys.modules))
+"""
+
+
+def best_time(command: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, command in (
+        ("empty interpreter", [sys.executable, "-c", "pass"]),
+        ("quote --help", [sys.executable, "-m", "printonomics", "quote", "--help"]),
+    ):
+        print(f"{name:18} {best_time(command, args.repeat) * 1000:7.1f} ms")
+
+    imported = subprocess.run(
+        [sys.executable, "-c", CHECK_IMPORTS],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    print(f"GUI or NumPy modules imported: {imported or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
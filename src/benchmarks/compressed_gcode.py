@@ -0,0 +1,202 @@
+"""Analyze synthetic G-code plain, gzip compressed and as binary G-code.
+
+Writes a synthetic G-code file, the same G-code as .gcode.gz, as .gcode.zst when
+the zstandard package is installed, and as .bgcode with deflate and heatshrink
+blocks, MeatPack encoded without spaces like PrusaSlicer writes it. Reports the
+throughput of every format in MB of G-code per second, and checks the stats are
+those of the plain file. Without machine limits only the metadata of a .bgcode
+file is read, that estimate is timed too.
+"""
+
+import argparse
+import dataclasses
+import gzip
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from analysis import MachineLimits, analyze_path
+from analysis import bgcode
+
+from .gcode_analysis import write_synthetic_file
+from .parallel_gcode import same_stats
+
+BLOCK_SIZE = 65535  # G-code bytes per block, as PrusaSlicer writes them
+METADATA = (
+    b"filament used [mm]=1234567.89\n"
+    b"filament used [g]=3681.23\n"
+    b"estimated printing time (normal mode)=1d 10h 17m 36s\n"
+)
+
+
+def meatpack_encode(text: bytes) -> bytes:
+    """Encode G-code with MeatPack, spaces left out of commands."""
+    characters = bgcode.MEATPACK_CHARACTERS.replace(b" ", b"E")
+    codes = {character: code for code, character in enumerate(characters)}
+    pairs = {}
+
+    def encode_pair(pair: bytes) -> bytes:
+        if pair not in pairs:
+            first = codes.get(pair[0])
+            second = codes.get(pair[1]) if len(pair) > 1 else None
+            full = bytes(
+                character
+                for character, code in zip(pair, (first, second))
+                if code is None
+            )
+            if pair == b"\n":
+                # A first newline ends the byte, the line is done
+                pairs[pair] = b"\xfc"
+            else:
+                code = (0xF if second is None else second) << 4
+                pairs[pair] = bytes([code | (0xF if first is None else first)]) + full
+        return pairs[pair]
+
+    signal = bytes([bgcode.MEATPACK_SIGNAL] * 2)
+    encoded = [
+        signal + bytes([bgcode.MEATPACK_ENABLE_PACKING]),
+        signal + bytes([bgcode.MEATPACK_ENABLE_NO_SPACES]),
+    ]
+    for line in text.splitlines(keepends=True):
+        if not line.startswith(b";"):
+            command, separator, comment = line.partition(b";")
+            line = command.replace(b" ", b"") + separator + comment
+        pairs_of_line = (line[i : i + 2] for i in range(0, len(line), 2))
+        encoded.extend(map(encode_pair, pairs_of_line))
+    return b"".join(encoded)
+
+
+def heatshrink_compress(data: bytes, window_bits: int, lookahead_bits: int) -> bytes:
+    """Compress data with heatshrink, a greedy search of 3 byte matches."""
+    window, longest = 1 << window_bits, 1 << lookahead_bits
+    literals = ["1" + format(byte, "08b") for byte in range(256)]
+    reference = f"0{{:0{window_bits}b}}{{:0{lookahead_bits}b}}".format
+    last = {}
+    items = []
+    position = 0
+    while position < len(data):
+        key = data[position : position + 3]
+        match = last.get(key)
+        last[key] = position
+        if match is None or position - match > window or len(key) < 3:
+            items.append(literals[data[position]])
+            position += 1
+            continue
+        length = 3
+        while (
+            length < longest
+            and position + length < len(data)
+            and data[match + length] == data[position + length]
+        ):
+            length += 1
+        items.append(reference(position - match - 1, length - 1))
+        position += length
+    bits = "".join(items)
+    bits += "0" * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, "big") if bits else b""
+
+
+def write_block(file, block_type: int, compression: int, data: bytes, encoding=0):
+    """Write a block with a CRC32, compressed with deflate or heatshrink."""
+    size = len(data)
+    if compression == bgcode.DEFLATE:
+        data = zlib.compress(data)
+    elif compression in bgcode.HEATSHRINK_PARAMETERS:
+        data = heatshrink_compress(data, *bgcode.HEATSHRINK_PARAMETERS[compression])
+    header = struct.pack("<HHI", block_type, compression, size)
+    if compression != bgcode.NO_COMPRESSION:
+        header += struct.pack("<I", len(data))
+    block = header + struct.pack("<H", encoding) + data
+    file.write(block + struct.pack("<I", zlib.crc32(block)))
+
+
+def write_bgcode(path: str, gcode_path: str, compression: int):
+    """Write G-code as binary G-code, in MeatPack encoded blocks of whole lines."""
+    with open(gcode_path, "rb") as source, open(path, "wb") as file:
+        file.write(bgcode.FILE_HEADER.pack(bgcode.MAGIC, 1, bgcode.CHECKSUM_CRC32))
+        for block_type in (bgcode.PRINTER_METADATA, bgcode.PRINT_METADATA):
+            write_block(file, block_type, bgcode.NO_COMPRESSION, METADATA)
+        tail = b""
+        while chunk := source.read(BLOCK_SIZE):
+            lines = tail + chunk
+            end = lines.rfind(b"\n") + 1
+            tail = lines[end:]
+            write_block(
+                file,
+                bgcode.GCODE,
+                compression,
+                meatpack_encode(lines[:end]),
+                bgcode.MEATPACK_COMMENTS,
+            )
+        if tail:
+            write_block(
+                file,
+                bgcode.GCODE,
+                compression,
+                meatpack_encode(tail + b"\n"),
+                bgcode.MEATPACK_COMMENTS,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.gcode")
+        print(f"Writing {args.size_mb} MB synthetic G-code in every format...")
+        write_synthetic_file(path, args.size_mb * 1024 * 1024)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        paths = {"plain": path, "gzip": path + ".gz"}
+        with open(path, "rb") as source, gzip.open(paths["gzip"], "wb") as target:
+            target.write(source.read())
+        try:
+            import zstandard
+        except ImportError:
+            print("zstandard is not installed, skipping .gcode.zst")
+        else:
+            paths["zstd"] = path + ".zst"
+            with open(path, "rb") as source, open(paths["zstd"], "wb") as target:
+                target.write(zstandard.ZstdCompressor().compress(source.read()))
+        for name, compression in (
+            ("bgcode deflate", bgcode.DEFLATE),
+            ("bgcode heatshrink", bgcode.HEATSHRINK_12_4),
+        ):
+            paths[name] = os.path.join(directory, f"{compression}.bgcode")
+            write_bgcode(paths[name], path, compression)
+
+        expected = None
+        for name, format_path in paths.items():
+            start = time.perf_counter()
+            stats = analyze_path(format_path, limits=MachineLimits())
+            elapsed = time.perf_counter() - start
+            expected = expected or stats
+            file_mb = os.path.getsize(format_path) / (1024 * 1024)
+            print(
+                f"{name:18} {file_mb:7.1f} MB {elapsed:7.2f} s "
+                f"{size_mb / elapsed:7.1f} MB/s of G-code"
+                # Decoded binary G-code has no spaces in M commands
+                + (
+                    ""
+                    if same_stats(
+                        expected,
+                        dataclasses.replace(stats, bytes_read=expected.bytes_read),
+                    )
+                    else "  STATS DIFFER"
+                )
+            )
+
+        start = time.perf_counter()
+        estimate = analyze_path(paths["bgcode heatshrink"])
+        elapsed = time.perf_counter() - start
+        print(
+            f"bgcode metadata    {elapsed * 1000:7.2f} ms, "
+            f"{estimate.print_time / 3600:.1f} h, {estimate.filament_length:.0f} mm"
+        )
+
+
+if __name__ == "__main__":
+    main()
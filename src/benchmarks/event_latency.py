@@ -0,0 +1,119 @@
+"""Measure put-to-handler latency of the event dispatcher in push and poll mode."""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+import tkinter as tk
+
+from app.app_controller import AppController, AppControllerSkeleton
+from app.event_dispatcher import EventDispatcher
+from app.events import EventQueue, FrameEvent
+
+
+class TimedFrameEvent(FrameEvent):
+    def __init__(self):
+        super().__init__("TimedFrameEvent")
+        self.created = time.perf_counter()
+
+
+class LatencyRecorder(AppControllerSkeleton):
+    def __init__(self, expected: int, on_done):
+        self.latencies: list[float] = []
+        self._expected = expected
+        self._on_done = on_done
+
+    def init(self):
+        pass
+
+    def on_event(self, event):
+        if isinstance(event, TimedFrameEvent):
+            self.latencies.append(time.perf_counter() - event.created)
+            if len(self.latencies) == self._expected:
+                self._on_done()
+
+
+class NullFrameManager:
+    frame = None
+
+    def clear(self):
+        pass
+
+
+def put_from_worker(event_queue: EventQueue, events: int, refresh_rate: int):
+    """Put the events from another thread, like a worker reporting its results."""
+    rng = random.Random(42)
+    for _ in range(events):
+        time.sleep(rng.randint(0, refresh_rate) / 1000)
+        event_queue.put(TimedFrameEvent())
+
+
+def measure(
+    mode: str, events: int, refresh_rate: int, from_thread: bool = False
+) -> list[float]:
+    root = tk.Tk()
+    root.withdraw()
+
+    event_queue = EventQueue()
+    controller = AppController(NullFrameManager(), event_queue)
+    recorder = LatencyRecorder(events, root.quit)
+    controller.add_controller(recorder)
+
+    dispatcher = EventDispatcher(
+        root,
+        event_queue,
+        controller.process_events,
+        mode=mode,
+        refresh_rate=refresh_rate,
+    )
+    dispatcher.start()
+
+    # Spread the events over time so they arrive at random points of the poll cycle
+    worker = None
+    if from_thread:
+        worker = threading.Thread(
+            target=put_from_worker, args=(event_queue, events, refresh_rate)
+        )
+        root.after(0, worker.start)
+    else:
+        rng = random.Random(42)
+        for _ in range(events):
+            root.after(
+                rng.randint(0, 5 * refresh_rate),
+                lambda: event_queue.put(TimedFrameEvent()),
+            )
+
+    root.mainloop()
+    if worker is not None:
+        worker.join()
+    dispatcher.stop()
+    root.destroy()
+    return recorder.latencies
+
+
+def report(label: str, latencies: list[float]):
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    print(
+        f"{label}: mean {statistics.mean(latencies_ms):7.3f} ms, "
+        f"median {statistics.median(latencies_ms):7.3f} ms, "
+        f"p99 {latencies_ms[int(len(latencies_ms) * 0.99) - 1]:7.3f} ms, "
+        f"max {latencies_ms[-1]:7.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--refresh-rate", type=int, default=100)
+    args = parser.parse_args()
+
+    for mode in EventDispatcher.MODES:
+        for from_thread in (False, True):
+            latencies = measure(mode, args.events, args.refresh_rate, from_thread)
+            source = "worker" if from_thread else "tk"
+            report(f"{mode:>5} ({source:>6})", latencies)
+
+
+if __name__ == "__main__":
+    main()
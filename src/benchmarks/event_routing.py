@@ -0,0 +1,109 @@
+"""Dispatch mixed events through the legacy and the precompiled event routing."""
+
+import argparse
+import time
+
+from app.app_controller import AppController, AppControllerSkeleton
+from app.events import (
+    ControllerEvent,
+    EventQueue,
+    FrameEvent,
+    MenuEvent,
+    SettingEvent,
+)
+
+
+class CountingController(AppControllerSkeleton):
+    def __init__(self):
+        self.count = 0
+
+    def init(self):
+        pass
+
+    def on_event(self, event):
+        self.count += 1
+
+
+class NullFrameManager:
+    frame = None
+
+    def clear(self):
+        pass
+
+
+class BenchAppController(AppController):
+    def _handle_menu_event(self, event):
+        # Do not create frames, only measure the routing
+        pass
+
+    def _handle_setting_event(self, event):
+        # There are no settings to write behind
+        pass
+
+
+class LegacyAppController(BenchAppController):
+    """The routing as it was: rebuilt every tick, isinstance against every key."""
+
+    def process_events(self):
+        all_controller_handlers = [
+            controller.on_event for controller in self._controllers
+        ]
+        event_routing = {
+            MenuEvent: [self._handle_menu_event, *all_controller_handlers],
+            SettingEvent: [*all_controller_handlers],
+            ControllerEvent: [self._handle_frame_event],
+            FrameEvent: [*all_controller_handlers],
+        }
+
+        for event in iter(lambda: self.event_queue.get(), None):
+            for event_type, handlers in event_routing.items():
+                if isinstance(event, event_type):
+                    for handler in handlers:
+                        handler(event)
+
+
+def make_events(count: int) -> list:
+    kinds = [
+        lambda: MenuEvent("settings"),
+        lambda: FrameEvent("frame"),
+        lambda: ControllerEvent("controller"),
+        lambda: SettingEvent("setting", 1),
+    ]
+    return [kinds[i % len(kinds)]() for i in range(count)]
+
+
+def run(controller_type: type, events: list, per_tick: int, controllers: int):
+    event_queue = EventQueue()
+    app_controller = controller_type(NullFrameManager(), event_queue)
+    for _ in range(controllers):
+        app_controller.add_controller(CountingController())
+
+    start = time.perf_counter()
+    for offset in range(0, len(events), per_tick):
+        for event in events[offset : offset + per_tick]:
+            event_queue.put(event)
+        app_controller.process_events()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--per-tick", type=int, default=1)
+    parser.add_argument("--controllers", type=int, default=4)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    for name, controller_type in (
+        ("legacy", LegacyAppController),
+        ("compiled", BenchAppController),
+    ):
+        elapsed = run(controller_type, events, args.per_tick, args.controllers)
+        print(
+            f"{name:>8}: {elapsed * 1000:8.1f} ms, "
+            f"{elapsed / len(events) * 1e6:6.2f} us/event"
+        )
+
+
+if __name__ == "__main__":
+    main()
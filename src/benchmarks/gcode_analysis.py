@@ -0,0 +1,97 @@
+"""Analyze a synthetic G-code file and report throughput and peak memory."""
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+from analysis import analyze_file
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HEADER = b""";FLAVOR:Marlin
+;TIME:123456
+;Filament used: 1234.5m
+;Layer height: 0.2
+M140 S60
+M104 S210
+M82
+G28
+G92 E0
+"""
+
+
+def make_layer(rng: random.Random, moves: int) -> bytes:
+    """A layer of perimeters and infill, with absolute extrusion from E0."""
+    lines = []
+    e = 0.0
+    x, y = 100.0, 100.0
+    for i in range(moves):
+        if i % 50 == 0:
+            lines.append(f"G0 F7200 X{x:.3f} Y{y:.3f}")
+            lines.append("G1 F2700 E{:.5f}".format(e))
+        angle = rng.uniform(0, 2 * math.pi)
+        length = rng.uniform(0.5, 20)
+        x = min(max(x + length * math.cos(angle), 10), 210)
+        y = min(max(y + length * math.sin(angle), 10), 210)
+        e += length * 0.0332
+        lines.append(f"G1 F1800 X{x:.3f} Y{y:.3f} E{e:.5f}")
+        if i % 50 == 49:
+            lines.append(f"G1 F2700 E{e - 6.5:.5f}")
+    lines.append("G92 E0")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def write_synthetic_file(path: str, size: int):
+    rng = random.Random(42)
+    layer = make_layer(rng, 5000)
+    with open(path, "wb") as file:
+        file.write(HEADER)
+        written = len(HEADER)
+        layer_number = 0
+        while written < size:
+            head = f";LAYER:{layer_number}\nG0 Z{0.2 * (layer_number + 1):.2f}\n"
+            file.write(head.encode())
+            file.write(layer)
+            written += len(head) + len(layer)
+            layer_number += 1
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--path", help="analyze this file instead of a synthetic one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path
+        if path is None:
+            path = os.path.join(directory, "synthetic.gcode")
+            print(f"Writing {args.size_mb} MB synthetic G-code...")
+            write_synthetic_file(path, args.size_mb * 1024 * 1024)
+
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        stats = analyze_file(path)
+        elapsed = time.perf_counter() - start
+
+        print(f"{size_mb:.0f} MB in {elapsed:.2f} s: {size_mb / elapsed:.1f} MB/s")
+        print(f"{stats.moves} moves, {stats.layer_count} layers")
+        if rss_before is not None:
+            print(f"peak RSS {rss_before:.0f} MB before, {peak_rss_mb():.0f} MB after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Time parsing a G-code file and estimating its print time, end to end.
+
+The file is analyzed with machine limits by the vectorized scanner and by the
+line parser, which must give the same stats. The script exits with an error when
+they do not.
+"""
+
+import argparse
+import dataclasses
+import math
+import os
+import sys
+import tempfile
+import time
+
+from analysis.gcode import GcodeAnalyzer, analyze_stream
+from analysis.limits import MachineLimits
+from benchmarks.gcode_analysis import write_synthetic_file
+
+
+def analyze(path: str, vectorized: bool):
+    analyzer = GcodeAnalyzer(limits=MachineLimits())
+    if not vectorized:
+        analyzer._scan = None
+    start = time.perf_counter()
+    with open(path, "rb", buffering=0) as stream:
+        stats = analyze_stream(stream, analyzer)
+    return stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--path", help="analyze this file instead of a synthetic one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path
+        if path is None:
+            path = os.path.join(directory, "synthetic.gcode")
+            print(f"Writing {args.size_mb} MB synthetic G-code...")
+            write_synthetic_file(path, args.size_mb * 1024 * 1024)
+
+        results = {}
+        for vectorized in (True, False):
+            name = "vectorized" if vectorized else "lines"
+            stats, elapsed = analyze(path, vectorized)
+            results[name] = stats
+            print(
+                f"{name:>10}: {stats.moves} moves in {elapsed:.2f} s, "
+                f"{elapsed * 1e6 / stats.moves:.2f} s per 1M moves, "
+                f"print time {stats.kinematic_time:.0f} s"
+            )
+
+    vectorized = dataclasses.asdict(results["vectorized"])
+    lines = dataclasses.asdict(results["lines"])
+    kinematic = vectorized.pop("kinematic_time"), lines.pop("kinematic_time")
+    vectorized.pop("print_time"), lines.pop("print_time")
+    if vectorized != lines or not math.isclose(*kinematic, rel_tol=1e-9):
+        sys.exit("The vectorized and line parsers do not agree")
+
+
+if __name__ == "__main__":
+    main()
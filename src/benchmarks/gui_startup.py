@@ -0,0 +1,89 @@
+"""Measure the startup of the GUI: time to the first frame and import times.
+
+Starts the application with PRINTONOMICS_STARTUP_PROBE set, which makes it print
+a line on its first paint and another once the deferred work, like loading the
+logo, is done, and then close. Both are timed from the start of the process.
+Needs a display. Pass --executable to time the PyInstaller build from
+printonomics.spec instead of the sources.
+
+The import times come from `python -X importtime`, summed per top level module
+imported by the GUI, so a regression points at the module that caused it.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from printonomics_gui import STARTUP_PROBE
+
+
+def time_to_first_frame(command: list[str]) -> tuple[float, float]:
+    """Start the application once, returns the seconds to the first frame and idle."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        env=dict(os.environ, **{STARTUP_PROBE: "1"}),
+    )
+    times = {}
+    for line in process.stdout:
+        times[line.strip()] = time.perf_counter() - start
+    if process.wait() != 0 or len(times) != 2:
+        raise RuntimeError(f"The application failed, exit code {process.returncode}")
+    return times["first frame"], times["idle"]
+
+
+def import_times(module: str) -> dict[str, float]:
+    """Cumulative import time in seconds of the modules imported by a module."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    # Modules are listed after the modules they import, indented by two spaces
+    # per level, so the direct imports of the module come right before it
+    children = defaultdict(float)
+    for line in output.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children[name.strip().split(".")[0]] += int(cumulative) / 1e6
+        elif depth == 0:
+            if name.strip() == module:
+                return dict(children)
+            children.clear()
+    raise RuntimeError(f"{module} was not imported")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--executable", help="a PyInstaller build to start")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="modules to list")
+    args = parser.parse_args()
+
+    if args.executable:
+        command = [args.executable]
+    else:
+        command = [sys.executable, "-m", "printonomics"]
+    first_frames, idles = zip(
+        *(time_to_first_frame(command) for _ in range(args.repeat))
+    )
+    print(f"first frame {min(first_frames) * 1000:8.1f} ms (best of {args.repeat})")
+    print(f"idle        {min(idles) * 1000:8.1f} ms")
+
+    totals = import_times("printonomics_gui")
+    print(f"\nimport printonomics_gui, {sum(totals.values()) * 1000:.1f} ms:")
+    slowest = sorted(totals.items(), key=lambda item: -item[1])
+    for name, seconds in slowest[: args.top]:
+        print(f"  {name:24} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Time the vectorized print time estimator and check it against the reference.
+
+The vectorized and the pure Python estimate must agree, the script exits with an
+error when they do not.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from analysis.kinematics import (
+    MachineLimits,
+    MoveColumns,
+    estimate_print_time,
+    estimate_print_time_reference,
+)
+
+
+def make_columns(moves: int, seed: int = 42) -> MoveColumns:
+    """Random moves: mostly extruding XY moves, some travels, retracts and Z hops."""
+    rng = np.random.default_rng(seed)
+    angle = rng.uniform(0, 2 * np.pi, moves)
+    length = rng.exponential(5.0, moves)
+    kind = rng.random(moves)
+
+    dx = np.where(kind < 0.95, length * np.cos(angle), 0.0)
+    dy = np.where(kind < 0.95, length * np.sin(angle), 0.0)
+    dz = np.where(kind > 0.99, 0.2, 0.0)
+    de = np.where(kind < 0.9, length * 0.033, 0.0)
+    de = np.where((kind >= 0.95) & (kind <= 0.99), rng.choice([-5.0, 5.0], moves), de)
+    feed_rate = rng.choice([1200.0, 1800.0, 2700.0, 9000.0], moves)
+
+    columns = MoveColumns()
+    for column, values in zip(
+        (columns.dx, columns.dy, columns.dz, columns.de, columns.feed_rate),
+        (dx, dy, dz, de, feed_rate),
+    ):
+        column.frombytes(values.astype(np.float64).tobytes())
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--moves", type=int, default=10_000_000)
+    parser.add_argument("--reference-moves", type=int, default=200_000)
+    args = parser.parse_args()
+
+    limits = MachineLimits()
+
+    columns = make_columns(args.reference_moves)
+    start = time.perf_counter()
+    reference = estimate_print_time_reference(columns, limits)
+    reference_elapsed = time.perf_counter() - start
+    vectorized = estimate_print_time(columns, limits)
+    difference = abs(vectorized - reference) / reference
+    print(
+        f"{args.reference_moves} moves: reference {reference:.3f} s in "
+        f"{reference_elapsed:.2f} s, vectorized {vectorized:.3f} s, "
+        f"relative difference {difference:.2e}"
+    )
+
+    columns = make_columns(args.moves)
+    start = time.perf_counter()
+    estimate = estimate_print_time(columns, limits)
+    elapsed = time.perf_counter() - start
+    print(f"{args.moves} moves: vectorized {estimate:.0f} s in {elapsed:.2f} s")
+
+    if difference > 1e-9:
+        sys.exit("The vectorized and reference estimates do not agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Store per-layer stats as columns and page through them from a mapped file.
+
+Builds a table of synthetic layers, as from a batch of very tall prints, and
+compares its memory with a list of dicts. Then saves it, maps the file in a new
+process and reads a few pages and a full column, reporting the time and memory
+of the process that reads.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from analysis.layers import COLUMN_NAMES, LayerColumns
+
+# Current RSS from /proc, the peak RSS of a child on Linux includes its parent
+READ_PAGES = """
+import os, sys, time
+from analysis import LayerTable
+
+
+def rss_mb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+start = time.perf_counter()
+with LayerTable(sys.argv[1]) as table:
+    opened = time.perf_counter()
+    for page in range(0, len(table), len(table) // 10):
+        table.rows(page, page + 100)
+    paged = time.perf_counter()
+    paged_rss = rss_mb()
+    total = sum(table["filament_length"])
+    summed = time.perf_counter()
+    summed_rss = rss_mb()
+print(f"open {(opened - start) * 1000:.2f} ms")
+print(f"10 pages of 100 rows {(paged - opened) * 1000:.2f} ms, RSS {paged_rss:.0f} MB")
+print(f"sum of a column {(summed - paged) * 1000:.1f} ms, RSS {summed_rss:.0f} MB")
+"""
+
+
+def make_rows(count: int):
+    generator = random.Random(1)
+    for layer in range(count):
+        yield (
+            0.2 * (layer % 2000 + 1),
+            generator.uniform(100, 2000),
+            generator.uniform(1000, 50000),
+            generator.uniform(10, 2000),
+            generator.uniform(10, 2000),
+            generator.randrange(100, 10000),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--layers", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    dicts = [dict(zip(COLUMN_NAMES, row)) for row in make_rows(args.layers)]
+    dicts_size = tracemalloc.get_traced_memory()[0]
+    del dicts
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    layers = LayerColumns()
+    for row in make_rows(args.layers):
+        layers.append(*row)
+    columns_size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    print(
+        f"{args.layers} layers: list of dicts {dicts_size / 2**20:.0f} MB, "
+        f"columns {columns_size / 2**20:.0f} MB"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "batch.layers")
+        start = time.perf_counter()
+        layers.save(path)
+        print(
+            f"saved {os.path.getsize(path) / 2**20:.0f} MB "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        subprocess.run([sys.executable, "-c", READ_PAGES, path], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Analyze a G-code file split over 1, 2, 4, 8 and 16 worker processes.
+
+Reports the wall time and speedup of every worker count over one process, and
+checks that the stats are those of the analysis in one process. The speedup is
+limited by the cores of the machine, os.cpu_count() is printed with the results.
+"""
+
+import argparse
+import dataclasses
+import math
+import os
+import tempfile
+import time
+
+from analysis import MachineLimits, analyze_file
+
+from .gcode_analysis import write_synthetic_file
+
+WORKER_COUNTS = (1, 2, 4, 8, 16)
+
+
+def same_stats(expected, stats) -> bool:
+    """Whether the stats are equal, up to the rounding of totals."""
+    for field in dataclasses.fields(expected):
+        value = getattr(expected, field.name)
+        other = getattr(stats, field.name)
+        if isinstance(value, float):
+            if not math.isclose(value, other, rel_tol=1e-9):
+                return False
+        elif value != other:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--path", help="analyze this file instead of a synthetic one")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=WORKER_COUNTS, help="counts to run"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path
+        if path is None:
+            path = os.path.join(directory, "synthetic.gcode")
+            print(f"Writing {args.size_mb} MB synthetic G-code...")
+            write_synthetic_file(path, args.size_mb * 1024 * 1024)
+
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"{size_mb:.0f} MB, {os.cpu_count()} cores")
+        limits = MachineLimits()
+        expected = analyze_file(path, limits=limits)
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            stats = analyze_file(path, workers=workers, limits=limits)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"{workers:3} workers {elapsed:7.2f} s {size_mb / elapsed:7.1f} MB/s "
+                f"speedup {baseline / elapsed:5.2f}"
+                + ("" if same_stats(expected, stats) else "  STATS DIFFER")
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Price a batch of jobs again after one price changed.
+
+Compares pricing every job from scratch with re-pricing the cost model of an
+invoice, which only recomputes the quantities that depend on the changed price.
+"""
+
+import argparse
+import dataclasses
+import random
+import time
+
+from analysis import GcodeStats
+from quoting import Invoice, JobResult, PriceParameters, price_job
+
+
+def make_results(count: int) -> list[JobResult]:
+    generator = random.Random(1)
+    return [
+        JobResult(
+            f"job{number}.gcode",
+            GcodeStats(
+                filament_length=generator.uniform(1e3, 1e5),
+                print_time=generator.uniform(600, 86400),
+            ),
+        )
+        for number in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = make_results(args.jobs)
+    parameters = PriceParameters()
+    invoice = Invoice(parameters)
+    for result in results:
+        invoice.add(result)
+
+    print(f"{args.jobs} jobs, best of {args.repeat}")
+    for field in ("material_cost", "energy_price", "labor_rate", "margin_percent"):
+        full = repriced = float("inf")
+        for run in range(args.repeat):
+            changed = dataclasses.replace(
+                parameters, **{field: getattr(parameters, field) * (1.1 + run)}
+            )
+            start = time.perf_counter()
+            total = sum(price_job(result.stats, changed).total for result in results)
+            full = min(full, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            recomputed = invoice.reprice(changed)
+            repriced_total = invoice.total
+            repriced = min(repriced, time.perf_counter() - start)
+            assert abs(total - repriced_total) < 1e-6 * total
+        print(
+            f"{field:15} full {full * 1000:7.2f} ms, "
+            f"repriced {repriced * 1000:6.2f} ms, "
+            f"recomputed {', '.join(recomputed)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Measure startup of the SettingsManager with many settings in the settings file."""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+from app.settings import IntSliderSettingSkeleton
+from app.settings.settings_manager import SettingsManager
+
+
+class LegacySettingsManager(SettingsManager):
+    """Raw settings lookup as it was: a scan of settings_raw for every setting."""
+
+    def add_setting(self, setting):
+        if setting.name in [item["name"] for item in self.settings_raw["settings"]]:
+            self._try_populate_setting(setting)
+        self.settings[setting.name] = setting
+
+    def _try_populate_setting(self, setting):
+        for raw_setting in self.settings_raw["settings"]:
+            if raw_setting["name"] == setting.name:
+                for key, value in raw_setting.items():
+                    if hasattr(setting, key):
+                        setattr(setting, key, value)
+                return
+
+
+def write_settings_file(path: str, names: list[str]):
+    settings = [
+        {"name": name, "default_value": 0, "min_value": 0, "max_value": 100, "value": 1}
+        for name in names
+    ]
+    with open(path, "w") as file:
+        json.dump({"settings": settings}, file)
+
+
+def run(manager_type: type, path: str, names: list[str]) -> float:
+    start = time.perf_counter()
+    manager = manager_type(path)
+    for name in names:
+        manager.add_setting(IntSliderSettingSkeleton(name, 0, 0, 100))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--settings", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.disable(logging.DEBUG)
+    names = [f"Material {i} cost per kg" for i in range(args.settings)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "app_settings.json")
+        write_settings_file(path, names)
+        for name, manager_type in (
+            ("legacy", LegacySettingsManager),
+            ("indexed", SettingsManager),
+        ):
+            elapsed = run(manager_type, path, names)
+            print(f"{name:>8}: {elapsed * 1000:8.1f} ms for {len(names)} settings")
+
+
+if __name__ == "__main__":
+    main()
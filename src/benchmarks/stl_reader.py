@@ -0,0 +1,87 @@
+"""Measure a synthetic binary and ASCII STL model and report the time.
+
+The model is the subdivided box of the 3MF benchmark, so the exact volume, area
+and bed area are known. The binary file has 5 million triangles by default, the
+ASCII file a tenth of them, as ASCII STL is a lot larger.
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from analysis.stl import HEADER_SIZE, RECORD, analyze_stl
+
+from .threemf_reader import BOX, box_faces
+
+
+def box_corners(divisions: int) -> np.ndarray:
+    """The corners of the triangles of the box, (n, 3, 3)."""
+    return np.concatenate(
+        [vertices[triangles] for vertices, triangles in box_faces(divisions)]
+    )
+
+
+def write_binary_stl(path: str, corners: np.ndarray):
+    records = np.zeros(len(corners), RECORD)
+    records["corners"] = corners
+    with open(path, "wb") as file:
+        file.write(b"solid box".ljust(HEADER_SIZE, b" "))
+        file.write(np.uint32(len(records)).tobytes())
+        file.write(records.tobytes())
+
+
+def write_ascii_stl(path: str, corners: np.ndarray):
+    with open(path, "w") as file:
+        file.write("solid box\n")
+        for triangle in corners.tolist():
+            file.write(" facet normal 0 0 0\n  outer loop\n")
+            for x, y, z in triangle:
+                file.write(f"   vertex {x:.6e} {y:.6e} {z:.6e}\n")
+            file.write("  endloop\n endfacet\n")
+        file.write("endsolid box\n")
+
+
+def report(name: str, path: str):
+    start = time.perf_counter()
+    stats = analyze_stl(path)
+    elapsed = time.perf_counter() - start
+    width, depth, height = BOX
+    exact = (
+        width * depth * height,
+        2 * (width * depth + width * height + depth * height),
+        width * depth,
+    )
+    measured = (stats.volume, stats.surface_area, stats.bed_area)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(
+        f"{name:6} {stats.triangles:9} triangles, {size_mb:4.0f} MB "
+        f"in {elapsed:6.3f} s ({stats.triangles / elapsed / 1e6:5.1f} M triangles/s)"
+        + (
+            ""
+            if all(math.isclose(a, b, rel_tol=1e-5) for a, b in zip(measured, exact))
+            else f"  MEASURED {measured}, EXACT {exact}"
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--triangles", type=float, default=5e6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary = os.path.join(directory, "binary.stl")
+        ascii = os.path.join(directory, "ascii.stl")
+        print("Writing the STL files...")
+        write_binary_stl(binary, box_corners(round(math.sqrt(args.triangles / 12))))
+        write_ascii_stl(ascii, box_corners(round(math.sqrt(args.triangles / 120))))
+        report("binary", binary)
+        report("ascii", ascii)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Measure a synthetic 3MF model and report parse time and peak memory.
+
+The model is a finely subdivided box, used twice: once through a component
+with a translation and once as a mirrored build item, so the exact volume and
+area are known. The pull parser is compared with building the whole element
+tree, every method in its own process so their peak RSS can be compared.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+
+from analysis.threemf import CORE_NAMESPACE, MODEL_PART, ThreeMfPackage
+
+from .gcode_analysis import peak_rss_mb
+
+BOX = (40.0, 30.0, 20.0)  # mm
+ROWS = 10000  # vertices written at a time
+
+
+def box_faces(divisions: int) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Vertices and outward triangles of the six faces of a subdivided box."""
+    width, depth, height = BOX
+    x, y, z = np.array([width, 0, 0]), np.array([0, depth, 0]), np.array([0, 0, height])
+    zero = np.zeros(3)
+    # Origin and two edges per face, their cross product points outwards
+    faces = [
+        (zero, y, x),
+        (z, x, y),
+        (zero, x, z),
+        (y, z, x),
+        (zero, z, y),
+        (x, y, z),
+    ]
+    steps = np.linspace(0.0, 1.0, divisions + 1)
+    u, v = np.meshgrid(steps, steps, indexing="ij")
+    u, v = u.ravel()[:, None], v.ravel()[:, None]
+
+    i, j = np.meshgrid(np.arange(divisions), np.arange(divisions), indexing="ij")
+    a = (i * (divisions + 1) + j).ravel()
+    b, c, d = a + divisions + 1, a + divisions + 2, a + 1
+    triangles = np.concatenate(
+        (np.stack((a, b, c), axis=1), np.stack((a, c, d), axis=1))
+    )
+    return [
+        (origin + u * first + v * second, triangles)
+        for origin, first, second in faces
+    ]
+
+
+def write_synthetic_3mf(path: str, divisions: int) -> int:
+    """Write the box model, returns the number of triangles of one box."""
+    faces = box_faces(divisions)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        with package.open(MODEL_PART, "w") as model:
+            model.write(
+                f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<model unit="millimeter" xmlns="{CORE_NAMESPACE}">\n'
+                f'<resources>\n<object id="1" type="model">\n<mesh>\n'
+                f"<vertices>\n".encode()
+            )
+            for vertices, _ in faces:
+                for start in range(0, len(vertices), ROWS):
+                    model.write(
+                        "".join(
+                            f'<vertex x="{x:.4f}" y="{y:.4f}" z="{z:.4f}"/>\n'
+                            for x, y, z in vertices[start : start + ROWS].tolist()
+                        ).encode()
+                    )
+            model.write(b"</vertices>\n<triangles>\n")
+            offset = 0
+            for vertices, triangles in faces:
+                for start in range(0, len(triangles), ROWS):
+                    model.write(
+                        "".join(
+                            f'<triangle v1="{a}" v2="{b}" v3="{c}"/>\n'
+                            for a, b, c in (
+                                triangles[start : start + ROWS] + offset
+                            ).tolist()
+                        ).encode()
+                    )
+                offset += len(vertices)
+            model.write(
+                b"</triangles>\n</mesh>\n</object>\n"
+                b'<object id="2" type="model"><components>'
+                b'<component objectid="1" transform="1 0 0 0 1 0 0 0 1 10 10 0"/>'
+                b"</components></object>\n</resources>\n<build>\n"
+                b'<item objectid="2"/>\n'
+                b'<item objectid="1" transform="-1 0 0 0 1 0 0 0 1 120 10 0"/>\n'
+                b"</build>\n</model>\n"
+            )
+    return sum(len(triangles) for _, triangles in faces)
+
+
+def run_pull(path: str) -> int:
+    with ThreeMfPackage(path) as package:
+        stats = package.analyze()
+    width, depth, height = BOX
+    volume = 2 * width * depth * height
+    area = 4 * (width * depth + width * height + depth * height)
+    print(
+        f"volume {stats.volume:.3f} mm³ (exact {volume:.3f}), "
+        f"area {stats.surface_area:.3f} mm² (exact {area:.3f}), size {stats.size}"
+    )
+    return stats.triangles
+
+
+def run_tree(path: str) -> int:
+    with ThreeMfPackage(path) as package, package.open_part(MODEL_PART) as stream:
+        root = ElementTree.parse(stream).getroot()
+    triangles = root.iter(f"{{{CORE_NAMESPACE}}}triangle")
+    return 2 * sum(1 for _ in triangles)
+
+
+METHODS = {"pull": run_pull, "tree": run_tree}
+
+
+def run_method(method: str, path: str):
+    start = time.perf_counter()
+    triangles = METHODS[method](path)
+    elapsed = time.perf_counter() - start
+    rss = peak_rss_mb()
+    print(
+        f"{method:5} {triangles} triangles in {elapsed:.2f} s "
+        f"({triangles / elapsed / 1e6:.2f} M triangles/s)"
+        + (f", peak RSS {rss:.0f} MB" if rss is not None else "")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--divisions", type=int, default=300)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--method", choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method:
+        run_method(args.method, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.3mf")
+        triangles = write_synthetic_3mf(path, args.divisions)
+        print(
+            f"Box of {triangles} triangles, "
+            f"{os.path.getsize(path) / (1024 * 1024):.0f} MB package"
+        )
+        for method in METHODS:
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.threemf_reader",
+                    "--method",
+                    method,
+                    "--path",
+                    path,
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
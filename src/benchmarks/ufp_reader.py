@@ -0,0 +1,113 @@
+"""Compare streaming a UFP package with extracting it before parsing.
+
+Every method runs in its own process, so the peak RSS of one does not hide the
+peak of the next.
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+from analysis import GcodeAnalyzer, UfpPackage, analyze_file, analyze_stream
+from analysis.opc import THUMBNAIL_PART
+from analysis.ufp import GCODE_PART
+
+from .gcode_analysis import peak_rss_mb, write_synthetic_file
+
+RELATIONSHIPS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Target="/3D/model.gcode" Id="rel0"
+ Type="http://schemas.ultimaker.org/package/2018/relationships/gcode"/>
+<Relationship Target="/Metadata/thumbnail.png" Id="rel1"
+ Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/thumbnail"/>
+</Relationships>
+"""
+
+
+def write_synthetic_ufp(path: str, size: int):
+    """Write a UFP package with a synthetic G-code part of about size bytes."""
+    directory = os.path.dirname(path)
+    gcode_path = os.path.join(directory, "model.gcode")
+    write_synthetic_file(gcode_path, size)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("_rels/.rels", RELATIONSHIPS)
+        package.writestr(THUMBNAIL_PART, b"\x89PNG\r\n\x1a\n")
+        package.write(gcode_path, GCODE_PART)
+    os.remove(gcode_path)
+
+
+def run_stream(path: str):
+    with UfpPackage(path) as package:
+        return package.analyze(GcodeAnalyzer())
+
+
+def run_extract(path: str):
+    with tempfile.TemporaryDirectory() as directory:
+        with zipfile.ZipFile(path) as package:
+            gcode_path = package.extract(GCODE_PART, directory)
+        return analyze_file(gcode_path)
+
+
+def run_read(path: str):
+    with zipfile.ZipFile(path) as package:
+        data = package.read(GCODE_PART)
+    return analyze_stream(io.BytesIO(data))
+
+
+METHODS = {"stream": run_stream, "extract": run_extract, "read": run_read}
+
+
+def run_method(method: str, path: str):
+    start = time.perf_counter()
+    stats = METHODS[method](path)
+    elapsed = time.perf_counter() - start
+    size_mb = stats.bytes_read / (1024 * 1024)
+    rss = peak_rss_mb()
+    print(
+        f"{method:8} {size_mb:.0f} MB G-code in {elapsed:.2f} s "
+        f"({size_mb / elapsed:.1f} MB/s)"
+        + (f", peak RSS {rss:.0f} MB" if rss is not None else "")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--path", help="benchmark this package instead")
+    parser.add_argument("--method", choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method:
+        run_method(args.method, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path
+        if path is None:
+            path = os.path.join(directory, "synthetic.ufp")
+            print(f"Writing UFP with {args.size_mb} MB synthetic G-code...")
+            write_synthetic_ufp(path, args.size_mb * 1024 * 1024)
+        print(f"Package size {os.path.getsize(path) / (1024 * 1024):.0f} MB")
+
+        for method in METHODS:
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.ufp_reader",
+                    "--method",
+                    method,
+                    "--path",
+                    path,
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
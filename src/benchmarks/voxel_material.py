@@ -0,0 +1,324 @@
+"""Estimate the material of unsliced models and compare it with sliced G-code.
+
+Every model is written as an STL and sliced by a small slicer for its shape,
+which writes perimeters, solid top and bottom layers and rectilinear sparse
+infill as G-code, like a slicer with the same wall thickness and infill. The
+voxel estimate of the STL at several memory budgets is compared with the
+filament of the G-code, with the time taken.
+
+--model and --gcode compare a model with G-code sliced from it by a real slicer
+instead, sliced with the --wall-thickness and --infill given. --scale makes
+the models larger, to see the voxel pitch grow with them in a memory budget.
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from analysis import MaterialOptions, analyze_path
+from analysis.voxels import grid_pitch
+from quoting import PriceParameters
+
+from .stl_reader import box_corners, write_binary_stl
+from .threemf_reader import BOX
+
+LINE_WIDTH = 0.4  # mm
+LAYER_HEIGHT = 0.2  # mm
+SEGMENT = 0.5  # mm, of the lines G-code circles are made of
+BUDGETS_MB = (1, 8, 64, 256)
+TUBE = (20.0, 10.0, 30.0)  # outer and hole radius and height, mm
+SPHERE_RADIUS = 20.0  # mm
+
+
+class Slice:
+    """The region of a layer: a rectangle or circle around the origin, with an
+    optional round hole."""
+
+    def __init__(self, outer: tuple, hole: float = 0.0):
+        self.outer = outer  # ("rect", half width, half depth) or ("circle", radius)
+        self.hole = hole  # radius
+
+    def inset(self, distance: float) -> "Slice | None":
+        """The slice shrunk by distance, None when nothing is left."""
+        if self.outer[0] == "rect":
+            outer = ("rect", self.outer[1] - distance, self.outer[2] - distance)
+        else:
+            outer = ("circle", self.outer[1] - distance)
+        hole = self.hole + distance if self.hole else 0.0
+        if min(outer[1:]) <= hole or min(outer[1:]) <= 0:
+            return None
+        return Slice(outer, hole)
+
+    def scaled(self, factor: float) -> "Slice":
+        return Slice(
+            (self.outer[0], *(size * factor for size in self.outer[1:])),
+            self.hole * factor,
+        )
+
+    def transposed(self) -> "Slice":
+        if self.outer[0] == "rect":
+            return Slice(("rect", self.outer[2], self.outer[1]), self.hole)
+        return self
+
+    def spans(self, y: float) -> list[tuple[float, float]]:
+        """The intervals of X inside the slice at y."""
+        if self.outer[0] == "rect":
+            half = self.outer[1] if abs(y) < self.outer[2] else None
+        else:
+            radius = self.outer[1]
+            half = math.sqrt(radius**2 - y**2) if abs(y) < radius else None
+        if half is None:
+            return []
+        if abs(y) >= self.hole:
+            return [(-half, half)]
+        hole = math.sqrt(self.hole**2 - y**2)
+        return [(-half, -hole), (hole, half)]
+
+    def loops(self, distance: float) -> list[list[tuple[float, float]]]:
+        """The perimeters at distance inside the outline and outside the hole."""
+        loops = []
+        if self.outer[0] == "rect":
+            a, b = self.outer[1] - distance, self.outer[2] - distance
+            loops.append([(-a, -b), (a, -b), (a, b), (-a, b), (-a, -b)])
+        else:
+            loops.append(_circle(self.outer[1] - distance))
+        if self.hole:
+            loops.append(_circle(self.hole + distance))
+        return loops
+
+
+def _circle(radius: float) -> list[tuple[float, float]]:
+    count = max(8, math.ceil(2 * math.pi * radius / SEGMENT))
+    return [
+        (radius * math.cos(angle), radius * math.sin(angle))
+        for angle in np.linspace(0, 2 * math.pi, count + 1)
+    ]
+
+
+def _intersect(slices: list[Slice | None]) -> Slice | None:
+    """The common region of concentric slices of the same shape."""
+    if any(part is None for part in slices):
+        return None
+    if slices[0].outer[0] == "rect":
+        outer = (
+            "rect",
+            min(part.outer[1] for part in slices),
+            min(part.outer[2] for part in slices),
+        )
+    else:
+        outer = ("circle", min(part.outer[1] for part in slices))
+    return Slice(outer, max(part.hole for part in slices)).inset(0.0)
+
+
+def _subtract(spans, removed) -> list[tuple[float, float]]:
+    for low, high in removed:
+        spans = [
+            piece
+            for start, end in spans
+            for piece in ((start, min(end, low)), (max(start, high), end))
+            if piece[1] > piece[0]
+        ]
+    return spans
+
+
+def slice_model(slice_at, height: float, options: MaterialOptions) -> bytes:
+    """G-code of a model, slice_at gives the Slice at a height or None."""
+    radius = PriceParameters().filament_diameter / 2
+    e_per_mm = LINE_WIDTH * LAYER_HEIGHT / (math.pi * radius**2)
+    walls = max(1, round(options.wall_thickness / LINE_WIDTH))
+    solid_layers = max(1, round(options.wall_thickness / LAYER_HEIGHT))
+    layer_count = round(height / LAYER_HEIGHT)
+    layers = [slice_at((i + 0.5) * LAYER_HEIGHT) for i in range(layer_count)]
+    inner = [part and part.inset(walls * LINE_WIDTH) for part in layers]
+    lines = ["M82", "M83", "G92 E0"]
+
+    def path(points):
+        lines.append(f"G0 X{points[0][0]:.3f} Y{points[0][1]:.3f}")
+        for (x0, y0), (x, y) in zip(points, points[1:]):
+            length = math.hypot(x - x0, y - y0)
+            lines.append(f"G1 X{x:.3f} Y{y:.3f} E{length * e_per_mm:.5f}")
+
+    for number, part in enumerate(layers):
+        lines.append(f";LAYER:{number}")
+        lines.append(f"G0 Z{(number + 1) * LAYER_HEIGHT:.2f}")
+        if part is None:
+            continue
+        for wall in range(walls):
+            for loop in part.loops((wall + 0.5) * LINE_WIDTH):
+                path(loop)
+        if inner[number] is None:
+            continue
+        # Sparse where the layers within the top and bottom thickness cover it
+        nearby = range(number - solid_layers, number + solid_layers + 1)
+        sparse = None
+        if nearby[0] >= 0 and nearby[-1] < layer_count:
+            sparse = _intersect([inner[i] for i in nearby])
+        region = inner[number]
+        transpose = number % 2 == 1
+        if transpose:
+            region = region.transposed()
+            sparse = sparse and sparse.transposed()
+        for spacing, spans_at in (
+            (
+                LINE_WIDTH,
+                lambda y: _subtract(region.spans(y), sparse.spans(y) if sparse else []),
+            ),
+            (
+                LINE_WIDTH / options.infill if options.infill else math.inf,
+                lambda y: sparse.spans(y) if sparse else [],
+            ),
+        ):
+            if spacing == math.inf:
+                continue
+            y = -200 + spacing / 2
+            while y < 200:
+                for start, end in spans_at(y):
+                    points = [(start, y), (end, y)]
+                    if transpose:
+                        points = [(b, a) for a, b in points]
+                    path(points)
+                y += spacing
+    return ("\n".join(lines) + "\n").encode()
+
+
+def grid_corners(points: np.ndarray) -> np.ndarray:
+    """Two triangles per cell of a (rows, columns, 3) grid of points."""
+    a, b = points[:-1, :-1], points[1:, :-1]
+    c, d = points[1:, 1:], points[:-1, 1:]
+    return np.concatenate(
+        (
+            np.stack((a, c, b), axis=2).reshape(-1, 3, 3),
+            np.stack((a, d, c), axis=2).reshape(-1, 3, 3),
+        )
+    )
+
+
+def revolved_corners(radius: np.ndarray, z: np.ndarray, segments: int) -> np.ndarray:
+    """Triangles of the surface traced by a profile of radius and z around Z."""
+    angle = np.linspace(0, 2 * math.pi, segments + 1)
+    return grid_corners(
+        np.stack(
+            (
+                radius[:, None] * np.cos(angle),
+                radius[:, None] * np.sin(angle),
+                np.broadcast_to(z[:, None], (len(z), len(angle))),
+            ),
+            axis=-1,
+        )
+    )
+
+
+def tube_corners(segments: int = 256) -> np.ndarray:
+    """Triangles of a tube, a closed profile around its hole."""
+    outer, hole, height = TUBE
+    # Counterclockwise around the cross section of the wall, faces point out
+    radius = np.array([hole, outer, outer, hole, hole])
+    z = np.array([0.0, 0.0, height, height, 0.0])
+    return revolved_corners(radius, z, segments)
+
+
+def sphere_corners(rows: int = 200) -> np.ndarray:
+    """Triangles of a sphere resting on the bed."""
+    polar = np.linspace(math.pi, 0, rows + 1)
+    return revolved_corners(
+        SPHERE_RADIUS * np.sin(polar),
+        SPHERE_RADIUS * (np.cos(polar) + 1),
+        2 * rows,
+    )
+
+
+def _sphere_slice(z: float) -> Slice | None:
+    radius = math.sqrt(max(SPHERE_RADIUS**2 - (z - SPHERE_RADIUS) ** 2, 0.0))
+    return Slice(("circle", radius)) if radius > 0 else None
+
+
+MODELS = {
+    "box": (
+        lambda: box_corners(50),
+        lambda z: Slice(("rect", BOX[0] / 2, BOX[1] / 2)),
+        BOX[2],
+    ),
+    "tube": (
+        tube_corners,
+        lambda z: Slice(("circle", TUBE[0]), TUBE[1]),
+        TUBE[2],
+    ),
+    "sphere": (sphere_corners, _sphere_slice, 2 * SPHERE_RADIUS),
+}
+
+
+def _scaled(part: Slice | None, factor: float) -> Slice | None:
+    return part and part.scaled(factor)
+
+
+def filament_volume(gcode_path: str) -> float:
+    """mm³ of filament extruded by G-code."""
+    stats = analyze_path(gcode_path)
+    radius = PriceParameters().filament_diameter / 2
+    return stats.filament_length * math.pi * radius**2
+
+
+def compare(name: str, model_path: str, gcode_path: str, options: MaterialOptions):
+    start = time.perf_counter()
+    sliced = filament_volume(gcode_path)
+    elapsed = time.perf_counter() - start
+    solid = analyze_path(model_path).volume
+    print(
+        f"{name:8} sliced {sliced / 1000:7.2f} cm³ in {elapsed:5.2f} s to analyze, "
+        f"solid {solid / 1000:7.2f} cm³ ({solid / sliced - 1:+.1%})"
+    )
+    for budget in BUDGETS_MB:
+        material = MaterialOptions(
+            options.wall_thickness, options.infill, budget << 20
+        )
+        start = time.perf_counter()
+        stats = analyze_path(model_path, material=material)
+        elapsed = time.perf_counter() - start
+        estimate = stats.material_volume
+        pitch = grid_pitch(np.subtract(stats.bbox_max, stats.bbox_min), material)
+        print(
+            f"{'':8} {budget:4} MB  estimate {estimate / 1000:7.2f} cm³ "
+            f"({estimate / sliced - 1:+.1%}) in {elapsed:5.2f} s, "
+            f"{pitch:.2f} mm voxels"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    defaults = MaterialOptions()
+    parser.add_argument("--wall-thickness", type=float, default=defaults.wall_thickness)
+    parser.add_argument("--infill", type=float, default=defaults.infill * 100)
+    parser.add_argument("--model", help="an STL or 3MF file")
+    parser.add_argument("--gcode", help="G-code sliced from the model")
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+    options = MaterialOptions(args.wall_thickness, args.infill / 100)
+
+    if args.model or args.gcode:
+        if not (args.model and args.gcode):
+            parser.error("--model and --gcode go together")
+        compare(os.path.basename(args.model), args.model, args.gcode, options)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (corners, slice_at, height) in MODELS.items():
+            model_path = os.path.join(directory, f"{name}.stl")
+            gcode_path = os.path.join(directory, f"{name}.gcode")
+            write_binary_stl(model_path, corners() * args.scale)
+            with open(gcode_path, "wb") as file:
+                file.write(
+                    slice_model(
+                        lambda z: _scaled(slice_at(z / args.scale), args.scale),
+                        height * args.scale,
+                        options,
+                    )
+                )
+            compare(name, model_path, gcode_path, options)
+
+
+if __name__ == "__main__":
+    main()
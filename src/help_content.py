@@ -13,6 +13,14 @@ The help tab provides access to the documentation and support resources. Here yo
         "title": "Section 2: Supported File Formats",
         "text": """Since this application is designed to work with Ultimaker Cura, it supports the following file formats:
         - .gcode: The standard file format for 3D printing, containing instructions for the printer.
-        - .ufp: Ultimaker's Format Package, which is a compressed file format that contains all necessary files for a 3D print job, including the G-code and any associated resources."""
+        - .ufp: Ultimaker's Format Package, which is a compressed file format that contains all necessary files for a 3D print job, including the G-code and any associated resources.
+        - .3mf: 3D Manufacturing Format, a model that is not sliced yet. Its volume, surface area, size, footprint on the bed and the area of the faces it rests on the bed with are measured.
+        - .stl: A model that is not sliced yet, binary or text, measured like a .3mf file. STL has no units, millimeters are assumed.
+        - .gcode.gz and .gcode.zst: G-code compressed with gzip or Zstandard, decompressed while it is read. Zstandard needs the zstandard package.
+        - .bgcode: Prusa's binary G-code, decoded block by block. With the slicer's print time, like batch_quote --slicer-estimates, only its metadata is read.
+
+A model that is not sliced is not printed solid. Its walls, top and bottom are estimated with the Wall thickness setting and the inside with the Infill setting, from a grid of small cubes, voxels, the model is divided in. Larger models get coarser voxels to stay within the Voxel memory setting.
+
+Large .gcode files are split over several processes, set with the Analysis processes setting. The results are the same as with one process. When a file that was analyzed before is edited near its end, or grows while a slicer writes it, only the part after the change is parsed again."""
     },
 ]
\ No newline at end of file
@@ -1,116 +1,41 @@
-import customtkinter as ctk
-import logging
-import os
-import sys
-
-from help_frame import HelpFrame
-
-from app import AppFrameSkeleton, Application, AppControllerSkeleton
-from app.events import ControllerEvent, FrameEvent, SettingEvent
-from app.settings import (
-    BoolSettingSkeleton,
-    IntSliderSettingSkeleton,
-    StringSettingSkeleton,
-)
-
-
-def resource_path(relative_path):
-    """Get absolute path to resource, works for dev and for PyInstaller"""
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except AttributeError:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
-
-
-# setup logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
+"""Printonomics, quotes for 3D printing jobs.
 
-class DemoControlEvent(ControllerEvent):
-    def __init__(self):
-        super().__init__("DemoControlEvent")
+Without arguments the GUI is started. The quote command prices print jobs
+without the GUI, for scripts and servers without a display:
 
+    python -m printonomics quote part.gcode models/ --margin 30
 
-class DemoFrameEvent(FrameEvent):
-    def __init__(self):
-        super().__init__("DemoFrameEvent")
-
-
-class FrameDemo(AppFrameSkeleton):
-    def __init__(self, settings, event_queue, *args, **kwargs):
-        super().__init__(settings, event_queue, *args, **kwargs)
-        self._name = "FrameDemo"
-        logging.info("FrameDemo initialized")
-
-        self.button = ctk.CTkButton(
-            self,
-            text="Trigger Demo Event",
-            command=lambda: self._push_event(DemoFrameEvent()),
-        )
-        self.button.pack(pady=20)
-
-        self.label = ctk.CTkLabel(
-            self, text="Nothing", font=("TkDefaultFont", 24, "bold")
-        )
-        self.label.pack(pady=20)
-
-        self.setting_label = ctk.CTkLabel(
-            self, text="Setting Value: " + str(self.settings.get_setting("Henk").value)
-        )
-        self.setting_label.pack(pady=20)
-
-    def on_event(self, event):
-        if isinstance(event, SettingEvent):
-            self.label.configure(text=event.value)
-        elif isinstance(event, DemoControlEvent):
-            self.label.configure(text="Clicked")
+Only the modules of the chosen command are imported, so the quote command does
+not load Tk, PIL or NumPy until a file needs them.
+"""
 
+import sys
 
-class ControlDemo(AppControllerSkeleton):
-    def init(self):
-        logging.info("ControlDemo initialized")
+USAGE = """usage: printonomics [quote PATH... [options]]
 
-    def on_event(self, event):
-        if isinstance(event, DemoFrameEvent):
-            self._push_event(DemoControlEvent())
+commands:
+  quote    quote print job files and directories, see quote --help
+"""
 
 
-class Printonomics(Application):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.add_new_frame("Help", HelpFrame)
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        from printonomics_gui import run
 
-        self.add_option(
-            [
-                BoolSettingSkeleton(name).with_description("Persional setting")
-                for name in [
-                    "Wim",
-                    "Henk",
-                ]
-            ]
-            + [
-                StringSettingSkeleton("Naam"),
-                IntSliderSettingSkeleton("Slider", 0, 0, 100).with_description(
-                    "Set maximum volage of HVB [V]"
-                ),
-            ]
-        )
-        self.add_new_frame("FrameDemo", FrameDemo)
-        self.add_controller(ControlDemo())
+        return run()
+    if argv[0] == "quote":
+        from batch_quote import main as quote
 
-        self.set_icon(resource_path("assets/printonomics.ico"))
-        self.set_logo(resource_path("assets/printonomics.jpg"))
-        self.refresh_rate = 100
+        return quote(argv[1:], prog="printonomics quote")
+    print(USAGE, file=sys.stderr, end="")
+    return 0 if argv[0] in ("-h", "--help") else 2
 
 
 if __name__ == "__main__":
-    app = ctk.CTk()
-    printonomics = Printonomics(
-        name="printonomics", copyright="Loek © 2025", master=app
-    )
-    printonomics.mainloop()
+    if getattr(sys, "frozen", False):
+        # Worker processes of frozen builds start through this script
+        import multiprocessing
+
+        multiprocessing.freeze_support()
+    sys.exit(main())
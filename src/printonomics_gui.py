@@ -0,0 +1,171 @@
+"""The Printonomics GUI, imported by printonomics.py when no command is given."""
+
+import customtkinter as ctk
+import logging
+import os
+import sys
+
+from analysis_controller import (
+    AnalysisController,
+    analysis_options,
+    kinematics_options,
+    material_options,
+    pricing_options,
+)
+from batch_controller import BatchController
+
+from analysis import AnalysisCache
+from app import AppFrameSkeleton, Application, AppControllerSkeleton
+from app.frame_factory import FrameFactory
+from app.events import ControllerEvent, FrameEvent, SettingEvent
+from app.settings import (
+    BoolSettingSkeleton,
+    IntSliderSettingSkeleton,
+    StringSettingSkeleton,
+)
+
+
+# When set, the time to the first frame is printed and the application closes
+STARTUP_PROBE = "PRINTONOMICS_STARTUP_PROBE"
+
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+
+class DemoControlEvent(ControllerEvent):
+    def __init__(self):
+        super().__init__("DemoControlEvent")
+
+
+class DemoFrameEvent(FrameEvent):
+    def __init__(self):
+        super().__init__("DemoFrameEvent")
+
+
+class FrameDemo(AppFrameSkeleton):
+    def __init__(self, settings, event_queue, *args, **kwargs):
+        super().__init__(settings, event_queue, *args, **kwargs)
+        self._name = "FrameDemo"
+        logging.info("FrameDemo initialized")
+
+        self.button = ctk.CTkButton(
+            self,
+            text="Trigger Demo Event",
+            command=lambda: self._push_event(DemoFrameEvent()),
+        )
+        self.button.pack(pady=20)
+
+        self.label = ctk.CTkLabel(
+            self, text="Nothing", font=("TkDefaultFont", 24, "bold")
+        )
+        self.label.pack(pady=20)
+
+        self.setting_label = ctk.CTkLabel(
+            self, text="Setting Value: " + str(self.settings.get_setting("Henk").value)
+        )
+        self.setting_label.pack(pady=20)
+
+    def on_show(self):
+        self.setting_label.configure(
+            text="Setting Value: " + str(self.settings.get_setting("Henk").value)
+        )
+
+    def on_event(self, event):
+        if isinstance(event, SettingEvent):
+            self.label.configure(text=event.value)
+        elif isinstance(event, DemoControlEvent):
+            self.label.configure(text="Clicked")
+
+
+class ControlDemo(AppControllerSkeleton):
+    def init(self):
+        logging.info("ControlDemo initialized")
+
+    def on_event(self, event):
+        if isinstance(event, DemoFrameEvent):
+            self._push_event(DemoControlEvent())
+
+
+class Printonomics(Application):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Frames by path are imported when they are first shown
+        self.add_new_frame("Help", "help_frame.HelpFrame")
+
+        self.add_option(
+            [
+                BoolSettingSkeleton(name).with_description("Persional setting")
+                for name in [
+                    "Wim",
+                    "Henk",
+                ]
+            ]
+            + [
+                StringSettingSkeleton("Naam"),
+                IntSliderSettingSkeleton("Slider", 0, 0, 100).with_description(
+                    "Set maximum volage of HVB [V]"
+                ),
+            ]
+        )
+        self.add_new_frame("FrameDemo", FrameDemo)
+        self.add_controller(ControlDemo())
+
+        # Analysis results are cached beside the settings file
+        cache = AnalysisCache.beside(FrameFactory.settings.settings_file)
+        self.add_new_frame("Quote", "quote_frame.QuoteFrame")
+        self.add_controller(AnalysisController(cache))
+        self.add_option(analysis_options())
+        self.add_option(kinematics_options())
+        self.add_option(material_options())
+        self.add_option(pricing_options())
+
+        self.add_new_frame("Batch", "batch_frame.BatchFrame")
+        self.add_controller(BatchController(cache))
+
+        self.enable_frame_cache(max_frames=3)
+
+        self.set_icon(resource_path("assets/printonomics.ico"))
+        self.set_logo(resource_path("assets/printonomics.jpg"))
+        self.refresh_rate = 100
+
+
+def run() -> int:
+    """Start the GUI and run it until it is closed."""
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    app = ctk.CTk()
+    printonomics = Printonomics(
+        name="printonomics", copyright="Loek © 2025", master=app
+    )
+    if os.environ.get(STARTUP_PROBE):
+        _probe_startup(printonomics)
+    printonomics.mainloop()
+    return 0
+
+
+def _probe_startup(window):
+    """Report the first paint of the window and when deferred work is done.
+
+    Used by benchmarks/gui_startup.py, which times the lines from the start of
+    the process, so it works for the PyInstaller build too.
+    """
+
+    def on_first_expose(_):
+        window.unbind("<Expose>", binding)
+        print("first frame", flush=True)
+        window.after_idle(on_idle)
+
+    def on_idle():
+        print("idle", flush=True)
+        window.quit()
+
+    binding = window.bind("<Expose>", on_first_expose)
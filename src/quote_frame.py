@@ -0,0 +1,186 @@
+import io
+import logging
+import os
+from tkinter import filedialog
+
+import customtkinter as ctk
+from PIL import Image
+
+from app.app_frame import AppFrameSkeleton
+from analysis import CacheStats, GcodeStats
+from analysis.opc import OpcPackage
+from analysis_controller import (
+    AnalysisFailedEvent,
+    AnalysisFinishedEvent,
+    AnalysisProgressEvent,
+    AnalysisRepricedEvent,
+    AnalyzeFileEvent,
+)
+from quoting import JobCost
+
+FILE_TYPES = [
+    ("Print jobs", "*.gcode *.gcode.gz *.gcode.zst *.bgcode *.ufp *.3mf *.stl"),
+    ("G-code", "*.gcode *.gcode.gz *.gcode.zst"),
+    ("Binary G-code", "*.bgcode"),
+    ("Ultimaker Format Package", "*.ufp"),
+    ("3D Manufacturing Format", "*.3mf"),
+    ("STL model", "*.stl"),
+    ("All files", "*.*"),
+]
+PACKAGE_EXTENSIONS = (".ufp", ".3mf")
+THUMBNAIL_SIZE = 160
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration in seconds as hours and minutes."""
+    minutes = round(seconds / 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def format_gcode_stats(stats: GcodeStats) -> str:
+    """Describe the filament and print time of a G-code analysis."""
+    text = (
+        f"Filament: {stats.filament_length / 1000:.2f} m, "
+        f"{stats.filament_mass:.1f} g\n"
+        f"Print time: {format_duration(stats.print_time)}\n"
+        f"Layers: {stats.layer_count}"
+    )
+    if stats.slicer_time is not None:
+        text += f"\nSlicer estimate: {format_duration(stats.slicer_time)}"
+    return text
+
+
+def format_mesh_stats(stats) -> str:
+    """Describe the geometry of a measured model."""
+    width, depth, height = stats.size
+    text = (
+        f"Volume: {stats.volume / 1000:.2f} cm³\n"
+        f"Surface area: {stats.surface_area / 100:.1f} cm²\n"
+        f"Size: {width:.1f} x {depth:.1f} x {height:.1f} mm\n"
+        f"Footprint: {stats.footprint / 100:.1f} cm², "
+        f"{stats.bed_area / 100:.1f} cm² on the bed\n"
+        f"Triangles: {stats.triangles}"
+    )
+    if stats.material_volume is not None:
+        text += (
+            f"\nEstimated material: {stats.material_volume / 1000:.2f} cm³ "
+            f"(walls {stats.shell_volume / 1000:.2f}, "
+            f"infill {stats.infill_volume / 1000:.2f})"
+        )
+    return text
+
+
+def format_cost(cost: JobCost, currency: str = "€") -> str:
+    """Describe the cost of a job and what it is made of."""
+    text = f"Cost: {currency}{cost.total:.2f} (material {currency}{cost.material:.2f}"
+    if cost.print_hours is not None:
+        text += (
+            f", machine {currency}{cost.machine:.2f}"
+            f", energy {currency}{cost.energy:.2f}"
+        )
+    return (
+        text + f", labor {currency}{cost.labor:.2f}"
+        f", margin {currency}{cost.margin:.2f})"
+    )
+
+
+def format_cache_stats(stats: CacheStats) -> str:
+    """Describe how often the analysis cache was used."""
+    return (
+        f"Cache: {stats.hits} hits, {stats.misses} misses, "
+        f"{stats.entries} results stored"
+    )
+
+
+class QuoteFrame(AppFrameSkeleton):
+    """A frame to analyze a print job file."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._name = "Quote"
+        self.configure(border_width=1, corner_radius=1, fg_color="transparent")
+
+        self.open_button = ctk.CTkButton(
+            self, text="Open print job", command=self.open_file
+        )
+        self.open_button.pack(padx=20, pady=20)
+
+        self.file_label = ctk.CTkLabel(
+            self, text="No file selected", font=("TkDefaultFont", 18, "bold")
+        )
+        self.file_label.pack(padx=20, pady=5)
+
+        self.thumbnail_label = ctk.CTkLabel(self, text="")
+        self.thumbnail_label.pack(padx=20)
+        self.thumbnail_image: ctk.CTkImage = None
+
+        self.progress_bar = ctk.CTkProgressBar(self)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(fill="x", padx=20, pady=10)
+
+        self.result_label = ctk.CTkLabel(self, text="", justify="left")
+        self.result_label.pack(padx=20, pady=10)
+
+        self.cost_label = ctk.CTkLabel(self, text="", justify="left")
+        self.cost_label.pack(padx=20, pady=(0, 10))
+
+        self.cache_label = ctk.CTkLabel(self, text="", text_color="grey")
+        self.cache_label.pack(padx=20, pady=5)
+
+    def open_file(self):
+        """Ask for a file and request its analysis."""
+        path = filedialog.askopenfilename(filetypes=FILE_TYPES)
+        if not path:
+            return
+        logging.info(f"Selected {path}")
+        self.file_label.configure(text=os.path.basename(path))
+        self.progress_bar.set(0)
+        self.result_label.configure(text="Analyzing...")
+        self.cost_label.configure(text="")
+        self.show_thumbnail(path)
+        self._push_event(AnalyzeFileEvent(path))
+
+    def show_thumbnail(self, path: str):
+        """Show the thumbnail of a UFP or 3MF package, clear it for other files."""
+        pil_image = None
+        if path.lower().endswith(PACKAGE_EXTENSIONS):
+            try:
+                with OpcPackage(path) as package:
+                    thumbnail = package.thumbnail
+                if thumbnail is not None:
+                    pil_image = Image.open(io.BytesIO(thumbnail))
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not read the thumbnail of {path}: {e}")
+
+        if pil_image is None:
+            self.thumbnail_image = None
+            self.thumbnail_label.configure(image="")
+            return
+        height_ratio = pil_image.height / pil_image.width
+        self.thumbnail_image = ctk.CTkImage(
+            light_image=pil_image,
+            size=(THUMBNAIL_SIZE, int(THUMBNAIL_SIZE * height_ratio)),
+        )
+        self.thumbnail_label.configure(image=self.thumbnail_image)
+
+    def on_event(self, event):
+        if isinstance(event, AnalysisProgressEvent):
+            self.progress_bar.set(event.fraction)
+        elif isinstance(event, AnalysisFinishedEvent):
+            self.progress_bar.set(1)
+            stats = event.stats
+            if isinstance(stats, GcodeStats):
+                text = format_gcode_stats(stats)
+            else:
+                text = format_mesh_stats(stats)
+            if event.cached:
+                text += "\n(from the analysis cache)"
+            self.result_label.configure(text=text)
+            self.cost_label.configure(text=format_cost(event.cost))
+            if event.cache_stats is not None:
+                self.cache_label.configure(text=format_cache_stats(event.cache_stats))
+        elif isinstance(event, AnalysisRepricedEvent):
+            self.cost_label.configure(text=format_cost(event.cost))
+        elif isinstance(event, AnalysisFailedEvent):
+            self.progress_bar.set(0)
+            self.result_label.configure(text=f"Error: {event.error}")
@@ -0,0 +1,24 @@
+"""Pricing and batch quoting of print jobs. Independent of the GUI."""
+
+from .batch import (
+    Invoice,
+    JobResult,
+    find_jobs,
+    format_invoice,
+    quote_batch,
+    quote_file,
+)
+from .pricing import CostModel, JobCost, PriceParameters, price_job
+
+__all__ = [
+    "CostModel",
+    "Invoice",
+    "JobCost",
+    "JobResult",
+    "PriceParameters",
+    "find_jobs",
+    "format_invoice",
+    "price_job",
+    "quote_batch",
+    "quote_file",
+]
@@ -0,0 +1,371 @@
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+from analysis import SUPPORTED_EXTENSIONS, AnalysisCache, analyze_path
+
+from .pricing import CostModel, JobCost, PriceParameters, price_job
+
+
+@dataclass
+class JobResult:
+    """The quote of one file of a batch, or why it failed."""
+
+    path: str
+    stats: object = None  # GcodeStats or MeshStats
+    cost: JobCost = None
+    elapsed: float = 0.0  # s, spent analyzing in the worker
+    error: str | None = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Invoice:
+    """The combined quote of a batch of print jobs.
+
+    The costs of the quoted jobs are kept in a cost model, so the invoice can be
+    re-priced with other parameters without the analysis results.
+    """
+
+    def __init__(self, parameters: PriceParameters = None):
+        self.jobs: list[JobResult] = []
+        self.model = CostModel(parameters)
+        self._priced: list[tuple[JobResult, int]] = []  # quoted jobs, model row
+
+    @property
+    def parameters(self) -> PriceParameters:
+        return self.model.parameters
+
+    def add(self, result: JobResult):
+        """Add a result, a quoted job is priced with the parameters of the invoice."""
+        self.jobs.append(result)
+        if result.ok:
+            row = self.model.add_job(result.stats)
+            self._priced.append((result, row))
+            result.cost = self.model.job_cost(row)
+
+    def reprice(self, parameters: PriceParameters) -> list[str]:
+        """Price all jobs with new parameters, returns the recomputed quantities.
+
+        Only the quantities that depend on changed parameters are recomputed.
+        """
+        self.model.set_parameters(parameters)
+        recomputed = self.model.refresh()
+        if recomputed:
+            for job, row in self._priced:
+                job.cost = self.model.job_cost(row)
+        return recomputed
+
+    @property
+    def quoted(self) -> list[JobResult]:
+        return [job for job in self.jobs if job.ok]
+
+    @property
+    def failed(self) -> list[JobResult]:
+        return [job for job in self.jobs if not job.ok]
+
+    @property
+    def total(self) -> float:
+        return self.model.total("total")
+
+    @property
+    def filament_mass(self) -> float:
+        """Filament of all quoted jobs, in grams."""
+        return self.model.total("filament_mass")
+
+    @property
+    def print_hours(self) -> float:
+        """Print time of the quoted jobs that have one, in hours."""
+        return self.model.total("print_hours")
+
+
+def find_jobs(paths: Iterable[str], recursive: bool = True) -> list[str]:
+    """Expand directories to the supported print job files they contain."""
+    jobs = []
+    for path in paths:
+        if not os.path.isdir(path):
+            jobs.append(path)
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            jobs.extend(
+                os.path.join(directory, name)
+                for name in sorted(files)
+                if name.lower().endswith(SUPPORTED_EXTENSIONS)
+            )
+            if not recursive:
+                break
+    return jobs
+
+
+def _analyze_job(path: str, analyzer_options: dict) -> tuple[object, float, str]:
+    """Analyze one file in a worker process, returns the stats, time and error."""
+    start = time.perf_counter()
+    try:
+        stats = analyze_path(path, **analyzer_options)
+    except Exception as e:
+        # Any error is reported with the file, so the rest of the batch goes on
+        return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return stats, time.perf_counter() - start, None
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def quote_file(
+    path: str,
+    parameters: PriceParameters,
+    analyzer_options: dict | None = None,
+    cache: AnalysisCache = None,
+) -> JobResult:
+    """Analyze and price one file in this process.
+
+    A file that fails returns a result with its error. With a cache, a file
+    analyzed before is not analyzed again and the cache is flushed afterwards.
+    """
+    analyzer_options = analyzer_options or {}
+    key = None
+    if cache is not None:
+        try:
+            key = cache.key(path, analyzer_options)
+        except OSError:
+            pass  # reported by the analysis
+        stats = cache.get(key) if key else None
+        if stats is not None:
+            return JobResult(path, stats, price_job(stats, parameters), cached=True)
+
+    if key is not None:
+        analyzer_options = cache.analyzer_options(key, analyzer_options, path)
+    stats, elapsed, error = _analyze_job(path, analyzer_options)
+    if error is not None:
+        logging.error(f"Quoting {path} failed: {error}")
+        return JobResult(path, elapsed=elapsed, error=error)
+    if key is not None:
+        cache.put(key, stats)
+        cache.flush()
+    return JobResult(path, stats, price_job(stats, parameters), elapsed)
+
+
+def quote_batch(
+    paths: Iterable[str],
+    parameters: PriceParameters,
+    max_workers: int | None = None,
+    analyzer_options: dict | None = None,
+    cancelled: Callable[[], bool] = None,
+    cache: AnalysisCache = None,
+) -> Iterator[JobResult]:
+    """Analyze and price files in a process pool, yielding results as they finish.
+
+    The largest files are submitted first, so a big file at the end of the list
+    does not leave the other workers idle. A file that fails yields a result with
+    its error. cancelled is checked whenever a file finishes, when it returns True
+    the files that did not start yet are dropped.
+
+    Files found in the cache are yielded right away, new results are added to it
+    and the cache is flushed when the batch ends. A single file is quoted in this
+    process, starting a process pool takes longer than most files. Only a large
+    G-code file is split over max_workers, see analysis.parallel.
+    """
+    paths = sorted(paths, key=_file_size, reverse=True)
+    if not paths:
+        return
+    max_workers = max_workers or os.cpu_count() or 1
+    if len(paths) == 1:
+        options = {"workers": max_workers, **(analyzer_options or {})}
+        yield quote_file(paths[0], parameters, options, cache)
+        return
+    # Every file has a process already, files are not split over more
+    analyzer_options = {**(analyzer_options or {}), "workers": 1}
+    max_workers = min(max_workers, len(paths))
+
+    jobs = []
+    try:
+        for path in paths:
+            key = None
+            if cache is not None:
+                try:
+                    key = cache.key(path, analyzer_options)
+                except OSError:
+                    pass  # the worker reports the error
+                stats = cache.get(key) if key else None
+                if stats is not None:
+                    yield JobResult(
+                        path, stats, price_job(stats, parameters), cached=True
+                    )
+                    continue
+            options = analyzer_options
+            if key is not None:
+                options = cache.analyzer_options(key, analyzer_options, path)
+            jobs.append((path, key, options))
+
+        for path, key, stats, elapsed, error in _analyze_jobs(
+            jobs, max_workers, cancelled
+        ):
+            if error is None:
+                if key is not None:
+                    cache.put(key, stats)
+                yield JobResult(path, stats, price_job(stats, parameters), elapsed)
+            else:
+                logging.error(f"Quoting {path} failed: {error}")
+                yield JobResult(path, elapsed=elapsed, error=error)
+    finally:
+        if cache is not None:
+            cache.flush()
+
+
+def _analyze_jobs(
+    jobs: list[tuple[str, str, dict]],
+    max_workers: int,
+    cancelled: Callable[[], bool] = None,
+) -> Iterator[tuple]:
+    """Analyze jobs in process pools, yields the path, key, stats, time and error.
+
+    A worker that dies, like when it runs out of memory, breaks the pool and
+    every job in it. The job it was running fails, the pool is started again
+    for the jobs that did not finish. When other jobs were running as well, it
+    is not known which one it was, those jobs are then tried again one at a
+    time, alone in a pool. A worker reports a job before anything else, so when
+    one died before any job was reported, like while it started, all jobs that
+    did not finish are tried that way.
+    """
+    jobs = deque(jobs)
+    suspects = deque()  # jobs that were running when a worker died
+    while jobs or suspects:
+        if suspects:
+            batch, workers = [suspects.popleft()], 1
+        else:
+            batch, workers = list(jobs), min(max_workers, len(jobs))
+            jobs.clear()
+        left = yield from _analyze_in_pool(batch, workers, cancelled)
+        if left is None:
+            return
+        unfinished, running = left
+        if not running:
+            # The worker died before it reported a job, it may have been any of
+            # those that did not finish
+            running, unfinished = unfinished, []
+        if len(running) == 1:
+            path, key, _ = running[0]
+            yield path, key, None, 0.0, "The worker process died"
+        else:
+            suspects.extend(running)
+        jobs.extendleft(reversed(unfinished))
+
+
+def _analyze_in_pool(
+    jobs: list[tuple[str, str, dict]],
+    workers: int,
+    cancelled: Callable[[], bool] = None,
+):
+    """Analyze jobs in one process pool, yields results like _analyze_jobs.
+
+    Returns the jobs that did not start and those that were running when a
+    worker died, both empty when none died, or None when the batch was
+    cancelled.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    from multiprocessing import SimpleQueue
+
+    started = SimpleQueue()
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_start_worker, initargs=(started,)
+    )
+    running = set()
+    finished = set()
+    broken = False
+    try:
+        pending = {}
+        for index, (path, _, options) in enumerate(jobs):
+            try:
+                future = executor.submit(_analyze_started_job, index, path, options)
+            except BrokenProcessPool:
+                # A worker already died, like while it started
+                broken = True
+                break
+            pending[future] = index
+        while pending and not broken:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # Read as they come, a full pipe would block the workers
+            while not started.empty():
+                running.add(started.get())
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    stats, elapsed, error = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    continue
+                finished.add(index)
+                path, key, _ = jobs[index]
+                yield path, key, stats, elapsed, error
+            if cancelled is not None and cancelled():
+                logging.info(f"Batch cancelled, {len(pending)} files not quoted")
+                return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if not broken:
+        return [], []
+
+    while not started.empty():
+        running.add(started.get())
+    running -= finished
+    unfinished = [
+        job
+        for index, job in enumerate(jobs)
+        if index not in finished and index not in running
+    ]
+    return unfinished, [jobs[index] for index in sorted(running)]
+
+
+_started = None  # the queue a worker reports the jobs it starts to
+
+
+def _start_worker(started):
+    global _started
+    _started = started
+
+
+def _analyze_started_job(index: int, path: str, analyzer_options: dict) -> tuple:
+    """Report the start of a job of a pool, then analyze it like _analyze_job."""
+    _started.put(index)
+    return _analyze_job(path, analyzer_options)
+
+
+def format_invoice(invoice: Invoice, currency: str = "€") -> str:
+    """Format an invoice as a plain text table."""
+    names = [os.path.basename(job.path) for job in invoice.jobs]
+    name_width = max(map(len, names), default=4)
+    lines = [
+        f"{'File':<{name_width}}  {'Filament':>10}  {'Time':>8}  {'Cost':>10}  "
+        f"{'Analyzed':>8}"
+    ]
+    for name, job in zip(names, invoice.jobs):
+        if not job.ok:
+            lines.append(f"{name:<{name_width}}  failed: {job.error}")
+            continue
+        hours = job.cost.print_hours
+        time_text = f"{hours:.2f} h" if hours is not None else "-"
+        analyzed = "cached" if job.cached else f"{job.elapsed:.2f} s"
+        lines.append(
+            f"{name:<{name_width}}  {job.cost.filament_mass:>8.1f} g  "
+            f"{time_text:>8}  {currency}{job.cost.total:>9.2f}  {analyzed:>8}"
+        )
+    lines.append(
+        f"{'Total':<{name_width}}  {invoice.filament_mass:>8.1f} g  "
+        f"{invoice.print_hours:>6.2f} h  {currency}{invoice.total:>9.2f}"
+    )
+    if invoice.failed:
+        lines.append(f"{len(invoice.failed)} of {len(invoice.jobs)} files failed")
+    return "\n".join(lines)
@@ -0,0 +1,252 @@
+import dataclasses
+import math
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Callable
+
+from analysis import GcodeStats
+from analysis.gcode import FILAMENT_DENSITY, FILAMENT_DIAMETER
+
+
+@dataclass
+class PriceParameters:
+    """Prices used to quote a print job."""
+
+    material_cost: float = 25.0  # per kg of filament
+    machine_rate: float = 1.5  # per hour of printing, wear and depreciation
+    printer_power: float = 120.0  # W, average while printing
+    energy_price: float = 0.30  # per kWh
+    labor_rate: float = 30.0  # per hour
+    labor_minutes: float = 10.0  # of handling per job: preparing, removing, packing
+    margin_percent: float = 20.0  # on top of all costs
+    filament_diameter: float = FILAMENT_DIAMETER  # mm
+    filament_density: float = FILAMENT_DENSITY  # g/cm³
+
+
+@dataclass
+class JobCost:
+    """The cost of a print job, split by what it is spent on."""
+
+    filament_mass: float = 0.0  # g
+    print_hours: float | None = None  # unknown for models that are not sliced
+    material: float = 0.0
+    machine: float = 0.0
+    energy: float = 0.0
+    labor: float = 0.0
+    margin: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.material + self.machine + self.energy + self.labor + self.margin
+
+
+@dataclass(frozen=True)
+class Quantity:
+    """A quantity of the cost model, computed per job from its inputs.
+
+    Inputs are job inputs, price parameters or other quantities, by name.
+    """
+
+    name: str
+    inputs: tuple[str, ...]
+    compute: Callable[..., float]
+
+
+def _filament_volume(filament_length, model_volume, diameter) -> float:
+    """cm³ of filament, a model that is not sliced takes its model volume."""
+    if filament_length is None:
+        return model_volume / 1000
+    return filament_length * math.pi * (diameter / 2) ** 2 / 1000
+
+
+def _per_hour(hours, rate) -> float:
+    return hours * rate if hours is not None else 0.0
+
+
+def _energy(hours, power, price) -> float:
+    return hours * power / 1000 * price if hours is not None else 0.0
+
+
+# Inputs taken from the analysis of every job, see job_inputs
+JOB_INPUTS = ("filament_length", "model_volume", "print_time")
+
+# In topological order, every quantity only depends on quantities before it
+QUANTITIES = (
+    Quantity(
+        "filament_volume",
+        ("filament_length", "model_volume", "filament_diameter"),
+        _filament_volume,
+    ),
+    Quantity(
+        "filament_mass",
+        ("filament_volume", "filament_density"),
+        lambda volume, density: volume * density,
+    ),
+    Quantity(
+        "print_hours",
+        ("print_time",),
+        lambda seconds: seconds / 3600 if seconds is not None else None,
+    ),
+    Quantity(
+        "material",
+        ("filament_mass", "material_cost"),
+        lambda mass, cost: mass / 1000 * cost,
+    ),
+    Quantity("machine", ("print_hours", "machine_rate"), _per_hour),
+    Quantity("energy", ("print_hours", "printer_power", "energy_price"), _energy),
+    Quantity(
+        "labor",
+        ("labor_minutes", "labor_rate"),
+        lambda minutes, rate: minutes / 60 * rate,
+    ),
+    Quantity(
+        "subtotal",
+        ("material", "machine", "energy", "labor"),
+        lambda *costs: sum(costs),
+    ),
+    Quantity(
+        "margin",
+        ("subtotal", "margin_percent"),
+        lambda subtotal, percent: subtotal * percent / 100,
+    ),
+    Quantity(
+        "total",
+        ("subtotal", "margin"),
+        lambda subtotal, margin: subtotal + margin,
+    ),
+)
+
+
+def _find_dependents() -> dict[str, set[str]]:
+    """Map every input name to all quantities that depend on it, directly or not."""
+    dependents: dict[str, set[str]] = {}
+    for quantity in QUANTITIES:
+        for name in quantity.inputs:
+            dependents.setdefault(name, set()).add(quantity.name)
+    # Quantities are in topological order, so walking them backwards closes the
+    # sets over quantities that depend on quantities
+    for quantity in reversed(QUANTITIES):
+        for name in quantity.inputs:
+            dependents[name] |= dependents.get(quantity.name, set())
+    return dependents
+
+
+DEPENDENTS = _find_dependents()
+
+
+def job_inputs(stats) -> tuple:
+    """The job inputs of the stats of a G-code analysis or of a measured model.
+
+    A model is printed solid, unless its shell and infill were estimated.
+    """
+    if isinstance(stats, GcodeStats):
+        return stats.filament_length, None, stats.print_time
+    if stats.material_volume is not None:
+        return None, stats.material_volume, None
+    return None, stats.volume, None
+
+
+class CostModel:
+    """The costs of a set of jobs, as a graph of derived quantities.
+
+    Every quantity is a column with a value per job. When price parameters
+    change, only the quantities that depend on them are marked stale, and they
+    are recomputed when they are read. The analysis results of the jobs are
+    never needed again, so re-pricing does not depend on the size of the files.
+    """
+
+    def __init__(self, parameters: PriceParameters = None):
+        self.parameters = dataclasses.replace(parameters or PriceParameters())
+        self._columns: dict[str, list] = {
+            name: [] for name in (*JOB_INPUTS, *(q.name for q in QUANTITIES))
+        }
+        self._stale: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._columns["total"])
+
+    def add_job(self, stats) -> int:
+        """Add a job and compute its quantities, returns its row."""
+        self.refresh()
+        for name, value in zip(JOB_INPUTS, job_inputs(stats)):
+            self._columns[name].append(value)
+        row = len(self._columns[JOB_INPUTS[0]]) - 1
+        for quantity in QUANTITIES:
+            arguments = [self._get(name, row) for name in quantity.inputs]
+            self._columns[quantity.name].append(quantity.compute(*arguments))
+        return row
+
+    def set_parameters(self, parameters: PriceParameters) -> set[str]:
+        """Change the price parameters, returns the quantities that became stale."""
+        stale = set()
+        for field in dataclasses.fields(PriceParameters):
+            value = getattr(parameters, field.name)
+            if getattr(self.parameters, field.name) != value:
+                setattr(self.parameters, field.name, value)
+                stale |= DEPENDENTS.get(field.name, set())
+        self._stale |= stale
+        return stale
+
+    def refresh(self) -> list[str]:
+        """Recompute the stale quantities, returns their names in order."""
+        recomputed = []
+        if not self._stale:
+            return recomputed
+        count = len(self._columns[JOB_INPUTS[0]])
+        for quantity in QUANTITIES:
+            if quantity.name not in self._stale:
+                continue
+            # Columns are zipped, parameters are the same for every job
+            arguments = [
+                self._columns[name]
+                if name in self._columns
+                else repeat(getattr(self.parameters, name))
+                for name in quantity.inputs
+            ]
+            self._columns[quantity.name] = [
+                quantity.compute(*values)
+                for _, *values in zip(range(count), *arguments)
+            ]
+            recomputed.append(quantity.name)
+        self._stale.clear()
+        return recomputed
+
+    def column(self, name: str) -> list:
+        """Get the values of a quantity or job input for all jobs."""
+        self.refresh()
+        return self._columns[name]
+
+    def total(self, name: str) -> float:
+        """Sum a quantity over all jobs, jobs without a value are skipped."""
+        return sum(value for value in self.column(name) if value is not None)
+
+    def job_cost(self, row: int) -> JobCost:
+        """Get the cost of one job."""
+        self.refresh()
+        columns = self._columns
+        return JobCost(
+            filament_mass=columns["filament_mass"][row],
+            print_hours=columns["print_hours"][row],
+            material=columns["material"][row],
+            machine=columns["machine"][row],
+            energy=columns["energy"][row],
+            labor=columns["labor"][row],
+            margin=columns["margin"][row],
+        )
+
+    def _get(self, name: str, row: int):
+        if name in self._columns:
+            return self._columns[name][row]
+        return getattr(self.parameters, name)
+
+
+def price_job(stats, parameters: PriceParameters) -> JobCost:
+    """Price the stats of a G-code analysis or of a measured model.
+
+    A model that is not sliced yet is priced by the material of its estimated
+    shell and infill, see job_inputs, or by its whole volume when they were not
+    estimated. It has no print time, so its machine time and energy are not
+    charged.
+    """
+    model = CostModel(parameters)
+    return model.job_cost(model.add_job(stats))
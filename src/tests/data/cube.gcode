@@ -0,0 +1,358 @@
+; generated by PrusaSlicer 2.7.1+win64 on 2024-01-15 at 10:12:44 UTC
+M73 P0 R1
+M201 X1000 Y1000 Z200 E5000
+M203 X200 Y200 Z12 E120
+M204 P1000 R1250 T1000
+M205 X8.00 Y8.00 Z0.40 E4.50
+M107
+M862.3 P "MK3S"
+G90
+M83
+M104 S215
+M140 S60
+M190 S60
+M109 S215
+G28 W ; home all without mesh bed level
+G80 ; mesh bed leveling
+G1 Z0.2 F720
+G1 Y-3 F1000
+G92 E0
+G1 X60 E9 F1000 ; intro line
+G1 X100 E12.5 F1000
+G92 E0
+M221 S95
+G21
+G90
+M83
+;LAYER_CHANGE
+;Z:0.2
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z0.200 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Solid infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X120.450 Y109.550 E0.30267 F3000
+G1 X120.900 Y109.550 F9000
+G1 X120.900 Y100.450 E0.30267 F3000
+G1 X121.350 Y100.450 F9000
+G1 X121.350 Y109.550 E0.30267 F3000
+G1 X121.800 Y109.550 F9000
+G1 X121.800 Y100.450 E0.30267 F3000
+G1 X122.250 Y100.450 F9000
+G1 X122.250 Y109.550 E0.30267 F3000
+G1 X122.700 Y109.550 F9000
+G1 X122.700 Y100.450 E0.30267 F3000
+G1 X123.150 Y100.450 F9000
+G1 X123.150 Y109.550 E0.30267 F3000
+G1 X123.600 Y109.550 F9000
+G1 X123.600 Y100.450 E0.30267 F3000
+G1 X124.050 Y100.450 F9000
+G1 X124.050 Y109.550 E0.30267 F3000
+G1 X124.500 Y109.550 F9000
+G1 X124.500 Y100.450 E0.30267 F3000
+G1 X124.950 Y100.450 F9000
+G1 X124.950 Y109.550 E0.30267 F3000
+G1 X125.400 Y109.550 F9000
+G1 X125.400 Y100.450 E0.30267 F3000
+G1 X125.850 Y100.450 F9000
+G1 X125.850 Y109.550 E0.30267 F3000
+G1 X126.300 Y109.550 F9000
+G1 X126.300 Y100.450 E0.30267 F3000
+G1 X126.750 Y100.450 F9000
+G1 X126.750 Y109.550 E0.30267 F3000
+G1 X127.200 Y109.550 F9000
+G1 X127.200 Y100.450 E0.30267 F3000
+G1 X127.650 Y100.450 F9000
+G1 X127.650 Y109.550 E0.30267 F3000
+G1 X128.100 Y109.550 F9000
+G1 X128.100 Y100.450 E0.30267 F3000
+G1 X128.550 Y100.450 F9000
+G1 X128.550 Y109.550 E0.30267 F3000
+G1 X129.000 Y109.550 F9000
+G1 X129.000 Y100.450 E0.30267 F3000
+G1 X129.450 Y100.450 F9000
+G1 X129.450 Y109.550 E0.30267 F3000
+M73 P10 R1
+;LAYER_CHANGE
+;Z:0.4
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z0.400 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Internal infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X129.550 Y100.450 E0.30267 F3000
+G1 X129.550 Y102.450 F9000
+G1 X120.450 Y102.450 E0.30267 F3000
+G1 X120.450 Y104.450 F9000
+G1 X129.550 Y104.450 E0.30267 F3000
+G1 X129.550 Y106.450 F9000
+G1 X120.450 Y106.450 E0.30267 F3000
+G1 X120.450 Y108.450 F9000
+G1 X129.550 Y108.450 E0.30267 F3000
+M73 P20 R1
+;LAYER_CHANGE
+;Z:0.6
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z0.600 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Internal infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X120.450 Y109.550 E0.30267 F3000
+G1 X122.450 Y109.550 F9000
+G1 X122.450 Y100.450 E0.30267 F3000
+G1 X124.450 Y100.450 F9000
+G1 X124.450 Y109.550 E0.30267 F3000
+G1 X126.450 Y109.550 F9000
+G1 X126.450 Y100.450 E0.30267 F3000
+G1 X128.450 Y100.450 F9000
+G1 X128.450 Y109.550 E0.30267 F3000
+M73 P30 R1
+;LAYER_CHANGE
+;Z:0.8
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z0.800 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Internal infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X129.550 Y100.450 E0.30267 F3000
+G1 X129.550 Y102.450 F9000
+G1 X120.450 Y102.450 E0.30267 F3000
+G1 X120.450 Y104.450 F9000
+G1 X129.550 Y104.450 E0.30267 F3000
+G1 X129.550 Y106.450 F9000
+G1 X120.450 Y106.450 E0.30267 F3000
+G1 X120.450 Y108.450 F9000
+G1 X129.550 Y108.450 E0.30267 F3000
+M73 P40 R1
+;LAYER_CHANGE
+;Z:1.0
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z1.000 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Internal infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X120.450 Y109.550 E0.30267 F3000
+G1 X122.450 Y109.550 F9000
+G1 X122.450 Y100.450 E0.30267 F3000
+G1 X124.450 Y100.450 F9000
+G1 X124.450 Y109.550 E0.30267 F3000
+G1 X126.450 Y109.550 F9000
+G1 X126.450 Y100.450 E0.30267 F3000
+G1 X128.450 Y100.450 F9000
+G1 X128.450 Y109.550 E0.30267 F3000
+M73 P50 R1
+;LAYER_CHANGE
+;Z:1.2
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z1.200 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Internal infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X129.550 Y100.450 E0.30267 F3000
+G1 X129.550 Y102.450 F9000
+G1 X120.450 Y102.450 E0.30267 F3000
+G1 X120.450 Y104.450 F9000
+G1 X129.550 Y104.450 E0.30267 F3000
+G1 X129.550 Y106.450 F9000
+G1 X120.450 Y106.450 E0.30267 F3000
+G1 X120.450 Y108.450 F9000
+G1 X129.550 Y108.450 E0.30267 F3000
+M73 P60 R1
+;LAYER_CHANGE
+;Z:1.4
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z1.400 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Internal infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X120.450 Y109.550 E0.30267 F3000
+G1 X122.450 Y109.550 F9000
+G1 X122.450 Y100.450 E0.30267 F3000
+G1 X124.450 Y100.450 F9000
+G1 X124.450 Y109.550 E0.30267 F3000
+G1 X126.450 Y109.550 F9000
+G1 X126.450 Y100.450 E0.30267 F3000
+G1 X128.450 Y100.450 F9000
+G1 X128.450 Y109.550 E0.30267 F3000
+M73 P70 R1
+;LAYER_CHANGE
+;Z:1.6
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z1.600 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Internal infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X129.550 Y100.450 E0.30267 F3000
+G1 X129.550 Y102.450 F9000
+G1 X120.450 Y102.450 E0.30267 F3000
+G1 X120.450 Y104.450 F9000
+G1 X129.550 Y104.450 E0.30267 F3000
+G1 X129.550 Y106.450 F9000
+G1 X120.450 Y106.450 E0.30267 F3000
+G1 X120.450 Y108.450 F9000
+G1 X129.550 Y108.450 E0.30267 F3000
+M73 P80 R1
+;LAYER_CHANGE
+;Z:1.8
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z1.800 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Internal infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X120.450 Y109.550 E0.30267 F3000
+G1 X122.450 Y109.550 F9000
+G1 X122.450 Y100.450 E0.30267 F3000
+G1 X124.450 Y100.450 F9000
+G1 X124.450 Y109.550 E0.30267 F3000
+G1 X126.450 Y109.550 F9000
+G1 X126.450 Y100.450 E0.30267 F3000
+G1 X128.450 Y100.450 F9000
+G1 X128.450 Y109.550 E0.30267 F3000
+M73 P90 R1
+;LAYER_CHANGE
+;Z:2.0
+;HEIGHT:0.2
+G1 E-.8 F2100
+G1 Z2.000 F720
+G1 X120.000 Y100.000 F9000
+G1 E.8 F2100
+;TYPE:External perimeter
+G1 F1800
+G1 X130.000 Y100.000 E0.33260
+G1 X130.000 Y110.000 E0.33260
+G1 X120.000 Y110.000 E0.33260
+G1 X120.000 Y100.000 E0.33260
+;TYPE:Solid infill
+G1 F3000
+G1 X120.450 Y100.450 F9000
+G1 X129.550 Y100.450 E0.30267 F3000
+G1 X129.550 Y100.900 F9000
+G1 X120.450 Y100.900 E0.30267 F3000
+G1 X120.450 Y101.350 F9000
+G1 X129.550 Y101.350 E0.30267 F3000
+G1 X129.550 Y101.800 F9000
+G1 X120.450 Y101.800 E0.30267 F3000
+G1 X120.450 Y102.250 F9000
+G1 X129.550 Y102.250 E0.30267 F3000
+G1 X129.550 Y102.700 F9000
+G1 X120.450 Y102.700 E0.30267 F3000
+G1 X120.450 Y103.150 F9000
+G1 X129.550 Y103.150 E0.30267 F3000
+G1 X129.550 Y103.600 F9000
+G1 X120.450 Y103.600 E0.30267 F3000
+G1 X120.450 Y104.050 F9000
+G1 X129.550 Y104.050 E0.30267 F3000
+G1 X129.550 Y104.500 F9000
+G1 X120.450 Y104.500 E0.30267 F3000
+G1 X120.450 Y104.950 F9000
+G1 X129.550 Y104.950 E0.30267 F3000
+G1 X129.550 Y105.400 F9000
+G1 X120.450 Y105.400 E0.30267 F3000
+G1 X120.450 Y105.850 F9000
+G1 X129.550 Y105.850 E0.30267 F3000
+G1 X129.550 Y106.300 F9000
+G1 X120.450 Y106.300 E0.30267 F3000
+G1 X120.450 Y106.750 F9000
+G1 X129.550 Y106.750 E0.30267 F3000
+G1 X129.550 Y107.200 F9000
+G1 X120.450 Y107.200 E0.30267 F3000
+G1 X120.450 Y107.650 F9000
+G1 X129.550 Y107.650 E0.30267 F3000
+G1 X129.550 Y108.100 F9000
+G1 X120.450 Y108.100 E0.30267 F3000
+G1 X120.450 Y108.550 F9000
+G1 X129.550 Y108.550 E0.30267 F3000
+G1 X129.550 Y109.000 F9000
+G1 X120.450 Y109.000 E0.30267 F3000
+G1 X120.450 Y109.450 F9000
+G1 X129.550 Y109.450 E0.30267 F3000
+M73 P100 R0
+G1 E-.8 F2100
+M107
+G1 Z12 F720
+M104 S0
+M140 S0
+M84 ; disable motors
+; filament used [mm] = 58.82
+; estimated printing time (normal mode) = 44s
@@ -0,0 +1,37 @@
+import json
+import os
+import stat
+
+import pytest
+
+from atomic_file import write_json_atomic
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="needs POSIX permissions")
+
+
+def file_mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_writes_json(tmp_path):
+    path = tmp_path / "data.json"
+    write_json_atomic(str(path), {"a": [1, 2]}, indent=4)
+    assert json.loads(path.read_text()) == {"a": [1, 2]}
+    assert [entry.name for entry in tmp_path.iterdir()] == ["data.json"]
+
+
+@posix_only
+def test_keeps_permissions_of_replaced_file(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text("{}")
+    os.chmod(path, 0o640)
+    write_json_atomic(str(path), {"theme": "dark"})
+    assert file_mode(path) == 0o640
+
+
+@posix_only
+def test_new_file_gets_default_permissions(tmp_path):
+    plain = tmp_path / "plain.json"
+    plain.write_text("[]")
+    write_json_atomic(str(tmp_path / "new.json"), [])
+    assert file_mode(tmp_path / "new.json") == file_mode(plain)
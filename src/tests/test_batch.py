@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+
+import pytest
+
+import quoting.batch
+from analysis import analyze_path
+from quoting import PriceParameters, quote_batch
+
+GCODE = b"G90\nM82\nG1 Z0.2 F1200\nG1 X10 Y0 E1\nG1 X10 Y10 E2\n"
+
+fork_only = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="the workers must inherit the patched analyze_path",
+)
+
+
+def crash_on_crash_files(path: str, **options):
+    if "crash" in os.path.basename(path):
+        os._exit(1)
+    return analyze_path(path, **options)
+
+
+def write_jobs(directory, names: list[str]) -> list[str]:
+    paths = []
+    for name in names:
+        path = directory / name
+        path.write_bytes(GCODE)
+        paths.append(str(path))
+    return paths
+
+
+@fork_only
+@pytest.mark.parametrize("workers", [1, 3])
+def test_dead_worker_fails_only_its_file(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(quoting.batch, "analyze_path", crash_on_crash_files)
+    names = [f"job{index}.gcode" for index in range(6)]
+    names.insert(2, "crash.gcode")
+    paths = write_jobs(tmp_path, names)
+
+    results = list(quote_batch(paths, PriceParameters(), max_workers=workers))
+
+    assert sorted(result.path for result in results) == sorted(paths)
+    failed = [result for result in results if not result.ok]
+    assert [os.path.basename(result.path) for result in failed] == ["crash.gcode"]
+    assert all(result.cost is not None for result in results if result.ok)
+
+
+@fork_only
+def test_every_crashing_file_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(quoting.batch, "analyze_path", crash_on_crash_files)
+    paths = write_jobs(tmp_path, ["crash1.gcode", "job.gcode", "crash2.gcode"])
+
+    results = list(quote_batch(paths, PriceParameters(), max_workers=3))
+
+    assert sorted(
+        os.path.basename(result.path) for result in results if not result.ok
+    ) == ["crash1.gcode", "crash2.gcode"]
+
+
+def crash_before_start_of_crash_files(index: int, path: str, options: dict):
+    if "crash" in os.path.basename(path):
+        os._exit(1)
+    return ANALYZE_STARTED_JOB(index, path, options)
+
+
+def crash_on_start(started):
+    os._exit(1)
+
+
+ANALYZE_STARTED_JOB = quoting.batch._analyze_started_job
+
+
+@fork_only
+def test_worker_dying_before_start_report_fails_only_its_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        quoting.batch, "_analyze_started_job", crash_before_start_of_crash_files
+    )
+    paths = write_jobs(tmp_path, ["job1.gcode", "crash.gcode", "job2.gcode"])
+
+    # One worker, so no other job reports its start while the crash job runs
+    results = list(quote_batch(paths, PriceParameters(), max_workers=1))
+
+    assert sorted(result.path for result in results) == sorted(paths)
+    assert [
+        os.path.basename(result.path) for result in results if not result.ok
+    ] == ["crash.gcode"]
+
+
+@fork_only
+@pytest.mark.parametrize("workers", [1, 2])
+def test_workers_dying_at_start_fail_every_file(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(quoting.batch, "_start_worker", crash_on_start)
+    paths = write_jobs(tmp_path, ["job1.gcode", "job2.gcode", "job3.gcode"])
+
+    results = list(quote_batch(paths, PriceParameters(), max_workers=workers))
+
+    assert sorted(result.path for result in results) == sorted(paths)
+    assert not any(result.ok for result in results)
+
+
+@fork_only
+def test_single_job_fails_when_its_worker_dies_at_start(tmp_path, monkeypatch):
+    monkeypatch.setattr(quoting.batch, "_start_worker", crash_on_start)
+    [path] = write_jobs(tmp_path, ["job.gcode"])
+
+    results = list(quoting.batch._analyze_jobs([(path, None, {})], 1))
+
+    assert [(result[0], result[2]) for result in results] == [(path, None)]
+    assert results[0][4] == "The worker process died"
@@ -0,0 +1,204 @@
+"""Binary G-code against a fixture laid out like PrusaSlicer writes it.
+
+cube.bgcode holds file, printer, print and slicer metadata, a thumbnail and the
+G-code of cube.gcode, in heatshrink compressed, MeatPack encoded blocks with
+CRC32 checksums.
+
+The hand-built file is written byte by byte from the format description, not by
+an encoder: the MeatPack bytes are spelled out below, and the heatshrink items
+are picked by hand. It has a block of each heatshrink window and of each
+MeatPack mode, with and without spaces and comments.
+"""
+
+import dataclasses
+import os
+import shutil
+import struct
+import zlib
+
+import pytest
+
+from analysis import MachineLimits, analyze_path
+from analysis.bgcode import BgcodeFile, meatpack_decode
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+BGCODE = os.path.join(DATA, "cube.bgcode")
+GCODE = os.path.join(DATA, "cube.gcode")
+# Decoded binary G-code has no spaces in commands, the plain file has no
+# metadata
+IGNORED = ("bytes_read", "slicer_time", "slicer_filament_length")
+
+# MeatPack packs two characters of 0123456789. \nGX in a byte, the first in the
+# low nibble, E takes the place of the space without spaces. A nibble of F is a
+# character that follows in full, FF FF is followed by a command.
+NO_SPACES_GCODE = b"G1 X10.5 Y20 E.5\nG0 X3.25\nG1 E-12 F2400\n"
+NO_SPACES_PACKED = bytes.fromhex(
+    "ffff fb"  # enable packing
+    "ffff f7"  # enable no spaces
+    "1d 1e a0 f5 59 02 ab c5"  # G1 X1 0. 5Y 20 E. 5\n, Y in full
+    "0d 3e 2a c5"  # G0 X3 .2 5\n
+    "1d fb 2d 21 2f 46 04 c0"  # G1 E- 12 F2 40 0\n, - and F in full
+)
+# heatshrink items: bytes are literals, pairs back references (offset, count)
+NO_SPACES_ITEMS = [
+    b"\xff",
+    (1, 1),
+    b"\xfb",
+    (3, 2),  # the second enable command
+    b"\xf7",
+    bytes.fromhex("1d 1e a0 f5 59 02 ab c5 0d 3e 2a"),
+    (4, 1),
+    (12, 1),
+    (17, 1),
+    bytes.fromhex("2d 21 2f 46 04 c0"),
+]
+COMMENTS_GCODE = b";LAYER:1\nG1 Z0.4\nG1 X10 E.85\nG1 X5 E-2\n"
+COMMENTS_PACKED = bytes.fromhex(
+    "ffff fb"  # enable packing
+    "ffff fa" + b";LAYER:1\n".hex() + "ffff fb"  # the comment is not packed
+    "1d fb 5a a0 c4"  # G1  Z 0. 4\n, Z in full
+    "1d eb 01 fb 45 8a c5"  # G1  X 10  E .8 5\n, E in full
+    "1d eb b5 ff 45 2d c2"  # G1  X 5  E- 2\n, E and - in full
+)
+COMMENTS_ITEMS = [
+    b"\xff\xff\xfb",
+    (3, 2),
+    b"\xfa;LAYER:1\n",
+    (15, 3),  # enable packing again
+    b"\x1d",
+    (17, 1),
+    b"\x5a\xa0\xc4",
+    (5, 1),
+    bytes.fromhex("eb 01 fb 45 8a c5"),
+    (7, 2),
+    bytes.fromhex("b5 ff 45 2d c2"),
+]
+
+
+def compared(stats) -> dict:
+    fields = dataclasses.asdict(stats)
+    for name in IGNORED:
+        del fields[name]
+    return fields
+
+
+def test_decodes_like_the_plain_gcode():
+    limits = MachineLimits()
+    decoded = analyze_path(BGCODE, limits=limits)
+    plain = analyze_path(GCODE, limits=limits)
+    assert compared(decoded) == pytest.approx(compared(plain))
+    assert decoded.moves == 270
+    assert decoded.layer_count == 10
+    assert decoded.slicer_time == 44.0
+    assert decoded.slicer_filament_length == pytest.approx(58.82)
+
+
+def test_without_limits_only_the_metadata_is_read():
+    stats = analyze_path(BGCODE)
+    assert stats.print_time == 44.0
+    assert stats.filament_length == pytest.approx(58.82)
+    assert stats.moves == 0
+
+
+def test_metadata_is_read_before_the_gcode():
+    with BgcodeFile(BGCODE) as bgcode:
+        assert bgcode.metadata["printer_model"] == "MK3S"
+        assert bgcode.slicer_estimates() == (44.0, pytest.approx(58.82))
+
+
+def test_corrupt_block_is_an_error(tmp_path):
+    path = str(tmp_path / "corrupt.bgcode")
+    shutil.copy(BGCODE, path)
+    with BgcodeFile(path) as bgcode:
+        last = list(bgcode.blocks())[-1]
+    with open(path, "r+b") as file:
+        file.seek(last.offset + 20)
+        byte = file.read(1)
+        file.seek(-1, os.SEEK_CUR)
+        file.write(bytes([byte[0] ^ 0xFF]))
+    with pytest.raises(ValueError, match="corrupt block"):
+        analyze_path(path, limits=MachineLimits())
+
+
+def heatshrink(items: list, window_bits: int, lookahead_bits: int) -> bytes:
+    """Lay out heatshrink items: a 1 bit and 8 bits of every literal byte, a 0
+    bit, the offset and the count, both minus one, of every back reference."""
+    bits = []
+    for item in items:
+        if isinstance(item, bytes):
+            bits.extend(f"1{byte:08b}" for byte in item)
+        else:
+            offset, count = item
+            bits.append(f"0{offset - 1:0{window_bits}b}{count - 1:0{lookahead_bits}b}")
+    bits = "".join(bits)
+    bits += "0" * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+
+def block(block_type: int, data: bytes, compression=0, size=None, encoding=0):
+    """A block with its CRC32, size is that of the data before compression."""
+    header = struct.pack("<HHI", block_type, compression, size or len(data))
+    if compression:
+        header += struct.pack("<I", len(data))
+    raw = header + struct.pack("<H", encoding) + data
+    return raw + struct.pack("<I", zlib.crc32(raw))
+
+
+@pytest.fixture
+def hand_built(tmp_path) -> str:
+    path = str(tmp_path / "hand_built.bgcode")
+    with open(path, "wb") as file:
+        file.write(b"GCDE" + struct.pack("<IH", 1, 1))  # version 1, CRC32
+        file.write(block(0, b"Producer=hand\n"))
+        file.write(block(3, b"printer_model=MK4\n"))
+        file.write(
+            block(
+                4,
+                b"filament used [mm]=3.50\n"
+                b"estimated printing time (normal mode)=1m 5s\n",
+            )
+        )
+        file.write(block(2, b"; generated by hand\n"))
+        file.write(
+            block(
+                1,
+                heatshrink(NO_SPACES_ITEMS, 11, 4),
+                compression=2,
+                size=len(NO_SPACES_PACKED),
+                encoding=1,
+            )
+        )
+        file.write(
+            block(
+                1,
+                heatshrink(COMMENTS_ITEMS, 12, 4),
+                compression=3,
+                size=len(COMMENTS_PACKED),
+                encoding=2,
+            )
+        )
+    return path
+
+
+def test_hand_built_blocks_decode(hand_built):
+    with BgcodeFile(hand_built) as bgcode:
+        blocks = [block for block in bgcode.blocks() if block.type == 1]
+        assert [block.compression for block in blocks] == [2, 3]
+        decoded = [bgcode.read_block(block) for block in blocks]
+    assert decoded == [(1, NO_SPACES_PACKED), (2, COMMENTS_PACKED)]
+    assert meatpack_decode(NO_SPACES_PACKED) == NO_SPACES_GCODE
+    assert meatpack_decode(COMMENTS_PACKED) == COMMENTS_GCODE
+
+
+def test_hand_built_analyzes_like_the_plain_gcode(hand_built, tmp_path):
+    plain = tmp_path / "plain.gcode"
+    plain.write_bytes(NO_SPACES_GCODE + COMMENTS_GCODE)
+    limits = MachineLimits()
+    decoded = analyze_path(hand_built, limits=limits)
+    assert compared(decoded) == pytest.approx(
+        compared(analyze_path(str(plain), limits=limits))
+    )
+    assert decoded.moves == 6
+    assert decoded.layer_count == 1
+    assert decoded.slicer_time == 65.0
+    assert decoded.slicer_filament_length == 3.5
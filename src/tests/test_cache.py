@@ -0,0 +1,57 @@
+import os
+
+from analysis import AnalysisCache, GcodeStats
+
+
+def stats(**fields) -> GcodeStats:
+    return GcodeStats(filament_length=1.0, **fields)
+
+
+def test_entries_are_evicted_by_size(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.json"), keep_checkpoints=False)
+    cache.put("a", stats())
+    entry_size = cache.stats.size
+    cache.max_bytes = 3 * entry_size
+    for key in "bcd":
+        cache.put(key, stats())
+    assert cache.get("a") is None
+    assert cache.stats.entries == 3
+    assert cache.stats.size <= cache.max_bytes
+
+
+def test_layer_files_count_and_are_removed(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.json"), max_bytes=10_000)
+    layers_file = cache.layers_path("big")
+    with open(layers_file, "wb") as file:
+        file.write(bytes(9_000))
+    cache.put("big", stats(layers_file=layers_file))
+    assert cache.stats.size > 9_000
+    cache.put("small", stats())
+    cache.put("other", stats(layers_file=cache.layers_path("missing")))
+    cache.put("last", stats())
+    assert cache.get("big") is None
+    assert not os.path.exists(layers_file)
+
+
+def test_hit_does_not_rewrite_the_file(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.json"))
+    cache.put("a", stats())
+    assert cache.flush()
+    assert cache.get("a") is not None
+    assert not cache.flush()
+
+
+def test_least_recently_written_checkpoints_are_evicted(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.json"), max_checkpoint_bytes=2_500)
+    paths = []
+    for index in range(4):
+        path = cache.checkpoint_path(str(tmp_path / f"{index}.gcode"), {})
+        layers = os.path.splitext(path)[0] + ".layers"
+        for name, size in ((path, 500), (layers, 500)):
+            with open(name, "wb") as file:
+                file.write(bytes(size))
+            os.utime(name, ns=(index * 10**9, index * 10**9))
+        paths.append((path, layers))
+    cache.flush()
+    kept = [os.path.exists(path) and os.path.exists(layers) for path, layers in paths]
+    assert kept == [False, False, True, True]
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from analysis.kinematics import (
+    KinematicsEstimator,
+    MachineLimits,
+    MoveColumns,
+    estimate_print_time,
+    estimate_print_time_reference,
+)
+from benchmarks.kinematics import make_columns
+
+
+def columns_of(*arrays: np.ndarray) -> MoveColumns:
+    columns = MoveColumns()
+    for column, values in zip(
+        (columns.dx, columns.dy, columns.dz, columns.de, columns.feed_rate), arrays
+    ):
+        column.frombytes(np.asarray(values, dtype=np.float64).tobytes())
+    return columns
+
+
+def straight_line(moves: int, length: float) -> MoveColumns:
+    return columns_of(
+        np.full(moves, length),
+        np.zeros(moves),
+        np.zeros(moves),
+        np.full(moves, length * 0.033),
+        np.full(moves, 9000.0),
+    )
+
+
+def add_in_batches(estimator: KinematicsEstimator, arrays, size: int):
+    for start in range(0, len(arrays[0]), size):
+        estimator.add_arrays(*(column[start : start + size] for column in arrays))
+
+
+def test_segmented_line_takes_as_long_as_one_move():
+    limits = MachineLimits(acceleration=500.0)
+    single = estimate_print_time(straight_line(1, 200.0), limits)
+    segmented = estimate_print_time(straight_line(200, 1.0), limits)
+    assert segmented == pytest.approx(single, rel=1e-9)
+    reference = estimate_print_time_reference(straight_line(200, 1.0), limits)
+    assert reference == pytest.approx(single, rel=1e-9)
+
+
+def test_vectorized_matches_reference():
+    columns = make_columns(20_000)
+    limits = MachineLimits()
+    assert estimate_print_time(columns, limits) == pytest.approx(
+        estimate_print_time_reference(columns, limits), rel=1e-9
+    )
+
+
+@pytest.mark.parametrize("size", [1, 7, 1000])
+def test_batches_do_not_change_the_time(size):
+    columns = make_columns(5_000, seed=1)
+    estimator = KinematicsEstimator()
+    add_in_batches(estimator, columns.as_arrays(), size)
+    assert estimator.finish() == pytest.approx(
+        estimate_print_time_reference(columns), rel=1e-9
+    )
+
+
+@pytest.mark.parametrize("split", [1, 2, 50, 2_500, 4_999])
+def test_joined_estimators_time_like_one(split):
+    columns = make_columns(5_000, seed=2)
+    arrays = columns.as_arrays()
+    before = KinematicsEstimator()
+    after = KinematicsEstimator(keep_head=True)
+    add_in_batches(before, [column[:split] for column in arrays], 300)
+    add_in_batches(after, [column[split:] for column in arrays], 300)
+    before.join(after)
+    assert before.finish() == pytest.approx(
+        estimate_print_time_reference(columns), rel=1e-9
+    )
+    assert before.moves == 5_000
+
+
+def test_joined_segmented_line():
+    limits = MachineLimits(acceleration=500.0)
+    arrays = straight_line(200, 1.0).as_arrays()
+    before = KinematicsEstimator(limits)
+    after = KinematicsEstimator(limits, keep_head=True)
+    before.add_arrays(*(column[:100] for column in arrays))
+    after.add_arrays(*(column[100:] for column in arrays))
+    before.join(after)
+    assert before.finish() == pytest.approx(
+        estimate_print_time(straight_line(1, 200.0), limits), rel=1e-9
+    )
+
+
+def test_saved_state_continues():
+    columns = make_columns(3_000, seed=3)
+    arrays = columns.as_arrays()
+    estimator = KinematicsEstimator()
+    add_in_batches(estimator, [column[:1_500] for column in arrays], 500)
+    resumed = KinematicsEstimator()
+    resumed.load_state(estimator.save_state())
+    add_in_batches(resumed, [column[1_500:] for column in arrays], 500)
+    assert resumed.finish() == pytest.approx(
+        estimate_print_time_reference(columns), rel=1e-9
+    )
@@ -0,0 +1,87 @@
+import multiprocessing
+import random
+import time
+
+import pytest
+
+import analysis.parallel
+from analysis import AnalysisCancelled, MachineLimits, analyze_file
+from benchmarks.parallel_gcode import same_stats, write_synthetic_file
+
+
+def cancel(parsed: int, total: int):
+    raise AnalysisCancelled()
+
+
+def test_cancel_terminates_the_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis.parallel, "MIN_RANGE_SIZE", 1 << 20)
+    path = str(tmp_path / "large.gcode")
+    write_synthetic_file(path, 16 << 20)
+
+    with pytest.raises(AnalysisCancelled):
+        analyze_file(path, workers=4, progress=cancel)
+
+    # Left alone, the workers would parse their ranges for another second
+    deadline = time.monotonic() + 0.5
+    while multiprocessing.active_children() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not multiprocessing.active_children()
+
+
+def write_layers(path: str, size: int, mode: str):
+    """G-code with relative extrusion, absolute extrusion or relative positions.
+
+    No layer sets every axis and the feed rate on one line, like slicers write.
+    """
+    rng = random.Random(7)
+    header = {"relative_e": "G90\nM83\n", "absolute_e": "G90\nM82\n"}
+    lines = [header.get(mode, "G91\n")]
+    written, layer, e = 0, 0, 0.0
+    while written < size:
+        layer += 1
+        if mode == "relative_xyz":
+            out = ["G1 Z0.2 F600"]
+        else:
+            out = [f";LAYER:{layer}", f"G1 Z{layer * 0.2:.1f} F600"]
+            if mode == "absolute_e" or layer % 3 == 0:
+                out.insert(1, "G92 E0")
+                e = 0.0
+        for index in range(2000):
+            x, y = rng.uniform(-20, 20), rng.uniform(-20, 20)
+            if mode != "relative_xyz":
+                x, y = x + 100, y + 100
+            if index % 50 == 0:
+                out.append(f"G0 X{x:.3f} Y{y:.3f} F9000")
+                continue
+            step = rng.uniform(0.01, 0.1)
+            e += step
+            amount = e if mode == "absolute_e" else step
+            feed_rate = f" F{rng.choice((1800, 2400))}" if index % 50 == 1 else ""
+            out.append(f"G1 X{x:.3f} Y{y:.3f} E{amount:.5f}{feed_rate}")
+        text = "\n".join(out) + "\n"
+        lines.append(text)
+        written += len(text)
+    with open(path, "w") as file:
+        file.writelines(lines)
+
+
+@pytest.mark.parametrize("mode", ["relative_e", "absolute_e", "relative_xyz"])
+def test_ranges_are_analyzed_in_the_workers(mode, tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis.parallel, "MIN_RANGE_SIZE", 1 << 20)
+    path = str(tmp_path / f"{mode}.gcode")
+    write_layers(path, 4 << 20, mode)
+    expected = analyze_file(path, limits=MachineLimits())
+
+    parsed_here = []
+    feed_range = analysis.parallel._feed_range
+
+    def count_feed_range(analyzer, stream, start, end, checkpoints=None):
+        parsed_here.append(end - start)
+        feed_range(analyzer, stream, start, end, checkpoints)
+
+    monkeypatch.setattr(analysis.parallel, "_feed_range", count_feed_range)
+    stats = analyze_file(path, workers=4, limits=MachineLimits())
+
+    assert same_stats(expected, stats)
+    # Only the lines that need the state before them are parsed in this process
+    assert sum(parsed_here) < expected.bytes_read / 100
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from analysis.gcode import STATE_FIELDS, GcodeAnalyzer
+from analysis.limits import MachineLimits
+
+ODD_LINES = [
+    "G1 X1e-3 Y2",  # an exponent, parsed by float()
+    "G1 X1 X2 E0.5",  # a repeated word
+    "G1 X0.12345678901234567",  # more digits than a float holds exactly
+    "G1 X1 ; Y5 E9",  # words in the comment
+    "G1;comment",
+    "G01\tX3\tY4\r",
+    "G1X5",  # not a move, the command is G1X5
+    " G1 X7",  # not a move, it does not start with G
+    "G28",
+    "G92",
+    "G92 E0",
+    "G92 X10 Z0.3",
+    "G91",
+    "G90",
+    "M83",
+    "M82",
+    ";LAYER:7",
+    ";TIME:1234",
+    ";Filament used: 1.5m",
+    ";TYPE:WALL-OUTER",
+    "",
+    "M104 S200",
+]
+
+
+def number(rng: random.Random) -> str:
+    value = rng.uniform(-5, 220)
+    return rng.choice(
+        [
+            f"{value:.3f}",
+            f"{value:.0f}",
+            f"{value:.1f}0",
+            f"+{abs(value):.2f}",
+            f"{value:.4f}".lstrip("0") or "0",
+            "-0",
+            "5.",
+            ".5",
+        ]
+    )
+
+
+def make_gcode(lines: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    out = []
+    z = 0.2
+    for _ in range(lines):
+        if rng.random() < 0.08:
+            out.append(rng.choice(ODD_LINES))
+            continue
+        if rng.random() < 0.01:
+            z += 0.2
+            out.append(f"G0 Z{z:.2f}")
+            continue
+        words = [f"{axis}{number(rng)}" for axis in "XYEF" if rng.random() < 0.7]
+        if rng.random() < 0.05:
+            words.append(f"Z{z:.2f}")
+        rng.shuffle(words)
+        command = rng.choice(["G1", "G1", "G1", "G0", "G00", "G01"])
+        out.append(" ".join([command] + words))
+    return ("\n".join(out)).encode()
+
+
+def analyze(data: bytes, chunk: int, vectorized: bool, tmp_path) -> GcodeAnalyzer:
+    name = "vectorized" if vectorized else "lines"
+    analyzer = GcodeAnalyzer(
+        limits=MachineLimits(), layers_file=str(tmp_path / f"{name}.layers")
+    )
+    if not vectorized:
+        analyzer._scan = None  # the line parser, which the scanner must match
+    for start in range(0, len(data), chunk):
+        analyzer.feed(data[start : start + chunk])
+    analyzer.finish()
+    return analyzer
+
+
+@pytest.mark.parametrize("seed,chunk", [(1, 1 << 20), (2, 4096), (3, 97)])
+def test_vectorized_parse_matches_line_parser(seed, chunk, tmp_path):
+    data = make_gcode(20_000, seed)
+    vectorized = analyze(data, chunk, True, tmp_path)
+    lines = analyze(data, chunk, False, tmp_path)
+
+    for name in STATE_FIELDS:
+        assert getattr(vectorized, name) == getattr(lines, name), name
+    assert vectorized.layers.columns == lines.layers.columns
+    assert vectorized.stats.kinematic_time == pytest.approx(
+        lines.stats.kinematic_time, rel=1e-9
+    )
+
+
+def test_bad_number_raises_like_the_line_parser():
+    analyzer = GcodeAnalyzer(limits=MachineLimits())
+    with pytest.raises(ValueError):
+        analyzer.feed(b"G1 X1\nG1 Xabc\n")
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from analysis.stl import analyze_stl
+from benchmarks.stl_reader import box_corners, write_ascii_stl, write_binary_stl
+from benchmarks.threemf_reader import BOX
+
+
+def pyramid(apex_z: float) -> np.ndarray:
+    """A pyramid on a 10 mm square, upside down when apex_z is below it."""
+    base_z = 10.0 if apex_z < 10.0 else 0.0
+    square = [(0, 0, base_z), (10, 0, base_z), (10, 10, base_z), (0, 10, base_z)]
+    apex = (5.0, 5.0, apex_z)
+    sides = [(square[i], square[(i + 1) % 4], apex) for i in range(4)]
+    bottom = [(square[0], square[2], square[1]), (square[0], square[3], square[2])]
+    corners = np.array(sides + bottom, dtype=np.float64)
+    if base_z:
+        corners = corners[:, ::-1]  # keep the faces pointing out
+    return corners
+
+
+def test_binary_with_solid_header_and_trailing_bytes(tmp_path):
+    path = tmp_path / "box.stl"
+    corners = box_corners(2)
+    write_binary_stl(str(path), corners)
+    with open(path, "ab") as file:
+        file.write(b"\0" * 7)
+
+    stats = analyze_stl(str(path))
+    assert stats.triangles == len(corners)
+    assert stats.volume == pytest.approx(BOX[0] * BOX[1] * BOX[2], rel=1e-5)
+
+
+def test_ascii(tmp_path):
+    path = tmp_path / "box.stl"
+    write_ascii_stl(str(path), box_corners(2))
+    stats = analyze_stl(str(path))
+    assert stats.volume == pytest.approx(BOX[0] * BOX[1] * BOX[2], rel=1e-5)
+
+
+@pytest.mark.parametrize("content", [b"solid empty\nendsolid empty\n", b"x" * 84])
+def test_without_triangles_is_an_error(tmp_path, content):
+    path = tmp_path / "empty.stl"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        analyze_stl(str(path))
+
+
+def test_footprint_is_the_xy_extent(tmp_path):
+    upright, upside_down = tmp_path / "upright.stl", tmp_path / "upside_down.stl"
+    write_binary_stl(str(upright), pyramid(10.0))
+    write_binary_stl(str(upside_down), pyramid(0.0))
+
+    stats = analyze_stl(str(upright))
+    assert stats.footprint == pytest.approx(100.0)
+    assert stats.bed_area == pytest.approx(100.0)
+
+    stats = analyze_stl(str(upside_down))
+    assert stats.footprint == pytest.approx(100.0)
+    assert stats.bed_area == 0.0
+    assert stats.volume == pytest.approx(1000 / 3)